@@ -0,0 +1,2 @@
+""" Gerador de dados sintéticos e benchmarks dos pontos críticos do dashboard.
+"""
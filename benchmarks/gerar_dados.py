@@ -0,0 +1,164 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Quantidade de linhas geradas por vez (limita a memória para arquivos grandes)
+LINHAS_POR_BLOCO = 500_000
+
+CIDADES = ['Metropolitian ', 'Urban ', 'Semi-Urban ', 'NaN ']
+PROB_CIDADES = [0.74, 0.22, 0.01, 0.03]
+
+TRAFEGO = ['Low ', 'Jam ', 'Medium ', 'High ', 'NaN ']
+PROB_TRAFEGO = [0.34, 0.31, 0.24, 0.10, 0.01]
+
+CLIMA = ['conditions Fog', 'conditions Stormy', 'conditions Cloudy', 'conditions Sandstorms',
+         'conditions Windy', 'conditions Sunny', 'conditions NaN']
+PROB_CLIMA = [0.17, 0.17, 0.17, 0.16, 0.16, 0.16, 0.01]
+
+TIPOS_PEDIDO = ['Snack ', 'Meal ', 'Drinks ', 'Buffet ']
+TIPOS_VEICULO = ['motorcycle ', 'scooter ', 'electric_scooter ', 'bicycle ']
+PROB_VEICULO = [0.58, 0.33, 0.08, 0.01]
+
+# Cidades (prefixo do ID do entregador) e a coordenada aproximada dos restaurantes
+PREFIXOS = {'INDO': (22.72, 75.86), 'BANG': (12.97, 77.59), 'COIMB': (11.02, 76.96),
+            'CHEN': (13.08, 80.27), 'HYD': (17.39, 78.49), 'RANCHI': (23.34, 85.31),
+            'MYS': (12.30, 76.64), 'DEH': (30.32, 78.03), 'KOC': (9.93, 76.27),
+            'PUNE': (18.52, 73.86), 'LUDH': (30.90, 75.85), 'KNP': (26.45, 80.33),
+            'MUM': (19.08, 72.88), 'KOL': (22.57, 88.36), 'JAP': (26.91, 75.79),
+            'SUR': (21.17, 72.83), 'GOA': (15.30, 74.12), 'AURG': (19.88, 75.34),
+            'AGR': (27.18, 78.01), 'VAD': (22.31, 73.18), 'ALH': (25.44, 81.85),
+            'BHP': (23.26, 77.41)}
+
+DATA_INICIAL = np.datetime64('2022-02-11')
+DIAS = 54
+
+# Textos prontos de datas e horários: gerar por tabela evita formatar linha a linha
+TEXTO_DATAS = pd.date_range(str(DATA_INICIAL), periods=DIAS).strftime('%d-%m-%Y').to_numpy()
+TEXTO_HORARIOS = np.array([f'{m // 60:02d}:{m % 60:02d}:00' for m in range(24 * 60)])
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def _com_nan(rng, valores, proporcao):
+    """ Troca uma proporção dos valores pelo marcador 'NaN ' do CSV original
+    """
+    valores = valores.astype(object)
+    valores[rng.random(len(valores)) < proporcao] = 'NaN '
+    return valores
+
+
+def gerar_bloco(linhas, rng, inicio=0, entregadores_por_cidade=None):
+    """ Esta função tem a responsabilidade de gerar um bloco de pedidos sintéticos
+            com o mesmo esquema e as mesmas peculiaridades do dataset/train.csv
+
+            Peculiaridades reproduzidas:
+                textos com espaço no final ('Urban ', 'Jam ', 'motorcycle ')
+                marcadores 'NaN ' nas colunas de texto e 'conditions NaN' no clima
+                idade e avaliação ausentes nas mesmas linhas
+                tempo no formato '(min) 24'
+
+            Input: quantidade de linhas, numpy Generator, número do primeiro pedido
+            Output: DataFrame bruto (todas as colunas como no CSV)
+    """
+    if entregadores_por_cidade is None:
+        entregadores_por_cidade = max(20, linhas // 400)
+
+    prefixos = np.array(list(PREFIXOS))
+    coordenadas = np.array(list(PREFIXOS.values()))
+
+    # ENTREGADOR E RESTAURANTE
+    cidade = rng.integers(0, len(prefixos), linhas)
+    restaurante = rng.integers(1, 21, linhas)
+    entregador = rng.integers(1, 4, linhas)
+    sufixo = rng.integers(0, entregadores_por_cidade // 60 + 1, linhas)
+    entregador_id = np.char.add(
+        np.char.add(np.char.add(prefixos[cidade], 'RES'), np.char.zfill(restaurante.astype(str), 2)),
+        np.char.add(np.char.add('DEL', np.char.zfill(entregador.astype(str), 2)),
+                    np.where(sufixo > 0, np.char.add('_', sufixo.astype(str)), '')))
+    entregador_id = np.char.add(entregador_id, ' ')
+
+    lat_restaurante = coordenadas[cidade, 0] + rng.normal(0, 0.05, linhas)
+    lon_restaurante = coordenadas[cidade, 1] + rng.normal(0, 0.05, linhas)
+    lat_entrega = lat_restaurante + rng.uniform(-0.1, 0.1, linhas)
+    lon_entrega = lon_restaurante + rng.uniform(-0.1, 0.1, linhas)
+
+    # IDADE E AVALIAÇÃO AUSENTES NAS MESMAS LINHAS
+    sem_perfil = rng.random(linhas) < 0.04
+    idade = rng.integers(15, 51, linhas).astype(str).astype(object)
+    idade[sem_perfil] = 'NaN '
+    avaliacao = np.round(rng.uniform(2.5, 5.0, linhas), 1).astype(str).astype(object)
+    avaliacao[sem_perfil] = 'NaN '
+
+    # DATAS E HORÁRIOS
+    data = TEXTO_DATAS[rng.integers(0, DIAS, linhas)]
+    minuto_pedido = rng.integers(8 * 60, 23 * 60 + 45, linhas)
+    minuto_coleta = minuto_pedido + rng.choice([5, 10, 15], linhas)
+    hora_pedido = TEXTO_HORARIOS[minuto_pedido]
+    hora_coleta = TEXTO_HORARIOS[minuto_coleta]
+
+    return pd.DataFrame({
+        'ID': [f'0x{i:x} ' for i in range(inicio, inicio + linhas)],
+        'Delivery_person_ID': entregador_id,
+        'Delivery_person_Age': idade,
+        'Delivery_person_Ratings': avaliacao,
+        'Restaurant_latitude': lat_restaurante.round(6),
+        'Restaurant_longitude': lon_restaurante.round(6),
+        'Delivery_location_latitude': lat_entrega.round(6),
+        'Delivery_location_longitude': lon_entrega.round(6),
+        'Order_Date': data,
+        'Time_Orderd': _com_nan(rng, hora_pedido, 0.04),
+        'Time_Order_picked': hora_coleta,
+        'Weatherconditions': rng.choice(CLIMA, linhas, p=PROB_CLIMA),
+        'Road_traffic_density': rng.choice(TRAFEGO, linhas, p=PROB_TRAFEGO),
+        'Vehicle_condition': rng.integers(0, 4, linhas),
+        'Type_of_order': rng.choice(TIPOS_PEDIDO, linhas),
+        'Type_of_vehicle': rng.choice(TIPOS_VEICULO, linhas, p=PROB_VEICULO),
+        'multiple_deliveries': _com_nan(rng, rng.choice(['0', '1', '2', '3'], linhas, p=[0.31, 0.62, 0.05, 0.02]), 0.02),
+        'Festival': _com_nan(rng, rng.choice(['No ', 'Yes '], linhas, p=[0.98, 0.02]), 0.005),
+        'City': rng.choice(CIDADES, linhas, p=PROB_CIDADES),
+        'Time_taken(min)': np.char.add('(min) ', rng.integers(10, 55, linhas).astype(str)),
+    })
+
+
+def gerar_csv(caminho, linhas, semente=42):
+    """ Esta função tem a responsabilidade de gravar um CSV sintético com o esquema do dataset/train.csv
+
+            O arquivo é gerado em blocos de LINHAS_POR_BLOCO linhas, então
+            arquivos de 10 milhões de linhas não precisam caber na memória.
+
+            Input: caminho do CSV, quantidade de linhas, semente aleatória
+            Output: caminho do CSV
+    """
+    rng = np.random.default_rng(semente)
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(pasta, exist_ok=True)
+
+    entregadores_por_cidade = max(20, linhas // 400)
+    for inicio in range(0, linhas, LINHAS_POR_BLOCO):
+        bloco = gerar_bloco(min(LINHAS_POR_BLOCO, linhas - inicio), rng, inicio, entregadores_por_cidade)
+        bloco.to_csv(caminho, mode='w' if inicio == 0 else 'a', header=(inicio == 0), index=False)
+    return caminho
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera um CSV sintético com o esquema do dataset/train.csv')
+    parser.add_argument('linhas', type=int, help='quantidade de pedidos (ex.: 10000 a 10000000)')
+    parser.add_argument('saida', help='caminho do CSV gerado')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+    gerar_csv(args.saida, args.linhas, args.semente)
+
+
+if __name__ == '__main__':
+    main()
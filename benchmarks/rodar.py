@@ -0,0 +1,178 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import argparse
+import functools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.gerar_dados import gerar_csv
+from curry.calendario import construir_agregado_tempo, rollup
+from curry.cubo import cubo_dados, construir_cubo, filtrar_cubo
+from curry.dados import aplicar_plano_tipos, clean_code, ler_csv, limpar_em_paralelo, relatorio_memoria
+from curry.filtros import IndiceFiltros
+from curry.mapa import mapa_empresa
+from curry.metricas import (calcular_metricas, distancia_por_cidade, localizacao_mediana, pedidos_entregador_semana,
+                            status_dia, tempo_cidade_trafego, tempo_festival, tempo_por_cidade)
+from curry.perfis import construir_perfis
+from curry.ranking import top_entregadores
+from curry.tabelas import FonteTabela
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000]
+
+# Processos da etapa limpeza_paralela (ler_csv em faixas do CSV)
+PROCESSOS = os.cpu_count() or 1
+
+# Projeção da etapa leitura_esquema_projetada (as colunas da página de entregadores)
+COLUNAS_PROJECAO = ['Delivery_person_ID', 'Delivery_person_Age', 'Delivery_person_Ratings', 'Vehicle_condition',
+                    'Weatherconditions', 'Road_traffic_density', 'City', 'Time_taken(min)']
+
+# Filtros usados nas medições (parecidos com uma seleção real na barra lateral)
+FILTROS = (datetime(2022, 3, 20), ['High', 'Jam', 'Medium'], ['Metropolitian', 'Urban'])
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def medir(funcao, repeticoes):
+    """ Esta função tem a responsabilidade de medir o tempo e o pico de memória de uma etapa
+
+            O tempo é medido sem o tracemalloc (que deixa tudo mais lento); o pico
+            de memória vem de uma execução extra com o tracemalloc ligado.
+
+            Input: função sem argumentos, quantidade de repetições
+            Output: (dict com as medidas, resultado da última execução)
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    medidas = {'tempo_s': min(tempos),
+               'tempo_mediano_s': float(np.median(tempos)),
+               'tempos_s': tempos,
+               'pico_memoria_mb': pico / 2**20}
+    return medidas, resultado
+
+
+def rodar_tamanho(caminho_csv, repeticoes):
+    """ Esta função tem a responsabilidade de medir todas as etapas para um arquivo
+
+            Input: caminho do CSV sintético, quantidade de repetições
+            Output: (dict etapa -> medidas, relatorio_memoria antes e depois de aplicar_plano_tipos)
+    """
+    etapas = {}
+
+    def etapa(nome, funcao, repeticoes=repeticoes):
+        etapas[nome], resultado = medir(funcao, repeticoes)
+        print(f'  {nome:<32} {etapas[nome]["tempo_s"]:>10.4f} s {etapas[nome]["pico_memoria_mb"]:>10.1f} MB',
+              flush=True)
+        return resultado
+
+    bruto = etapa('leitura_csv', lambda: pd.read_csv(caminho_csv), repeticoes=1)
+    df = etapa('clean_code', lambda: clean_code(bruto), repeticoes=1)
+    sem_tipos = clean_code(bruto, aplicar_tipos=False)
+    com_tipos = etapa('aplicar_plano_tipos', functools.partial(aplicar_plano_tipos, sem_tipos), repeticoes=1)
+    memoria = relatorio_memoria(sem_tipos, com_tipos)
+    print(f'  {"memória (plano de tipos)":<32} {memoria.loc["TOTAL", "bytes_antes"] / 2**20:>10.1f} MB'
+          f' -> {memoria.loc["TOTAL", "bytes_depois"] / 2**20:.1f} MB ({memoria.loc["TOTAL", "reducao_%"]:.1f}%)',
+          flush=True)
+    # As versões sem e com o plano só servem ao relatório: não ficam na memória durante as outras etapas
+    del sem_tipos, com_tipos
+    etapa('leitura_esquema', lambda: ler_csv(caminho_csv), repeticoes=1)
+    etapa('leitura_esquema_projetada', lambda: ler_csv(caminho_csv, COLUNAS_PROJECAO), repeticoes=1)
+    etapa('limpeza_paralela', lambda: limpar_em_paralelo(caminho_csv, PROCESSOS), repeticoes=1)
+
+    indice = etapa('indice_filtros', lambda: IndiceFiltros(df), repeticoes=1)
+    df1 = etapa('filtro_barra_lateral', lambda: indice.filtrar(*FILTROS))
+    etapa('construir_cubo', lambda: construir_cubo(df), repeticoes=1)
+    cubo = etapa('filtrar_cubo', lambda: filtrar_cubo(cubo_dados(df), *FILTROS))
+
+    agregado = etapa('construir_agregado_tempo', lambda: construir_agregado_tempo(df), repeticoes=1)
+    agregado = filtrar_cubo(agregado, *FILTROS)
+    for granularidade in ['dia', 'semana', 'mes', 'hora']:
+        etapa(f'rollup_{granularidade}', lambda: rollup(agregado, granularidade))
+
+    perfis = etapa('construir_perfis', lambda: construir_perfis(df), repeticoes=1)
+    entregador = perfis.resumo.index[len(perfis.resumo) // 2]
+    etapa('perfil_entregador', lambda: perfis.perfil(entregador))
+    # Primeira página ordenada (seleção parcial), ordem completa da coluna e uma página depois dela
+    etapa('pagina_tabela_parcial', lambda: FonteTabela(perfis.resumo).pagina(0, 25, 'avaliacao_media', False))
+    fonte = FonteTabela(perfis.resumo)
+    etapa('ordenar_tabela', lambda: fonte.pagina(len(perfis.resumo) // 50, 25, 'avaliacao_media', False), repeticoes=1)
+    etapa('pagina_tabela', lambda: fonte.pagina(len(perfis.resumo) // 50, 25, 'avaliacao_media', False))
+
+    etapa('top_entregadores', lambda: top_entregadores(df1, k=10))
+    festival = etapa('tempo_festival', lambda: tempo_festival(cubo))
+    etapa('status_dia', lambda: status_dia(festival, 'Yes'))
+    etapa('tempo_por_cidade', lambda: tempo_por_cidade(cubo))
+    etapa('distancia_por_cidade', lambda: distancia_por_cidade(cubo))
+    etapa('tempo_cidade_trafego', lambda: tempo_cidade_trafego(cubo))
+    etapa('pedidos_entregador_semana', lambda: pedidos_entregador_semana(df1))
+    pontos = etapa('localizacao_mediana', lambda: localizacao_mediana(df1))
+    etapa('mapa_empresa', lambda: mapa_empresa(pontos))
+    etapa('calcular_metricas', lambda: calcular_metricas(df, *FILTROS))
+    return etapas, memoria
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede tempo e pico de memória dos pontos críticos do dashboard')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help='quantidades de linhas dos CSVs sintéticos (ex.: 10000 100000 10000000)')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--pasta-dados', default=None,
+                        help='pasta onde os CSVs sintéticos são gerados/reaproveitados (padrão: temporária)')
+    parser.add_argument('--saida', default='benchmark.json', help='arquivo JSON com os resultados')
+    args = parser.parse_args()
+
+    pasta = args.pasta_dados or tempfile.mkdtemp(prefix='curry-bench-')
+    resultados = []
+    for linhas in args.tamanhos:
+        caminho_csv = os.path.join(pasta, f'sintetico_{linhas}.csv')
+        if not os.path.exists(caminho_csv):
+            print(f'gerando {caminho_csv}', flush=True)
+            gerar_csv(caminho_csv, linhas)
+        print(f'{linhas} linhas', flush=True)
+        etapas, memoria = rodar_tamanho(caminho_csv, args.repeticoes)
+        resultados.append({'linhas': linhas, 'etapas': etapas,
+                           'memoria_plano_tipos': json.loads(memoria.to_json(orient='index'))})
+
+    relatorio = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {'python': sys.version.split()[0],
+                     'pandas': pd.__version__,
+                     'numpy': np.__version__,
+                     'plataforma': platform.platform(),
+                     'cpus': os.cpu_count()},
+        'repeticoes': args.repeticoes,
+        'resultados': resultados,
+    }
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f'resultados gravados em {args.saida}')
+
+
+if __name__ == '__main__':
+    main()
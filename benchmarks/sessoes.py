@@ -0,0 +1,105 @@
+""" Mede a memória de cada sessão do dashboard: quanto fica compartilhado no processo
+        (DataFrame e estruturas derivadas) e quanto cada sessão nova acrescenta.
+
+        Ex.: python -m benchmarks.sessoes --sessoes 10 --saida sessoes.json
+"""
+
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import argparse
+import gc
+import json
+import os
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from curry.dados import memoria_compartilhada
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGINAS = ['pages/1_visao_empresa.py', 'pages/2_visao_entregadores.py', 'pages/3_visao_restaurantes.py']
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def memoria_atual():
+    """ Esta função tem a responsabilidade de devolver a memória alocada agora (tracemalloc), em bytes
+    """
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def medir_pagina(pagina, sessoes):
+    """ Esta função tem a responsabilidade de abrir várias sessões de uma página no mesmo processo,
+            como o servidor do Streamlit faz, e medir a memória de cada uma
+
+            A primeira sessão carrega o DataFrame e as estruturas compartilhadas;
+            nas seguintes, a diferença de memória alocada antes e depois do
+            rerun (com a sessão ainda aberta) é o que cada analista a mais custa.
+
+            A memória compartilhada é a que a primeira sessão desta página
+            acrescentou ao cache do processo (páginas anteriores podem já ter
+            carregado parte dos dados).
+
+            Input: caminho da página, quantidade de sessões
+            Output: dict com as medidas em MB
+    """
+    compartilhada_antes = memoria_compartilhada()
+    abertas = [AppTest.from_file(pagina, default_timeout=300).run()]
+    compartilhada = memoria_compartilhada()
+
+    retidas, picos = [], []
+    for _ in range(sessoes - 1):
+        antes = memoria_atual()
+        tracemalloc.reset_peak()
+        abertas.append(AppTest.from_file(pagina, default_timeout=300).run())
+        picos.append(tracemalloc.get_traced_memory()[1] - antes)
+        retidas.append(memoria_atual() - antes)
+
+    excecoes = [e.message for sessao in abertas for e in sessao.exception]
+    return {'sessoes': sessoes,
+            'compartilhada_mb': compartilhada['total_mb'] - compartilhada_antes['total_mb'],
+            'compartilhada_dados_mb': compartilhada['dados_mb'] - compartilhada_antes['dados_mb'],
+            'compartilhada_derivados_mb': compartilhada['derivados_mb'] - compartilhada_antes['derivados_mb'],
+            'retida_por_sessao_mb': float(np.median(retidas)) / 2**20 if retidas else None,
+            'pico_por_rerun_mb': float(np.median(picos)) / 2**20 if picos else None,
+            'excecoes': excecoes[:3]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede a memória compartilhada e a memória por sessão do dashboard')
+    parser.add_argument('--sessoes', type=int, default=10, help='sessões abertas por página')
+    parser.add_argument('--paginas', nargs='+', default=PAGINAS)
+    parser.add_argument('--saida', default='sessoes.json', help='arquivo JSON com os resultados')
+    args = parser.parse_args()
+
+    # As páginas leem dataset/train.csv relativo à raiz do repositório
+    os.chdir(RAIZ)
+    tracemalloc.start()
+    resultados = {}
+    for pagina in args.paginas:
+        resultados[pagina] = medir_pagina(pagina, args.sessoes)
+        medidas = resultados[pagina]
+        print(f'{pagina:<34} compartilhada {medidas["compartilhada_mb"]:>8.1f} MB'
+              f'   por sessão {medidas["retida_por_sessao_mb"] or 0:>8.2f} MB'
+              f'   pico do rerun {medidas["pico_por_rerun_mb"] or 0:>8.2f} MB', flush=True)
+    tracemalloc.stop()
+
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump({'gerado_em': datetime.now().isoformat(timespec='seconds'),
+                   'resultados': resultados}, arquivo, ensure_ascii=False, indent=2)
+    print(f'resultados gravados em {args.saida}')
+
+
+if __name__ == '__main__':
+    main()
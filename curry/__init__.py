@@ -0,0 +1,27 @@
+""" Pacote com a lógica compartilhada entre as páginas do dashboard da Curry Company.
+
+        Não depende do Streamlit: plotly e folium só são importados quando uma
+        figura ou um mapa é desenhado. python -m curry calcula todas as métricas
+        para um filtro e grava em JSON/CSV.
+
+        Módulos:
+
+        cache: cache LRU compartilhado entre as sessões e resultados de seções por filtros
+        calendario: dimensão calendário (dia, semana ISO, mês) e pré-agregado de pedidos por dia e hora
+        cubo: cubo de agregados (contagem e acumuladores por medida) para os gráficos
+        dados: leitura, limpeza e cache do DataFrame de entregas
+        distancia: distância haversine vetorizada com numpy
+        esquema: esquema do CSV (tipos, valores ausentes, conversores) e projeção de colunas da leitura
+        espacial: grade de células (várias resoluções) para os mapas de densidade das entregas
+        estatisticas: acumuladores combináveis de média, variância, mínimo e máximo (Welford/Chan)
+        filtros: índice para os filtros de data, trânsito e cidade da barra lateral
+        graficos: limite de pontos e de bytes das figuras plotly (mínimo/máximo, WebGL)
+        mapa: HTML dos mapas em cache (por dataset e filtros) e marcadores em lote
+        medicao: tempo e pico de memória das etapas de cada rerun (painel de debug)
+        metricas: todas as métricas do dashboard (tabelas e valores), sem dependência de visualização
+        perfis: perfil de cada entregador (pedidos, avaliação, tempo, por trânsito e clima) com busca por ID
+        quantis: sketch de quantis (baldes logarítmicos) para os percentis do tempo de entrega
+        ranking: entregadores mais rápidos e mais lentos por cidade
+        snapshot: gravação e leitura (memory-map) do DataFrame limpo em formato colunar
+        tabelas: tabelas paginadas no servidor (ordenação, filtro de texto, só a página visível vai ao navegador)
+"""
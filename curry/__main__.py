@@ -0,0 +1,79 @@
+""" Calcula todas as métricas do dashboard para um filtro, sem Streamlit, e grava em JSON e/ou CSV.
+
+        Ex.: python -m curry --data-limite 2022-03-20 --trafego High Jam --cidades Urban --saida metricas
+"""
+
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+from curry.dados import CAMINHO_PADRAO, carregar_dados
+from curry.metricas import OPCOES_CIDADE, OPCOES_TRAFEGO, calcular_metricas
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Data limite padrão: a mesma do slider da barra lateral
+DATA_LIMITE_PADRAO = '2022-04-06'
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def gravar_json(metricas, caminho, filtros):
+    """ Esta função tem a responsabilidade de gravar todas as métricas em um único arquivo JSON
+
+            Input: dict nome -> DataFrame, caminho do arquivo, dict com os filtros usados
+    """
+    conteudo = {'filtros': filtros,
+                'metricas': {nome: json.loads(tabela.to_json(orient='records', date_format='iso'))
+                             for nome, tabela in metricas.items()}}
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(conteudo, arquivo, ensure_ascii=False, indent=2)
+
+
+def gravar_csv(metricas, pasta):
+    """ Esta função tem a responsabilidade de gravar um CSV por métrica
+
+            Input: dict nome -> DataFrame, pasta de saída
+    """
+    for nome, tabela in metricas.items():
+        tabela.to_csv(os.path.join(pasta, f'{nome}.csv'), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m curry',
+                                     description='Calcula as métricas do dashboard da Curry Company para um filtro')
+    parser.add_argument('--dataset', default=CAMINHO_PADRAO, help='CSV de entregas')
+    parser.add_argument('--data-limite', default=DATA_LIMITE_PADRAO,
+                        help='só pedidos antes desta data (AAAA-MM-DD)')
+    parser.add_argument('--trafego', nargs='+', default=OPCOES_TRAFEGO, choices=OPCOES_TRAFEGO)
+    parser.add_argument('--cidades', nargs='+', default=OPCOES_CIDADE, choices=OPCOES_CIDADE)
+    parser.add_argument('--formato', nargs='+', default=['json'], choices=['json', 'csv'])
+    parser.add_argument('--saida', default='metricas', help='pasta de saída')
+    parser.add_argument('--sem-snapshot', action='store_true', help='não lê nem grava o snapshot colunar')
+    parser.add_argument('--processos', type=int, default=None,
+                        help='processos usados na limpeza do CSV (padrão: automático)')
+    args = parser.parse_args()
+
+    data_limite = datetime.strptime(args.data_limite, '%Y-%m-%d')
+    df = carregar_dados(args.dataset, usar_snapshot=not args.sem_snapshot, processos=args.processos)
+    metricas = calcular_metricas(df, data_limite, args.trafego, args.cidades)
+
+    os.makedirs(args.saida, exist_ok=True)
+    if 'json' in args.formato:
+        gravar_json(metricas, os.path.join(args.saida, 'metricas.json'),
+                    {'data_limite': args.data_limite, 'trafego': args.trafego, 'cidades': args.cidades})
+    if 'csv' in args.formato:
+        gravar_csv(metricas, args.saida)
+    print(f'{len(metricas)} métricas gravadas em {args.saida}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import threading
+from collections import OrderedDict
+
+from curry.dados import versao_dados
+from curry.medicao import medir
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Quantidade máxima de resultados de seções guardados no processo (ver por_filtros)
+MAX_SECOES = 256
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+class CacheLRU:
+    """ Esta classe tem a responsabilidade de guardar resultados caros (ex.: HTML de mapas)
+            com tamanho limitado, descartando o item usado há mais tempo
+
+            É compartilhada entre as sessões do Streamlit, por isso usa um lock.
+    """
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self.itens = OrderedDict()
+        self.lock = threading.Lock()
+
+    def obter(self, chave, construir):
+        """ Esta função tem a responsabilidade de devolver o item da chave,
+                construindo-o (fora do lock) só quando ele não estiver no cache
+
+                Input: chave (hashable), função sem argumentos que constrói o item
+                Output: item
+        """
+        with self.lock:
+            if chave in self.itens:
+                self.itens.move_to_end(chave)
+                return self.itens[chave]
+
+        item = construir()
+        with self.lock:
+            self.itens[chave] = item
+            self.itens.move_to_end(chave)
+            while len(self.itens) > self.maximo:
+                self.itens.popitem(last=False)
+        return item
+
+    def limpar(self):
+        with self.lock:
+            self.itens.clear()
+
+    def __len__(self):
+        return len(self.itens)
+
+
+# Resultados de seções das páginas: (versão do dataset, seção, filtros) -> resultado
+_secoes = CacheLRU(MAX_SECOES)
+
+
+def por_filtros(df, secao, filtros, calcular):
+    """ Esta função tem a responsabilidade de guardar o resultado de uma seção de página
+            (tabela, figura...) por versão do dataset e filtros da barra lateral
+
+            Voltar a uma combinação de filtros já vista, ou outra sessão com os
+            mesmos filtros, não recalcula a seção. O resultado é compartilhado
+            entre as sessões: não deve ser alterado.
+
+            Input: DataFrame completo (versão do dataset), nome da seção,
+                   chave dos filtros (curry.filtros.chave_filtros), função sem argumentos que calcula o resultado
+            Output: resultado
+    """
+    def calcular_medido():
+        with medir(f'secao.{secao}'):
+            return calcular()
+    return _secoes.obter((versao_dados(df), secao, filtros), calcular_medido)
@@ -0,0 +1,182 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+from curry.dados import concatenar, derivado, registrar_incremental
+from curry.medicao import medido
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Granularidades de tempo: nome -> rótulo mostrado nos seletores
+GRANULARIDADES = {
+    'dia': 'Dia',
+    'semana': 'Semana (ISO)',
+    'mes': 'Mês',
+    'hora': 'Hora do dia',
+}
+
+# Granularidades que são agrupamentos de dias (saem do total diário pela dimensão calendário)
+GRANULARIDADES_CALENDARIO = ['semana', 'mes']
+
+# Dimensões do pré-agregado de tempo: dia, hora e as dos filtros da barra lateral
+DIMENSOES_TEMPO = ['Order_Date', 'hora', 'City', 'Road_traffic_density']
+
+# Hora de pedidos sem horário conhecido
+HORA_AUSENTE = -1
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def dias_desde_epoca(datas):
+    """ Esta função tem a responsabilidade de converter datas em números inteiros de dia (dias desde 1970-01-01)
+
+            Input: Series ou array de datas (datetime64)
+            Output: array de int64
+    """
+    return np.asarray(datas, dtype='datetime64[D]').astype(np.int64)
+
+
+def hora_do_dia(textos):
+    """ Esta função tem a responsabilidade de extrair a hora (0 a 23) de horários no formato 'HH:MM:SS'
+
+            A conversão roda só sobre os valores distintos (pd.factorize).
+
+            Input: Series de texto
+            Output: array de int8 (HORA_AUSENTE onde o horário não existe ou não é válido)
+    """
+    codigos, valores = pd.factorize(textos, use_na_sentinel=True)
+    horas = pd.to_numeric(pd.Series(valores, dtype=object).astype(str).str.extract(r'^\s*(\d{1,2}):', expand=False),
+                          errors='coerce')
+    horas = horas.where((horas >= 0) & (horas <= 23)).fillna(HORA_AUSENTE).to_numpy(dtype=np.int8)
+    # O código -1 (valor ausente) aponta para o HORA_AUSENTE colocado no final
+    return np.append(horas, np.int8(HORA_AUSENTE))[codigos]
+
+
+def horas_pedido(df):
+    """ Esta função tem a responsabilidade de devolver a hora de cada pedido
+
+            Usa Time_Orderd; quando ele está ausente, a hora da coleta (Time_Order_picked).
+            Sem nenhuma das duas colunas, todas as horas são HORA_AUSENTE.
+
+            Input: DataFrame limpo
+            Output: array de int8
+    """
+    horas = np.full(len(df), HORA_AUSENTE, dtype=np.int8)
+    for coluna in ['Time_Orderd', 'Time_Order_picked']:
+        if coluna in df.columns:
+            faltando = horas == HORA_AUSENTE
+            horas[faltando] = hora_do_dia(df[coluna])[faltando]
+    return horas
+
+
+@functools.lru_cache(maxsize=8)
+def dimensao_calendario(ano_inicio, ano_fim):
+    """ Esta função tem a responsabilidade de montar a dimensão calendário: uma linha por dia
+            dos anos ano_inicio a ano_fim, com a chave inteira de cada granularidade
+
+            dia: dias desde 1970-01-01 (a linha do dia d é d - primeiro dia)
+            semana: ano ISO * 100 + semana ISO (ex.: 202214), semana_inicio: segunda-feira da semana
+            mes: ano * 100 + mês (ex.: 202204), mes_inicio: primeiro dia do mês
+
+            Montada uma vez por intervalo de anos (lru_cache) e compartilhada por todas as sessões.
+
+            Input: primeiro e último ano
+            Output: DataFrame
+    """
+    datas = pd.date_range(f'{ano_inicio}-01-01', f'{ano_fim}-12-31', freq='D')
+    iso = datas.isocalendar()
+    return pd.DataFrame({
+        'dia': dias_desde_epoca(datas),
+        'data': datas,
+        'semana': (iso['year'].to_numpy(dtype=np.int32) * 100 + iso['week'].to_numpy(dtype=np.int32)),
+        'semana_inicio': (datas - pd.to_timedelta(datas.dayofweek, unit='D')),
+        'mes': (datas.year * 100 + datas.month).to_numpy(dtype=np.int32),
+        'mes_inicio': datas.to_period('M').to_timestamp(),
+    })
+
+
+def calendario_dos_dias(dias):
+    """ Esta função tem a responsabilidade de devolver as linhas da dimensão calendário de cada dia
+
+            Input: array de dias (dias_desde_epoca)
+            Output: DataFrame da dimensão calendário, uma linha por dia de entrada (mesma ordem)
+    """
+    anos = np.asarray(dias, dtype='datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970
+    calendario = dimensao_calendario(int(anos.min()), int(anos.max())) if len(anos) else dimensao_calendario(1970, 1970)
+    return calendario.iloc[np.asarray(dias, dtype=np.int64) - calendario['dia'].iloc[0]]
+
+
+@medido('construir_agregado_tempo')
+def construir_agregado_tempo(df):
+    """ Esta função tem a responsabilidade de pré-agregar os pedidos por dia, hora e filtros da barra lateral
+
+            É o nível mais fino das visões de tempo: semana e mês saem da soma
+            dos dias (rollup pela dimensão calendário) e a hora do dia da soma
+            das horas, sem voltar às linhas dos pedidos.
+
+            Input: DataFrame limpo
+            Output: DataFrame com DIMENSOES_TEMPO e 'pedidos'
+    """
+    chaves = df[['Order_Date', 'City', 'Road_traffic_density']].assign(hora=horas_pedido(df))[DIMENSOES_TEMPO]
+    return chaves.groupby(DIMENSOES_TEMPO, observed=True, dropna=False, sort=False) \
+        .size().rename('pedidos').reset_index()
+
+
+def anexar_agregado_tempo(agregado, lote):
+    """ Esta função tem a responsabilidade de atualizar o pré-agregado de tempo com um lote novo de pedidos
+
+            Input: pré-agregado, DataFrame limpo do lote
+            Output: pré-agregado novo
+    """
+    juntos = concatenar(agregado, construir_agregado_tempo(lote))
+    return juntos.groupby(DIMENSOES_TEMPO, observed=True, dropna=False, sort=False)['pedidos'] \
+        .sum().reset_index()
+
+
+def agregado_tempo_dados(df):
+    """ Esta função tem a responsabilidade de devolver o pré-agregado de tempo de um DataFrame,
+            construindo-o só na primeira vez (um por DataFrame carregado)
+    """
+    return derivado(df, 'agregado_tempo', construir_agregado_tempo)
+
+
+@medido('rollup_tempo')
+def rollup(agregado, granularidade):
+    """ Esta função tem a responsabilidade de contar os pedidos por período de uma granularidade
+
+            dia: soma do pré-agregado por dia
+            semana / mes: soma dos totais diários pela chave da dimensão calendário
+            hora: soma do pré-agregado por hora (pedidos sem horário ficam de fora)
+
+            Input: pré-agregado de tempo (filtrado ou não, ver curry.cubo.filtrar_cubo), nome da granularidade
+            Output: DataFrame com 'periodo' (início do período, ou a hora), 'chave' (inteira) e 'pedidos',
+                    em ordem de período
+    """
+    if granularidade == 'hora':
+        horas = agregado.groupby('hora')['pedidos'].sum()
+        horas = horas[horas.index != HORA_AUSENTE]
+        return pd.DataFrame({'periodo': horas.index.to_numpy(), 'chave': horas.index.to_numpy(),
+                             'pedidos': horas.to_numpy()})
+
+    diario = agregado.groupby('Order_Date')['pedidos'].sum()
+    diario = diario[diario > 0]
+    dias = dias_desde_epoca(diario.index)
+    if granularidade == 'dia':
+        return pd.DataFrame({'periodo': diario.index, 'chave': dias, 'pedidos': diario.to_numpy()})
+
+    calendario = calendario_dos_dias(dias)
+    totais = pd.DataFrame({'periodo': calendario[f'{granularidade}_inicio'].to_numpy(),
+                           'chave': calendario[granularidade].to_numpy(),
+                           'pedidos': diario.to_numpy()})
+    return totais.groupby(['chave', 'periodo'], sort=True)['pedidos'].sum().reset_index()[['periodo', 'chave', 'pedidos']]
+
+
+registrar_incremental('agregado_tempo', anexar_agregado_tempo)
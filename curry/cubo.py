@@ -0,0 +1,143 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import pandas as pd
+
+from curry.dados import concatenar, derivado, registrar_incremental
+from curry.estatisticas import CAMPOS, acumular, combinar, resumo
+from curry.medicao import medido
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Dimensões do cubo (week_of_year depende só de Order_Date, então não cria células novas)
+DIMENSOES = ['Order_Date', 'week_of_year', 'City', 'Road_traffic_density',
+             'Festival', 'Weatherconditions', 'Type_of_order']
+
+# Medidas: coluna original -> prefixo das colunas de estatística no cubo
+MEDIDAS = {
+    'Time_taken(min)': 'tempo',
+    'Delivery_person_Ratings': 'avaliacao',
+    'distance_delivery': 'distancia',
+}
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def _presentes(colunas, df):
+    """ Colunas da lista que existem no DataFrame, na mesma ordem
+    """
+    return [coluna for coluna in colunas if coluna in df.columns]
+
+
+@medido('construir_cubo')
+def construir_cubo(df):
+    """ Esta função tem a responsabilidade de pré-agregar os pedidos por todas as DIMENSOES
+
+            Cada célula guarda a quantidade de pedidos e, para cada medida, um
+            acumulador (n, média, M2, mínimo e máximo; ver curry.estatisticas).
+            Os acumuladores podem ser combinados entre células, então média,
+            desvio padrão, mínimo e máximo de qualquer agrupamento são
+            reconstruídos sem voltar às linhas originais.
+            Dimensões e medidas que não foram carregadas (projeção de colunas
+            da página) ficam fora do cubo.
+
+            Input: DataFrame limpo
+            Output: DataFrame com uma linha por célula
+    """
+    dimensoes = _presentes(DIMENSOES, df)
+    chaves = df[dimensoes]
+    valores = pd.DataFrame({prefixo: df[coluna] for coluna, prefixo in MEDIDAS.items() if coluna in df.columns})
+
+    # dropna=False: linhas com dimensão ausente continuam contando nos outros agrupamentos
+    cubo = acumular(valores, chaves)
+    cubo.insert(0, 'pedidos', chaves.groupby(dimensoes, observed=True, dropna=False, sort=False).size())
+    return cubo.reset_index()
+
+
+def _combinar_cubo(cubo, por, prefixos, dropna=True):
+    """ Agrupa as células do cubo por 'por', combinando os acumuladores das medidas em prefixos
+    """
+    partes = [cubo.groupby(por, observed=True, dropna=dropna)['pedidos'].sum()]
+    colunas_por = por if isinstance(por, list) else [por]
+    for prefixo in prefixos:
+        estatisticas = cubo[colunas_por + [f'{prefixo}_{campo}' for campo in CAMPOS]] \
+            .rename(columns={f'{prefixo}_{campo}': campo for campo in CAMPOS})
+        partes.append(combinar(estatisticas, por, dropna=dropna).add_prefix(f'{prefixo}_'))
+    return pd.concat(partes, axis=1)
+
+
+@medido('anexar_cubo')
+def anexar_cubo(cubo, lote):
+    """ Esta função tem a responsabilidade de atualizar o cubo com um lote novo de pedidos
+
+            Só o lote é agregado; os acumuladores das células do lote são
+            combinados com os das células do cubo existente.
+
+            Input: cubo, DataFrame limpo do lote
+            Output: cubo novo
+    """
+    juntos = concatenar(cubo, construir_cubo(lote))
+    prefixos = [prefixo for prefixo in MEDIDAS.values() if f'{prefixo}_{CAMPOS[0]}' in cubo.columns]
+    return _combinar_cubo(juntos, _presentes(DIMENSOES, cubo), prefixos, dropna=False).reset_index()
+
+
+def cubo_dados(df):
+    """ Esta função tem a responsabilidade de devolver o cubo de um DataFrame,
+            construindo-o só na primeira vez (um por DataFrame carregado)
+    """
+    return derivado(df, 'cubo', construir_cubo)
+
+
+@medido('filtrar_cubo')
+def filtrar_cubo(cubo, data_limite, trafego, cidades):
+    """ Esta função tem a responsabilidade de aplicar os filtros da barra lateral às células do cubo
+
+            Input: cubo, datetime limite (exclusivo), lista de condições de trânsito, lista de cidades
+            Output: cubo filtrado
+    """
+    linhas_selecionadas = (cubo['Order_Date'] < data_limite) \
+        & cubo['Road_traffic_density'].isin(trafego) \
+        & cubo['City'].isin(cidades)
+    return cubo.loc[linhas_selecionadas, :]
+
+
+@medido('agregar')
+def agregar(cubo, por, medida=None):
+    """ Esta função tem a responsabilidade de agrupar as células do cubo
+
+            Devolve a quantidade de pedidos por grupo e, se medida for informada
+            (uma coluna de MEDIDAS), também média, desvio padrão amostral, mínimo
+            e máximo dessa medida, iguais aos de groupby().agg(...) nas linhas.
+            Todos os grupos saem da mesma passada sobre as células.
+
+            Input: cubo (filtrado ou não), dimensão ou lista de dimensões, coluna da medida
+            Output: DataFrame com a coluna 'pedidos' e, se houver medida, 'mean', 'std', 'min' e 'max'
+    """
+    prefixos = [] if medida is None else [MEDIDAS[medida]]
+    grupos = _combinar_cubo(cubo, por, prefixos)
+    resultado = grupos[['pedidos']].copy()
+
+    if medida is not None:
+        prefixo = MEDIDAS[medida]
+        estatisticas = resumo(grupos[[f'{prefixo}_{campo}' for campo in CAMPOS]]
+                              .rename(columns={f'{prefixo}_{campo}': campo for campo in CAMPOS}))
+        resultado[['mean', 'std', 'min', 'max']] = estatisticas[['mean', 'std', 'min', 'max']]
+
+    return resultado
+
+
+def agregar_total(cubo, medida=None):
+    """ Esta função tem a responsabilidade de resumir todas as células do cubo em um único grupo
+
+            Input: cubo (filtrado ou não), coluna da medida
+            Output: Series com 'pedidos' e, se houver medida, 'mean', 'std', 'min' e 'max'
+    """
+    resultado = agregar(cubo.assign(total=0), 'total', medida).reindex([0])
+    resultado['pedidos'] = resultado['pedidos'].fillna(0).astype(int)
+    return resultado.iloc[0]
+
+registrar_incremental('cubo', anexar_cubo)
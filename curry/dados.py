@@ -0,0 +1,930 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import hashlib
+import io
+import itertools
+import multiprocessing
+import os
+import sys
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from curry import distancia, esquema
+from curry.distancia import distancia_entrega
+from curry.esquema import COLUNAS_INTEIRAS, COLUNAS_NAN, DERIVADAS, ESQUEMA, colunas_derivadas, colunas_leitura, \
+    opcoes_leitura, semana_do_ano
+from curry.medicao import medido, medir
+from curry.snapshot import EscritorSnapshot, anexar_snapshot, ler_snapshot, salvar_snapshot
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+CAMINHO_PADRAO = "dataset/train.csv"
+
+# Pasta (ao lado do CSV) onde chegam os lotes de pedidos novos, um CSV por lote
+PASTA_LOTES = "lotes"
+
+# Pasta (ao lado do CSV) onde ficam os snapshots colunares do DataFrame limpo
+PASTA_SNAPSHOT = ".snapshot"
+
+# Quanto a limpeza de um bloco ocupa em relação ao bloco bruto lido do CSV
+# (cópias intermediárias de texto, máscaras e colunas novas); usado por limpar_em_blocos
+FATOR_MEMORIA_LIMPEZA = 4
+
+# Tamanho de CSV (bytes) a partir do qual carregar_dados limpa o arquivo em vários processos
+# (abaixo disso, criar os processos custa mais do que a limpeza)
+TAMANHO_MINIMO_PARALELO = 64 * 2**20
+
+# Plano de tipos aplicado no fim da limpeza:
+#   category -> colunas de texto com poucos valores distintos (groupby sobre códigos inteiros)
+#   integer -> menor tipo inteiro que comporta os valores (pd.to_numeric downcast)
+# Order_Date continua datetime64: é usado nas comparações do filtro de data e nos gráficos.
+# As colunas float (avaliação, coordenadas e distância) continuam float64: em float32 os valores
+# mudam (3.9 vira 3.9000000953674316, coordenadas andam ~1e-6 grau) e médias e medianas
+# deixam de bater com as do DataFrame original nas últimas casas.
+PLANO_TIPOS = {
+    'Delivery_person_ID': 'category',
+    'Weatherconditions': 'category',
+    'Road_traffic_density': 'category',
+    'Type_of_order': 'category',
+    'Type_of_vehicle': 'category',
+    'Festival': 'category',
+    'City': 'category',
+    'Delivery_person_Age': 'integer',
+    'Vehicle_condition': 'integer',
+    'multiple_deliveries': 'integer',
+    'Time_taken(min)': 'integer',
+    'week_of_year': 'integer',
+}
+
+# Cache por processo: (caminho, colunas lidas) -> ((mtime, tamanho), lotes, DataFrame limpo, assinatura)
+_cache = {}
+_cache_lock = threading.Lock()
+
+# Um lock por entrada do cache, segurado enquanto ela é carregada: (caminho, colunas lidas) -> Lock
+_cargas = {}
+
+# Estruturas derivadas de um DataFrame (índices, cubos...): (id(df), nome) -> (weakref do df, objeto)
+_derivados = {}
+_derivados_lock = threading.RLock()
+
+# Funções que atualizam uma estrutura derivada com um lote novo: nome -> função
+_incrementais = {}
+
+# Números de versão dos DataFrames carregados (ver versao_dados)
+_versoes = itertools.count(1)
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def _normalizar_texto(serie):
+    """ Remove os espaços das pontas de uma coluna de texto
+
+            As operações de texto rodam só sobre os valores distintos (pd.factorize),
+            que nestas colunas são poucos; o resultado volta para as linhas por índice.
+
+            Output: (códigos por linha, array de valores distintos já sem espaços)
+    """
+    codigos, valores = pd.factorize(serie, use_na_sentinel=True)
+    valores = np.array([v.strip() if isinstance(v, str) else v for v in valores] + [np.nan],
+                       dtype=object)
+    # O código -1 (valor ausente) aponta para o NaN colocado no final
+    return codigos, valores
+
+
+@medido('clean_code')
+def clean_code(df, aplicar_tipos=True, descartes=None):
+    """ Esta função tem a responsabilidade de limpar o DataFrame
+
+            Tipos de limpeza:
+            
+            Remoção dos dados NaN
+            Mudança do tipo da coluna
+            Remoção dos espaços das variáveis de texto
+            Formatação da coluna de datas
+            impeza da coluna de tempo (remoção do texto da variável numérica)
+            Conversão para tipos compactos (PLANO_TIPOS), se aplicar_tipos=True
+
+            A remoção dos espaços e dos NaN é feita em uma única passada:
+            uma máscara combinada para todas as colunas de COLUNAS_NAN e um único corte.
+            Se descartes for um dict, ele recebe quantas linhas cada coluna rejeitou
+            (uma linha pode ser rejeitada por mais de uma) e o total em 'total'.
+            O DataFrame de entrada não é alterado.
+
+            Para DataFrames lidos como texto; a leitura do CSV (ler_csv) já usa
+            o esquema e produz o mesmo resultado sem esta etapa.
+            
+            Input: DataFrame
+            Output: DataFrame  
+    """
+    # REMOVENDO ESPAÇOS DE TODA COLUNA QUE POSSUA TEXTO
+    with medir('limpeza.texto'):
+        texto = {col: _normalizar_texto(df[col]) for col in df.select_dtypes(include='object').columns}
+
+    # REMOVENDO NaN DAS COLUNAS QUE IREI TROCAR OS TIPOS
+    with medir('limpeza.nan'):
+        validas = np.ones(len(df), dtype=bool)
+        for coluna in COLUNAS_NAN:
+            if coluna not in texto:
+                # Coluna lida como número: não tem o texto 'NaN'
+                continue
+            codigos, valores = texto[coluna]
+            invalido = np.array([isinstance(v, str) and v.lower() == 'nan' for v in valores])
+            rejeitadas = invalido[codigos]
+            if descartes is not None:
+                descartes[coluna] = int(rejeitadas.sum())
+            validas &= ~rejeitadas
+
+        linhas = np.flatnonzero(validas)
+        if descartes is not None:
+            descartes['total'] = len(df) - len(linhas)
+
+    # CORTE ÚNICO (JÁ COM O INDEX REINICIADO)
+    with medir('limpeza.corte'):
+        colunas = {}
+        for col in df.columns:
+            if col in texto:
+                codigos, valores = texto[col]
+                colunas[col] = valores.take(codigos[linhas])
+            else:
+                colunas[col] = df[col].to_numpy().take(linhas)
+        df = pd.DataFrame(colunas)
+
+    # ALTERANDO OS TIPOS DAS COLUNAS
+    with medir('limpeza.tipos'):
+        df['Delivery_person_Age'] = df['Delivery_person_Age'].astype(int)
+        df['Delivery_person_Ratings'] = df['Delivery_person_Ratings'].astype(float)
+        df['multiple_deliveries'] = df['multiple_deliveries'].astype(int)
+        df['Order_Date'] = pd.to_datetime(df['Order_Date'], format='%d-%m-%Y')
+
+        # LIMPANDO COLUNA DE TEMPO
+        df['Time_taken(min)'] = df['Time_taken(min)'].astype(str).str.extract(r'(\d+)')
+        df['Time_taken(min)'] = pd.to_numeric(df['Time_taken(min)'], errors='coerce')
+
+        # ADICIONANDO COLUNA DIA DA SEMANA
+        df['week_of_year'] = semana_do_ano(df['Order_Date'])
+
+    # DISTÂNCIA ENTRE RESTAURANTE E LOCAL DE ENTREGA
+    with medir('limpeza.distancia'):
+        df['distance_delivery'] = distancia_entrega(df)
+
+    # CONVERTENDO PARA TIPOS COMPACTOS
+    with medir('limpeza.plano_tipos'):
+        if aplicar_tipos:
+            df = aplicar_plano_tipos(df)
+
+    return df
+
+
+@medido('aplicar_esquema')
+def aplicar_esquema(bruto, descartes=None):
+    """ Esta função tem a responsabilidade de terminar a limpeza de um DataFrame lido
+            com opcoes_leitura (curry.esquema)
+
+            O parser já entrega números, categorias e NaN nos valores ausentes;
+            aqui só rodam os conversores de cada coluna (sobre os valores
+            distintos), o descarte das linhas ausentes em COLUNAS_NAN (um único
+            corte), as colunas derivadas cujas dependências foram lidas e o
+            plano de tipos compactos. O resultado é o mesmo de clean_code sobre
+            o CSV lido como texto, só com as colunas lidas.
+            Se descartes for um dict, ele recebe as contagens como em clean_code.
+
+            Input: DataFrame lido com opcoes_leitura
+            Output: DataFrame limpo
+    """
+    # CONVERSORES DO ESQUEMA (COLUNAS FORA DO ESQUEMA SÓ PERDEM OS ESPAÇOS)
+    with medir('limpeza.conversores'):
+        colunas = {}
+        for coluna in bruto.columns:
+            _, converter, _ = ESQUEMA.get(coluna, (None, None, None))
+            if coluna not in ESQUEMA and bruto[coluna].dtype == object:
+                converter = esquema._texto
+            colunas[coluna] = bruto[coluna].to_numpy() if converter is None else converter(bruto[coluna])
+
+    # REMOVENDO AS LINHAS AUSENTES DAS COLUNAS QUE IREI TROCAR OS TIPOS
+    with medir('limpeza.nan'):
+        validas = np.ones(len(bruto), dtype=bool)
+        for coluna in COLUNAS_NAN:
+            if coluna not in colunas:
+                continue
+            rejeitadas = pd.isna(colunas[coluna])
+            if descartes is not None:
+                descartes[coluna] = int(rejeitadas.sum())
+            validas &= ~rejeitadas
+
+        linhas = np.flatnonzero(validas)
+        if descartes is not None:
+            descartes['total'] = len(bruto) - len(linhas)
+
+    # CORTE ÚNICO (JÁ COM O INDEX REINICIADO)
+    with medir('limpeza.corte'):
+        df = pd.DataFrame({coluna: valores.take(linhas) for coluna, valores in colunas.items()})
+        # Categorias que só existiam nas linhas descartadas saem (como em astype('category') depois do corte)
+        for coluna in df.select_dtypes(include='category').columns:
+            df[coluna] = df[coluna].cat.remove_unused_categories()
+        for coluna in COLUNAS_INTEIRAS:
+            if coluna in df.columns and not df[coluna].isna().any():
+                df[coluna] = df[coluna].astype(np.int64)
+
+    # COLUNAS DERIVADAS (SEMANA DO ANO, DISTÂNCIA)
+    with medir('limpeza.derivadas'):
+        for coluna in colunas_derivadas(list(df.columns)):
+            df[coluna] = DERIVADAS[coluna][1](df)
+
+    # CONVERTENDO PARA TIPOS COMPACTOS
+    with medir('limpeza.plano_tipos'):
+        df = aplicar_plano_tipos(df)
+
+    return df
+
+
+def ler_csv(origem, colunas=None, descartes=None):
+    """ Esta função tem a responsabilidade de ler e limpar um CSV de entregas pelo esquema
+
+            Só as colunas necessárias para as colunas pedidas são lidas
+            (curry.esquema.colunas_leitura), já com os tipos do esquema.
+
+            Input: caminho ou arquivo aberto do CSV, lista de colunas (None = todas),
+                   dict opcional para as contagens de descarte
+            Output: DataFrame limpo
+    """
+    with medir('leitura_csv'):
+        bruto = pd.read_csv(origem, **opcoes_leitura(colunas))
+    return aplicar_esquema(bruto, descartes=descartes)
+
+
+def aplicar_plano_tipos(df, plano=PLANO_TIPOS):
+    """ Esta função tem a responsabilidade de converter as colunas para os tipos do plano
+
+            Colunas do plano que não existem no DataFrame são ignoradas.
+
+            Input: DataFrame, dict coluna -> 'category' | 'integer' | 'float'
+            Output: DataFrame
+    """
+    df = df.copy(deep=False)
+    for coluna, tipo in plano.items():
+        if coluna not in df.columns:
+            continue
+        if tipo == 'category':
+            df[coluna] = df[coluna].astype('category')
+        else:
+            df[coluna] = pd.to_numeric(df[coluna], downcast=tipo)
+    return df
+
+
+def relatorio_memoria(antes, depois):
+    """ Esta função tem a responsabilidade de comparar o uso de memória por coluna
+            entre dois DataFrames (ex.: antes e depois de aplicar_plano_tipos)
+
+            Input: DataFrame antes, DataFrame depois
+            Output: DataFrame com tipo e bytes de cada coluna e a redução percentual
+    """
+    bytes_antes = antes.memory_usage(index=False, deep=True)
+    bytes_depois = depois.memory_usage(index=False, deep=True)
+
+    relatorio = pd.DataFrame({
+        'tipo_antes': antes.dtypes.astype(str),
+        'tipo_depois': depois.dtypes.astype(str),
+        'bytes_antes': bytes_antes,
+        'bytes_depois': bytes_depois,
+    })
+    relatorio.loc['TOTAL', ['bytes_antes', 'bytes_depois']] = [bytes_antes.sum(), bytes_depois.sum()]
+    relatorio['reducao_%'] = (100 * (1 - relatorio['bytes_depois'] / relatorio['bytes_antes'])).round(1)
+    return relatorio
+
+
+def versao_limpeza():
+    """ Esta função tem a responsabilidade de identificar a versão da lógica de limpeza
+
+            É um hash do código-fonte dos módulos usados pela limpeza, então
+            qualquer alteração em clean_code invalida os snapshots antigos.
+
+            Output: str
+    """
+    hash_codigo = hashlib.sha1()
+    for modulo in (__file__, distancia.__file__, esquema.__file__):
+        with open(modulo, 'rb') as arquivo:
+            hash_codigo.update(arquivo.read())
+    return hash_codigo.hexdigest()
+
+
+def caminho_snapshot(caminho, colunas=None):
+    """ Esta função tem a responsabilidade de indicar a pasta do snapshot de um CSV
+
+            Cada projeção de colunas tem o seu snapshot.
+            Ex.: dataset/train.csv -> dataset/.snapshot/train
+                 dataset/train.csv, colunas -> dataset/.snapshot/train-<hash das colunas lidas>
+    """
+    pasta, arquivo = os.path.split(os.path.abspath(caminho))
+    nome = os.path.splitext(arquivo)[0]
+    lidas = colunas_leitura(colunas)
+    if lidas is not None:
+        nome += '-' + hashlib.sha1('\0'.join(lidas).encode()).hexdigest()[:10]
+    return os.path.join(pasta, PASTA_SNAPSHOT, nome)
+
+
+def pasta_lotes(caminho):
+    """ Esta função tem a responsabilidade de indicar a pasta dos lotes de pedidos novos de um CSV
+
+            Ex.: dataset/train.csv -> dataset/lotes/train
+    """
+    pasta, arquivo = os.path.split(os.path.abspath(caminho))
+    return os.path.join(pasta, PASTA_LOTES, os.path.splitext(arquivo)[0])
+
+
+def _listar_lotes(caminho):
+    """ Lista os CSVs de lotes do dataset em ordem de nome: [(nome, mtime_ns, tamanho), ...]
+    """
+    try:
+        entradas = [e for e in os.scandir(pasta_lotes(caminho))
+                    if e.is_file() and e.name.endswith('.csv')]
+    except FileNotFoundError:
+        return []
+    lotes = []
+    for entrada in sorted(entradas, key=lambda e: e.name):
+        stat = entrada.stat()
+        lotes.append((entrada.name, stat.st_mtime_ns, stat.st_size))
+    return lotes
+
+
+def _limpar_lote(caminho, nome, colunas=None):
+    """ Lê e limpa um único arquivo de lote (só as colunas da projeção)
+    """
+    return ler_csv(os.path.join(pasta_lotes(caminho), nome), colunas)
+
+
+def concatenar(base, lote):
+    """ Esta função tem a responsabilidade de juntar dois DataFrames já limpos
+
+            Colunas categóricas são unidas com union_categoricals, que só recodifica
+            os códigos inteiros; as linhas já limpas não passam pela limpeza de novo.
+
+            Input: DataFrame limpo (histórico), DataFrame limpo (lote novo)
+            Output: DataFrame
+    """
+    return concatenar_partes([base, lote])
+
+
+def concatenar_partes(partes):
+    """ Esta função tem a responsabilidade de juntar vários DataFrames já limpos, em ordem
+            (ver concatenar)
+
+            Input: lista de DataFrames limpos
+            Output: DataFrame
+    """
+    colunas = {}
+    for coluna in partes[0].columns:
+        series = [parte[coluna] for parte in partes]
+        if all(isinstance(serie.dtype, pd.CategoricalDtype) for serie in series):
+            colunas[coluna] = union_categoricals(series, sort_categories=True)
+        else:
+            colunas[coluna] = np.concatenate([serie.to_numpy() for serie in series])
+    return pd.DataFrame(colunas)
+
+
+def linhas_por_bloco(caminho, memoria_mb, colunas=None):
+    """ Esta função tem a responsabilidade de estimar quantas linhas do CSV cabem
+            em um bloco para que a limpeza do bloco fique dentro de memoria_mb
+
+            A estimativa usa o tamanho em memória das primeiras linhas do arquivo
+            (como texto, só as colunas lidas na projeção).
+
+            Input: caminho do CSV, orçamento de memória em MB, lista de colunas (None = todas)
+            Output: int
+    """
+    amostra = pd.read_csv(caminho, nrows=1000, usecols=colunas_leitura(colunas))
+    bytes_por_linha = max(1, amostra.memory_usage(index=False, deep=True).sum() / max(1, len(amostra)))
+    return max(1000, int(memoria_mb * 2**20 / (bytes_por_linha * FATOR_MEMORIA_LIMPEZA)))
+
+
+def limpar_em_blocos(caminhos, destino, metadados, memoria_mb, descartes=None, colunas=None):
+    """ Esta função tem a responsabilidade de limpar CSVs maiores que a memória
+
+            Os CSVs são lidos em blocos (pd.read_csv com chunksize, já com os tipos
+            do esquema), cada bloco passa por aplicar_esquema e é gravado direto
+            no snapshot colunar em disco.
+            A memória usada na limpeza depende de memoria_mb e não do tamanho dos arquivos.
+            O resultado é idêntico ao de limpar cada CSV inteiro e juntar com concatenar.
+
+            Input: lista de caminhos de CSV, pasta do snapshot, metadados do snapshot,
+                   orçamento de memória em MB, dict opcional para as contagens de descarte,
+                   lista de colunas (None = todas)
+            Output: DataFrame aberto do snapshot (colunas numéricas, categóricas e de texto em memory-map)
+    """
+    escritor = EscritorSnapshot(destino, metadados)
+    try:
+        for caminho in caminhos:
+            for bloco in pd.read_csv(caminho, chunksize=linhas_por_bloco(caminho, memoria_mb, colunas),
+                                     **opcoes_leitura(colunas)):
+                descartes_bloco = {}
+                escritor.anexar(aplicar_esquema(bloco, descartes=descartes_bloco))
+                if descartes is not None:
+                    for regra, quantidade in descartes_bloco.items():
+                        descartes[regra] = descartes.get(regra, 0) + quantidade
+    except BaseException:
+        escritor.descartar()
+        raise
+    escritor.finalizar()
+    return ler_snapshot(destino, metadados, texto_mapeado=True)
+
+
+def particoes_csv(caminho, quantidade):
+    """ Esta função tem a responsabilidade de dividir um CSV em faixas de bytes
+            que começam e terminam em fim de linha
+
+            O cabeçalho fica fora das faixas. Assume que nenhum campo tem
+            quebra de linha dentro de aspas (o caso dos CSVs de entregas).
+
+            Input: caminho do CSV, quantidade de partes desejada
+            Output: (bytes do cabeçalho, lista de (início, fim) em bytes)
+    """
+    tamanho = os.path.getsize(caminho)
+    with open(caminho, 'rb') as arquivo:
+        cabecalho = arquivo.readline()
+        inicio = arquivo.tell()
+        passo = max(1, (tamanho - inicio) // max(1, quantidade))
+
+        faixas = []
+        while inicio < tamanho:
+            arquivo.seek(min(inicio + passo, tamanho))
+            if arquivo.tell() < tamanho:
+                arquivo.readline()  # avança até o fim da linha atual
+            fim = min(arquivo.tell(), tamanho)
+            faixas.append((inicio, fim))
+            inicio = fim
+    return cabecalho, faixas
+
+
+def _limpar_particao(caminho, cabecalho, inicio, fim, colunas=None):
+    """ Lê e limpa uma faixa de bytes do CSV, com o cabeçalho na frente (roda no processo filho)
+    """
+    with open(caminho, 'rb') as arquivo:
+        arquivo.seek(inicio)
+        conteudo = arquivo.read(fim - inicio)
+    descartes = {}
+    df = ler_csv(io.BytesIO(cabecalho + conteudo), colunas, descartes=descartes)
+    return df, descartes
+
+
+def _contexto_processos():
+    """ Processos da limpeza paralela criados pelo forkserver (ou spawn, onde não existe)
+
+            Com fork, o filho herda travado qualquer lock que outra thread do servidor
+            (outra sessão medindo uma etapa, logging, pandas) segurava no momento do fork.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    contexto = multiprocessing.get_context('forkserver')
+    # O servidor (sem threads) importa pandas e a limpeza uma vez; cada processo novo já nasce com eles
+    contexto.set_forkserver_preload([__name__])
+    return contexto
+
+
+def limpar_em_paralelo(caminho, processos=None, descartes=None, colunas=None):
+    """ Esta função tem a responsabilidade de ler e limpar um CSV usando vários núcleos
+
+            O arquivo é dividido em faixas de bytes (particoes_csv); cada faixa é
+            lida e limpa por ler_csv em um processo separado, e as partes são
+            juntadas na ordem original com concatenar_partes. O resultado é
+            idêntico ao de ler_csv(caminho, colunas).
+
+            Input: caminho do CSV, quantidade de processos (None = todos os núcleos),
+                   dict opcional para as contagens de descarte, lista de colunas (None = todas)
+            Output: DataFrame limpo
+    """
+    processos = processos or os.cpu_count() or 1
+    cabecalho, faixas = particoes_csv(caminho, processos)
+    if len(faixas) <= 1:
+        df, descartes_parte = _limpar_particao(caminho, cabecalho, *(faixas[0] if faixas else (0, 0)), colunas)
+        partes = [(df, descartes_parte)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processos, len(faixas)), mp_context=_contexto_processos()) as executor:
+            partes = list(executor.map(_limpar_particao, itertools.repeat(caminho), itertools.repeat(cabecalho),
+                                       [inicio for inicio, _ in faixas], [fim for _, fim in faixas],
+                                       itertools.repeat(colunas)))
+
+    if descartes is not None:
+        for _, descartes_parte in partes:
+            for regra, quantidade in descartes_parte.items():
+                descartes[regra] = descartes.get(regra, 0) + quantidade
+    return concatenar_partes([df for df, _ in partes])
+
+
+def carregar_dados(caminho=CAMINHO_PADRAO, usar_snapshot=True, memoria_mb=None, processos=None, colunas=None):
+    """ Esta função tem a responsabilidade de ler o CSV e devolver o DataFrame já limpo
+
+            O CSV é lido pelo esquema (curry.esquema): com colunas, só as colunas
+            necessárias para elas passam pelo parser (ver colunas_leitura), já
+            com os tipos finais. Cada página declara as colunas que usa.
+
+            O resultado fica em cache no processo e só é recalculado quando
+            o mtime ou o tamanho do arquivo mudam, assim cada interação
+            com os filtros não precisa ler e limpar o CSV de novo. A limpeza roda
+            fora do lock do cache: enquanto um dataset é carregado, as outras
+            sessões continuam lendo o que já está em cache.
+
+            Pedidos novos chegam como arquivos CSV na pasta de lotes (pasta_lotes).
+            Quando aparecem lotes novos, só eles são lidos e limpos e são
+            anexados ao DataFrame em cache; as estruturas derivadas registradas
+            com registrar_incremental (ex.: cubo) são atualizadas só com o lote.
+            Se um lote já carregado mudar ou sumir, tudo é recarregado.
+
+            Com usar_snapshot=True, um processo novo abre o snapshot colunar
+            em disco (memory-map) em vez de limpar o CSV; se o snapshot não
+            existir ou estiver desatualizado, ele é regravado após a limpeza.
+            Lotes novos são acrescentados ao snapshot existente (anexar_snapshot),
+            sem regravar as linhas que já estavam nele.
+
+            Com memoria_mb, o CSV principal e os lotes são limpos em blocos
+            (limpar_em_blocos) direto para o snapshot, para arquivos que não cabem na memória;
+            o DataFrame fica aberto do snapshot (inclusive o texto) e os lotes novos
+            são acrescentados ao snapshot em blocos (anexar_em_blocos).
+
+            Sem snapshot válido, CSVs a partir de TAMANHO_MINIMO_PARALELO bytes são
+            limpos em vários processos (limpar_em_paralelo), quando há mais de um núcleo.
+            processos=1 força a limpeza em um único processo.
+
+            O DataFrame devolvido é compartilhado entre as sessões e fica somente
+            leitura (congelar); se alguma página alterar as colunas dele, a próxima
+            chamada gera RuntimeError e descarta o DataFrame do cache (a seguinte
+            carrega os dados de novo).
+
+            Input: caminho do CSV, usar snapshot em disco, orçamento de memória em MB (opcional),
+                   quantidade de processos da limpeza (None = automático), lista de colunas (None = todas)
+            Output: DataFrame  
+    """
+    caminho = os.path.abspath(caminho)
+    stat = os.stat(caminho)
+    chave = (stat.st_mtime_ns, stat.st_size)
+    lotes = _listar_lotes(caminho)
+    lidas = colunas_leitura(colunas)
+    chave_cache = (caminho, None if lidas is None else tuple(lidas))
+
+    with _cache_lock:
+        item = _cache.get(chave_cache)
+        if item is not None and _assinatura(item[2]) != item[3]:
+            # O ERRO É INFORMADO UMA VEZ E A ENTRADA SAI DO CACHE: A PRÓXIMA CHAMADA RECARREGA OS DADOS
+            del _cache[chave_cache]
+            raise RuntimeError(f'O DataFrame compartilhado de {caminho} foi alterado por alguma página; '
+                               'as funções de análise não podem alterar o DataFrame de entrada')
+        if item is not None and item[0] == chave and item[1] == lotes:
+            return item[2]
+        carga = _cargas.setdefault(chave_cache, threading.Lock())
+
+    # A LIMPEZA RODA FORA DO _cache_lock: SÓ QUEM PEDE O MESMO DATASET (E PROJEÇÃO) ESPERA POR ELA
+    with carga:
+        with _cache_lock:
+            item = _cache.get(chave_cache)
+        if item is not None and item[0] == chave and item[1] == lotes:
+            return item[2]  # carregado por outra thread enquanto esta esperava
+
+        destino = caminho_snapshot(caminho, colunas)
+        metadados = {'origem': os.path.basename(caminho),
+                     'colunas': lidas,
+                     'mtime_ns': stat.st_mtime_ns,
+                     'tamanho': stat.st_size,
+                     'lotes': [list(lote) for lote in lotes],
+                     'versao_limpeza': versao_limpeza()}
+
+        gravar_snapshot = usar_snapshot
+        df = None
+        incremental = item is not None and item[0] == chave and lotes[:len(item[1])] == item[1]
+        if incremental and memoria_mb is not None:
+            # LOTES NOVOS LIMPOS EM BLOCOS DIRETO NO SNAPSHOT: O HISTÓRICO FICA NO MEMORY-MAP
+            df = item[2]
+            gravar_snapshot = False
+            anteriores = {**metadados, 'lotes': [list(entrada) for entrada in item[1]]}
+            for posicao in range(len(item[1]), len(lotes)):
+                novos = {**metadados, 'lotes': [list(entrada) for entrada in lotes[:posicao + 1]]}
+                try:
+                    with medir('lotes.anexar_em_blocos'):
+                        df = anexar_em_blocos(df, os.path.join(pasta_lotes(caminho), lotes[posicao][0]), destino,
+                                              anteriores, novos, memoria_mb, colunas)
+                except OSError:
+                    df = None
+                if df is None:
+                    break  # o snapshot é refeito inteiro abaixo
+                anteriores = novos
+        elif incremental:
+            # SÓ OS LOTES NOVOS PASSAM PELA LIMPEZA
+            df = item[2]
+            # E SÓ AS LINHAS DELES SÃO ACRESCENTADAS AO SNAPSHOT EM DISCO
+            anteriores = {**metadados, 'lotes': [list(entrada) for entrada in item[1]]}
+            gravar_snapshot = False
+            for posicao in range(len(item[1]), len(lotes)):
+                lote = _limpar_lote(caminho, lotes[posicao][0], colunas)
+                with medir('lotes.anexar'):
+                    df = anexar(df, lote)
+                if usar_snapshot and not gravar_snapshot:
+                    novos = {**metadados, 'lotes': [list(entrada) for entrada in lotes[:posicao + 1]]}
+                    try:
+                        with medir('snapshot.anexar'):
+                            anexado = anexar_snapshot(destino, anteriores, lote, novos)
+                    except OSError:
+                        anexado = False
+                    # Sem o snapshot anterior (ou com erro), ele é gravado inteiro no final
+                    gravar_snapshot = not anexado
+                    anteriores = novos
+        if df is None:
+            with medir('snapshot.leitura'):
+                df = ler_snapshot(destino, metadados, texto_mapeado=memoria_mb is not None) if usar_snapshot else None
+            if df is not None:
+                gravar_snapshot = False  # o snapshot em disco já está atualizado
+            elif memoria_mb is not None:
+                arquivos = [caminho] + [os.path.join(pasta_lotes(caminho), nome) for nome, _, _ in lotes]
+                with medir('limpeza_em_blocos'):
+                    df = limpar_em_blocos(arquivos, destino, metadados, memoria_mb, colunas=colunas)
+                gravar_snapshot = False  # a limpeza em blocos já grava o snapshot
+            else:
+                processos = processos or ((os.cpu_count() or 1) if stat.st_size >= TAMANHO_MINIMO_PARALELO else 1)
+                if processos > 1:
+                    with medir('limpeza_paralela'):
+                        df = limpar_em_paralelo(caminho, processos, colunas=colunas)
+                else:
+                    df = ler_csv(caminho, colunas)
+                for nome, _, _ in lotes:
+                    df = concatenar(df, _limpar_lote(caminho, nome, colunas))
+
+        if gravar_snapshot:
+            try:
+                with medir('snapshot.gravacao'):
+                    salvar_snapshot(df, destino, metadados)
+            except OSError:
+                # Sem permissão de escrita: segue só com o cache em memória
+                pass
+
+        congelar(df)
+        with _cache_lock:
+            _cache[chave_cache] = (chave, lotes, df, _assinatura(df))
+        return df
+
+
+def _arrays_coluna(serie):
+    """ Arrays numpy que guardam os valores de uma coluna (os códigos, se for categórica)
+
+            Colunas do Arrow (texto mapeado do snapshot) não têm arrays numpy: a lista fica vazia.
+    """
+    if isinstance(serie.dtype, pd.ArrowDtype):
+        return []
+    valores = serie.array.codes if isinstance(serie.dtype, pd.CategoricalDtype) else serie.to_numpy()
+    arrays = []
+    while isinstance(valores, np.ndarray):
+        arrays.append(valores)
+        valores = valores.base
+    return arrays
+
+
+def congelar(df):
+    """ Esta função tem a responsabilidade de deixar os valores de um DataFrame somente leitura
+
+            Os arrays de todas as colunas ficam com writeable=False: escrever
+            direto no DataFrame compartilhado, ou em uma fatia de linhas dele
+            (que é uma visão), gera erro em vez de alterar os dados de todas as
+            sessões. Trocar uma coluna inteira (df[coluna] = ...) não escreve nos
+            arrays e continua permitido em cópias e seleções.
+
+            Input: DataFrame
+            Output: o mesmo DataFrame
+    """
+    for coluna in df.columns:
+        for array in _arrays_coluna(df[coluna]):
+            array.flags.writeable = False
+    # Os blocos 2D do pandas são outra visão dos mesmos dados (é neles que o pandas escreve):
+    # congelar só a base e as colunas não impede a escrita pelo bloco
+    for valores in df._mgr.arrays:
+        if isinstance(valores, np.ndarray):
+            valores.flags.writeable = False
+    return df
+
+
+def _assinatura(df):
+    """ Colunas, tipos e arrays de um DataFrame: muda se uma coluna for criada, removida ou trocada
+    """
+    return tuple((coluna, str(df[coluna].dtype), id(_base_coluna(df[coluna]))) for coluna in df.columns)
+
+
+def _base_coluna(serie):
+    """ Objeto que guarda os valores de uma coluna: o array numpy de base ou, no Arrow, o ChunkedArray (imutável)
+    """
+    arrays = _arrays_coluna(serie)
+    return arrays[-1] if arrays else serie.array.__arrow_array__()
+
+
+def _bytes(objeto, vistos):
+    """ Bytes de DataFrames e arrays dentro de objeto (dicts, listas, atributos), sem contar um array duas vezes
+    """
+    if isinstance(objeto, np.ndarray):
+        while isinstance(objeto.base, np.ndarray):
+            objeto = objeto.base
+    if id(objeto) in vistos:
+        return 0
+    vistos.add(id(objeto))
+
+    if isinstance(objeto, np.ndarray):
+        return objeto.nbytes
+    if isinstance(objeto, pd.DataFrame):
+        total = 0
+        for coluna in objeto.columns:
+            serie = objeto[coluna]
+            arrays = _arrays_coluna(serie)
+            if isinstance(serie.dtype, pd.ArrowDtype):
+                if ('arrow', id(_base_coluna(serie))) not in vistos:
+                    vistos.add(('arrow', id(_base_coluna(serie))))
+                    total += serie.array.nbytes
+                continue
+            if serie.dtype == object and ('textos', arrays[0].ctypes.data) not in vistos:
+                # memory_usage(deep=True) não aceita arrays somente leitura: soma os textos direto
+                vistos.add(('textos', arrays[0].ctypes.data))
+                total += sum(map(sys.getsizeof, arrays[0]))
+            elif isinstance(serie.dtype, pd.CategoricalDtype):
+                total += serie.cat.categories.memory_usage(deep=True)
+            total += _bytes(arrays[-1], vistos)
+        return total
+    if isinstance(objeto, dict):
+        return sum(_bytes(valor, vistos) for valor in objeto.values())
+    if isinstance(objeto, (list, tuple)):
+        return sum(_bytes(valor, vistos) for valor in objeto)
+    if hasattr(objeto, '__dict__'):
+        return _bytes(vars(objeto), vistos)
+    return 0
+
+
+def memoria_compartilhada():
+    """ Esta função tem a responsabilidade de medir a memória que o processo usa com os dados
+            compartilhados por todas as sessões: os DataFrames do cache e as
+            estruturas derivadas (índices, cubos, sketches, grades)
+
+            Arrays compartilhados entre estruturas contam uma vez só. Colunas
+            abertas do snapshot (memory-map) contam pelo tamanho, mesmo que o
+            sistema ainda não as tenha lido do disco.
+
+            Output: dict com 'dados_mb', 'derivados_mb' e 'total_mb'
+    """
+    vistos = set()
+    with _cache_lock:
+        dados = sum(_bytes(item[2], vistos) for item in _cache.values())
+    with _derivados_lock:
+        derivados = sum(_bytes(objeto, vistos) for _, objeto in list(_derivados.values()))
+    return {'dados_mb': dados / 2**20, 'derivados_mb': derivados / 2**20, 'total_mb': (dados + derivados) / 2**20}
+
+
+def anexar(df, lote):
+    """ Esta função tem a responsabilidade de anexar um lote já limpo ao DataFrame
+
+            As estruturas derivadas de df registradas com registrar_incremental
+            são atualizadas com o lote e passam a valer para o novo DataFrame.
+
+            Input: DataFrame limpo (histórico), DataFrame limpo (lote novo)
+            Output: novo DataFrame (df não é alterado)
+    """
+    novo = concatenar(df, lote)
+    with _derivados_lock:
+        for nome, objeto in _atualizar_derivados(_derivados_incrementais(df), lote).items():
+            _guardar_derivado(novo, nome, objeto)
+    return novo
+
+
+def _derivados_incrementais(df):
+    """ Estruturas derivadas de df que sabem se atualizar com um lote (registrar_incremental): {nome: estrutura}
+    """
+    with _derivados_lock:
+        return {nome: objeto for (id_df, nome), (ref, objeto) in list(_derivados.items())
+                if id_df == id(df) and ref() is df and nome in _incrementais}
+
+
+def _atualizar_derivados(estruturas, lote):
+    """ Atualiza cada estrutura de {nome: estrutura} com um lote limpo
+    """
+    return {nome: _incrementais[nome](objeto, lote) for nome, objeto in estruturas.items()}
+
+
+def anexar_em_blocos(df, caminho_lote, destino, metadados, novos_metadados, memoria_mb, colunas=None):
+    """ Esta função tem a responsabilidade de anexar um lote ao snapshot de um DataFrame aberto
+            em memory-map, sem trazer as colunas do histórico para a memória
+
+            O lote é limpo em blocos (como em limpar_em_blocos) e cada bloco é
+            acrescentado aos arquivos do snapshot (anexar_snapshot); as estruturas
+            derivadas registradas com registrar_incremental são atualizadas bloco
+            a bloco. No final o snapshot é aberto de novo, já com as linhas do lote.
+            Enquanto o lote não termina, o snapshot fica com metadados parciais:
+            se o processo parar no meio, o snapshot é refeito na próxima carga.
+
+            Input: DataFrame aberto do snapshot, caminho do CSV do lote, pasta do snapshot,
+                   metadados atuais e depois do lote, orçamento de memória em MB,
+                   lista de colunas (None = todas)
+            Output: novo DataFrame aberto do snapshot, ou None se o snapshot não pôde ser anexado
+    """
+    estruturas = _derivados_incrementais(df)
+    atuais, ultimo = metadados, None
+    blocos = pd.read_csv(caminho_lote, chunksize=linhas_por_bloco(caminho_lote, memoria_mb, colunas),
+                         **opcoes_leitura(colunas))
+    for numero, bloco in enumerate(blocos):
+        ultimo = aplicar_esquema(bloco)
+        parciais = {**novos_metadados, 'blocos_anexados': numero + 1}
+        if not anexar_snapshot(destino, atuais, ultimo, parciais):
+            return None
+        estruturas = _atualizar_derivados(estruturas, ultimo)
+        atuais = parciais
+    # Um bloco vazio só troca os metadados parciais pelos finais
+    if ultimo is None or not anexar_snapshot(destino, atuais, ultimo.iloc[:0], novos_metadados):
+        return None
+
+    novo = ler_snapshot(destino, novos_metadados, texto_mapeado=True)
+    if novo is not None:
+        with _derivados_lock:
+            for nome, objeto in estruturas.items():
+                _guardar_derivado(novo, nome, objeto)
+    return novo
+
+
+def salvar_lote(pedidos, caminho=CAMINHO_PADRAO, nome=None):
+    """ Esta função tem a responsabilidade de gravar um lote de pedidos novos (ainda brutos,
+            no mesmo formato do CSV original) na pasta de lotes do dataset
+
+            O arquivo é gravado com nome temporário e renomeado no final, então
+            carregar_dados nunca lê um lote pela metade. Os lotes são anexados
+            em ordem de nome; o padrão é um carimbo de data/hora.
+
+            Input: DataFrame bruto, caminho do CSV principal, nome do arquivo (opcional)
+            Output: caminho do lote gravado
+    """
+    pasta = pasta_lotes(caminho)
+    os.makedirs(pasta, exist_ok=True)
+    if nome is None:
+        nome = datetime.now().strftime('%Y%m%d-%H%M%S-%f') + '.csv'
+
+    final = os.path.join(pasta, nome)
+    temporario = os.path.join(pasta, '.' + nome + '.tmp')
+    pedidos.to_csv(temporario, index=False)
+    os.replace(temporario, final)
+    return final
+
+
+def limpar_cache():
+    """ Esta função tem a responsabilidade de descartar os DataFrames guardados em cache
+    """
+    with _cache_lock:
+        _cache.clear()
+
+
+def _guardar_derivado(df, nome, objeto):
+    """ Guarda a estrutura derivada de df; a entrada some junto com o DataFrame
+    """
+    if isinstance(objeto, pd.DataFrame):
+        congelar(objeto)
+    chave = (id(df), nome)
+    _derivados[chave] = (weakref.ref(df, lambda _: _derivados.pop(chave, None)), objeto)
+
+
+def derivado(df, nome, construir):
+    """ Esta função tem a responsabilidade de guardar estruturas calculadas a partir
+            de um DataFrame (índice de filtros, cubo de agregados...), construindo
+            cada uma só na primeira vez que é pedida para aquele DataFrame
+
+            A entrada é descartada quando o DataFrame deixa de existir.
+
+            Input: DataFrame, nome da estrutura, função df -> estrutura
+            Output: estrutura
+    """
+    with _derivados_lock:
+        item = _derivados.get((id(df), nome))
+        if item is not None and item[0]() is df:
+            return item[1]
+
+        objeto = construir(df)
+        _guardar_derivado(df, nome, objeto)
+        return objeto
+
+
+def versao_dados(df):
+    """ Esta função tem a responsabilidade de identificar a versão do dataset de um DataFrame
+
+            Cada DataFrame carregado (inclusive o que resulta de anexar um lote)
+            recebe um número novo, que serve de chave para caches de resultados
+            calculados a partir dele (ex.: HTML do mapa).
+
+            Input: DataFrame limpo
+            Output: int
+    """
+    return derivado(df, 'versao', lambda _: next(_versoes))
+
+
+def registrar_incremental(nome, atualizar):
+    """ Esta função tem a responsabilidade de registrar como uma estrutura derivada
+            é atualizada quando um lote novo é anexado (ver anexar)
+
+            Estruturas sem registro são reconstruídas na próxima vez que forem pedidas.
+
+            Input: nome usado em derivado(), função (estrutura, lote limpo) -> estrutura nova
+    """
+    _incrementais[nome] = atualizar
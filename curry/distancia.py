@@ -0,0 +1,52 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Mesmo raio médio da Terra usado pelo pacote haversine (em km)
+RAIO_TERRA_KM = 6371.0088
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def haversine_np(lat1, lon1, lat2, lon2, dtype=np.float64):
+    """ Esta função tem a responsabilidade de calcular a distância haversine (em km)
+            entre dois conjuntos de coordenadas de uma só vez, sem laço em Python
+
+            Usa a mesma fórmula e o mesmo raio do pacote haversine.
+            Tolerância em relação a haversine.haversine():
+                float64: diferença absoluta menor que 1e-9 km
+                float32: diferença absoluta menor que 1e-2 km para entregas de até ~50 km
+
+            Input: arrays (ou Series) de latitude e longitude em graus, dtype float64 ou float32
+            Output: array numpy com as distâncias em km
+    """
+    lat1 = np.radians(np.asarray(lat1, dtype=dtype))
+    lon1 = np.radians(np.asarray(lon1, dtype=dtype))
+    lat2 = np.radians(np.asarray(lat2, dtype=dtype))
+    lon2 = np.radians(np.asarray(lon2, dtype=dtype))
+
+    d = np.sin((lat2 - lat1) * 0.5) ** 2 \
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) * 0.5) ** 2
+
+    return (2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(d))).astype(dtype, copy=False)
+
+
+def distancia_entrega(df, dtype=np.float64):
+    """ Esta função tem a responsabilidade de calcular a distância entre
+            o restaurante e o local de entrega para todas as linhas do DataFrame
+
+            Input: DataFrame com as colunas de latitude/longitude do restaurante e da entrega
+            Output: array numpy com as distâncias em km
+    """
+    return haversine_np(df['Restaurant_latitude'].to_numpy(),
+                        df['Restaurant_longitude'].to_numpy(),
+                        df['Delivery_location_latitude'].to_numpy(),
+                        df['Delivery_location_longitude'].to_numpy(),
+                        dtype=dtype)
@@ -0,0 +1,162 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+
+from curry.dados import derivado
+from curry.filtros import indice_filtros
+from curry.medicao import medido
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Resoluções da grade: nome -> (tamanho da célula em graus, zoom inicial do mapa)
+RESOLUCOES = {
+    'País (1°)': (1.0, 5),
+    'Região (0,25°)': (0.25, 7),
+    'Cidade (0,05°)': (0.05, 10),
+    'Bairro (0,01°)': (0.01, 12),
+}
+
+# Máximo de células enviadas ao navegador; acima disso só as mais movimentadas são desenhadas
+MAX_CELULAS = 2000
+
+COLUNA_LATITUDE = 'Delivery_location_latitude'
+COLUNA_LONGITUDE = 'Delivery_location_longitude'
+COLUNA_TEMPO = 'Time_taken(min)'
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+class GradeEspacial:
+    """ Esta classe tem a responsabilidade de agrupar os locais de entrega em células
+            de uma grade regular, em todas as RESOLUCOES
+
+            A célula de cada linha é calculada uma única vez por resolução
+            (códigos densos 0..n_celulas-1, na mesma ordem de linhas do
+            DataFrame). Para um filtro, quantidade de pedidos e tempo
+            médio por célula saem de um np.bincount sobre as linhas filtradas,
+            sem groupby e sem enviar as linhas ao navegador.
+    """
+
+    @medido('grade_espacial')
+    def __init__(self, df):
+        latitudes = df[COLUNA_LATITUDE].to_numpy(dtype=np.float64)
+        longitudes = df[COLUNA_LONGITUDE].to_numpy(dtype=np.float64)
+        validas = np.isfinite(latitudes) & np.isfinite(longitudes)
+
+        self.tempos = df[COLUNA_TEMPO].to_numpy(dtype=np.float64)
+        self.grades = {}
+        for nome, (tamanho, _) in RESOLUCOES.items():
+            linhas = np.floor(np.where(validas, latitudes, 0) / tamanho).astype(np.int64)
+            colunas = np.floor(np.where(validas, longitudes, 0) / tamanho).astype(np.int64)
+            celulas, codigos = np.unique(np.stack([linhas, colunas]), axis=1, return_inverse=True)
+            codigos = codigos.reshape(-1).astype(np.int32)
+            # Linhas sem coordenada ficam fora de todas as células
+            codigos[~validas] = -1
+            self.grades[nome] = (codigos, celulas * tamanho, tamanho)
+
+    def agregar(self, resolucao, linhas=None):
+        """ Esta função tem a responsabilidade de contar pedidos e calcular o tempo médio por célula
+
+                Input: nome da resolução, posições das linhas filtradas (None = todas)
+                Output: DataFrame com latitude/longitude do canto sudoeste, tamanho,
+                        pedidos e tempo médio, uma linha por célula com pedidos
+        """
+        codigos, cantos, tamanho = self.grades[resolucao]
+        tempos = self.tempos
+        if linhas is not None:
+            codigos, tempos = codigos[linhas], tempos[linhas]
+        validas = codigos >= 0
+        codigos, tempos = codigos[validas], tempos[validas]
+
+        pedidos = np.bincount(codigos, minlength=cantos.shape[1])
+        soma = np.bincount(codigos, weights=tempos, minlength=cantos.shape[1])
+        ocupadas = np.flatnonzero(pedidos)
+        return pd.DataFrame({'latitude': cantos[0, ocupadas],
+                             'longitude': cantos[1, ocupadas],
+                             'tamanho': tamanho,
+                             'pedidos': pedidos[ocupadas],
+                             'tempo_medio': soma[ocupadas] / pedidos[ocupadas]})
+
+
+def grade_espacial(df):
+    """ Esta função tem a responsabilidade de devolver a GradeEspacial de um DataFrame,
+            construída só na primeira vez
+
+            Input: DataFrame limpo
+            Output: GradeEspacial
+    """
+    return derivado(df, 'grade_espacial', GradeEspacial)
+
+
+@medido('celulas_filtradas')
+def celulas_filtradas(df, resolucao, filtros):
+    """ Esta função tem a responsabilidade de agregar por célula só os pedidos filtrados
+
+            Input: DataFrame completo, nome da resolução, filtros da barra lateral (data limite, trânsito, cidades)
+            Output: DataFrame de células (ver GradeEspacial.agregar), no máximo MAX_CELULAS,
+                    ordenado da célula com mais pedidos para a com menos
+    """
+    # A grade e o IndiceFiltros usam as posições das linhas no DataFrame completo
+    celulas = grade_espacial(df).agregar(resolucao, indice_filtros(df).posicoes(*filtros))
+    return celulas.nlargest(MAX_CELULAS, 'pedidos', keep='first').reset_index(drop=True)
+
+
+@medido('mapa.celulas')
+def mapa_celulas(celulas, resolucao, modo='calor'):
+    """ Esta função tem a responsabilidade de desenhar as células no mapa
+
+            modo='calor': mapa de calor com o peso de cada célula = pedidos
+            modo='grade': retângulos coloridos pelo tempo médio de entrega (choropleth),
+                          com pedidos e tempo médio no tooltip
+
+            Input: DataFrame de células, nome da resolução, modo
+            Output: folium.Map
+    """
+    # folium só é importado quando um mapa é desenhado (o pacote não depende de bibliotecas de visualização)
+    import folium as fo
+    from folium.plugins import HeatMap
+
+    _, zoom = RESOLUCOES[resolucao]
+    if celulas.empty:
+        return fo.Map(location=[20.0, 80.0], zoom_start=5)
+
+    metade = celulas['tamanho'] / 2
+    centros_lat = (celulas['latitude'] + metade).to_numpy(dtype=float)
+    centros_lon = (celulas['longitude'] + metade).to_numpy(dtype=float)
+    pesos = celulas['pedidos'].to_numpy(dtype=float)
+
+    # Começa centrado na célula com mais pedidos
+    mapa = fo.Map(location=[centros_lat[0], centros_lon[0]], zoom_start=zoom)
+
+    if modo == 'calor':
+        HeatMap(np.column_stack([centros_lat, centros_lon, pesos / pesos.max()]).round(5).tolist(),
+                radius=15, blur=10).add_to(mapa)
+        return mapa
+
+    minimo, maximo = celulas['tempo_medio'].min(), celulas['tempo_medio'].max()
+    escala = fo.LinearColormap(['#2c7bb6', '#ffffbf', '#d7191c'], vmin=minimo, vmax=max(maximo, minimo + 1e-9),
+                               caption='Tempo médio de entrega (min)')
+    # Coordenadas arredondadas (~1 m) para reduzir o HTML enviado
+    sul, oeste = celulas['latitude'].round(5).tolist(), celulas['longitude'].round(5).tolist()
+    norte = (celulas['latitude'] + celulas['tamanho']).round(5).tolist()
+    leste = (celulas['longitude'] + celulas['tamanho']).round(5).tolist()
+    features = [{'type': 'Feature',
+                 'geometry': {'type': 'Polygon',
+                              'coordinates': [[[o, s], [l, s], [l, n], [o, n], [o, s]]]},
+                 'properties': {'pedidos': pedidos, 'tempo_medio': round(tempo, 2), 'cor': escala(tempo)}}
+                for s, o, n, l, pedidos, tempo in zip(sul, oeste, norte, leste, celulas['pedidos'].tolist(),
+                                                     celulas['tempo_medio'].tolist())]
+    fo.GeoJson({'type': 'FeatureCollection', 'features': features},
+               style_function=lambda feature: {'fillColor': feature['properties']['cor'],
+                                               'color': feature['properties']['cor'],
+                                               'weight': 0.5, 'fillOpacity': 0.6},
+               tooltip=fo.GeoJsonTooltip(fields=['pedidos', 'tempo_medio'],
+                                         aliases=['Pedidos', 'Tempo médio (min)'])).add_to(mapa)
+    escala.add_to(mapa)
+    return mapa
@@ -0,0 +1,170 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+
+from curry.distancia import distancia_entrega
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Textos que o CSV usa para valor ausente
+AUSENTES = ['', 'NaN', 'NaN ', 'nan', 'nan ']
+
+# Colunas cujas linhas com valor ausente ('NaN') são descartadas na limpeza
+COLUNAS_NAN = ['Delivery_person_Age', 'multiple_deliveries', 'Festival',
+               'Weatherconditions', 'City', 'Time_taken(min)']
+
+# Colunas lidas em qualquer projeção: as de COLUNAS_NAN (definem quais linhas ficam,
+# então todas as páginas veem os mesmos pedidos) e as dos filtros da barra lateral
+COLUNAS_OBRIGATORIAS = COLUNAS_NAN + ['Order_Date', 'Road_traffic_density']
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def _por_valores_distintos(serie, converter, ausente):
+    """ Converte uma coluna lida como category aplicando converter só às categorias
+
+            O resultado volta para as linhas pelos códigos; o código -1 (valor
+            ausente) aponta para o valor ausente colocado no final.
+    """
+    valores = np.append(np.asarray(converter(serie.cat.categories)), ausente)
+    return valores[serie.cat.codes.to_numpy()]
+
+
+def _texto(serie):
+    """ Texto sem os espaços das pontas (só sobre os valores distintos, como em dados._normalizar_texto)
+    """
+    codigos, valores = pd.factorize(serie, use_na_sentinel=True)
+    valores = np.array([v.strip() if isinstance(v, str) else v for v in valores] + [np.nan], dtype=object)
+    return valores.take(codigos)
+
+
+def _categoria(serie):
+    """ Categoria sem os espaços das pontas; categorias que ficam iguais depois do corte são juntadas
+    """
+    categorias, posicoes = np.unique(serie.cat.categories.str.strip().to_numpy(dtype=object).astype(str),
+                                     return_inverse=True)
+    codigos = serie.cat.codes.to_numpy()
+    codigos = np.where(codigos >= 0, posicoes.reshape(-1)[codigos], -1)
+    return pd.Categorical.from_codes(codigos, categorias.astype(object))
+
+
+def _data(formato):
+    """ Data no formato informado (o CSV tem poucas datas distintas: cada uma é convertida uma vez)
+    """
+    def converter(serie):
+        return _por_valores_distintos(serie, lambda textos: pd.to_datetime(textos, format=formato).to_numpy(),
+                                      np.datetime64('NaT', 'ns'))
+    return converter
+
+
+def _numero_no_texto(serie):
+    """ Número inteiro dentro do texto (ex.: '(min) 17' -> 17)
+    """
+    numeros = lambda textos: pd.to_numeric(textos.str.extract(r'(\d+)', expand=False), errors='coerce')
+    return _por_valores_distintos(serie, lambda textos: numeros(textos).to_numpy(dtype=np.float64), np.nan)
+
+
+def semana_do_ano(datas):
+    """ Esta função tem a responsabilidade de calcular a semana do ano de cada data,
+            igual a strftime('%U') (semanas começam no domingo; os dias antes do
+            primeiro domingo são a semana 0), só com aritmética sobre os dias
+
+            Input: Series ou array de datas (datetime64)
+            Output: array de int64
+    """
+    dias = np.asarray(datas, dtype='datetime64[D]')
+    dia_do_ano = (dias - dias.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64)
+    # 1970-01-01 foi quinta-feira: (dias + 4) % 7 é o dia da semana com domingo = 0
+    dia_da_semana = (dias.astype(np.int64) + 4) % 7
+    return (dia_do_ano + 7 - dia_da_semana) // 7
+
+
+# Esquema do CSV de entregas: coluna -> (tipo na leitura, conversor, textos ausentes)
+#   tipo na leitura: dtype pedido ao pd.read_csv (o parser já produz números e categorias)
+#   conversor: função Series lida -> valores finais (None = usa o que o parser produziu)
+#   textos ausentes: viram NaN na leitura; nas outras colunas 'NaN' continua sendo um texto
+ESQUEMA = {
+    'ID':                          ('object',   _texto,              ['']),
+    'Delivery_person_ID':          ('category', _categoria,          ['']),
+    'Delivery_person_Age':         ('float64',  None,                AUSENTES),
+    'Delivery_person_Ratings':     ('float64',  None,                AUSENTES),
+    'Restaurant_latitude':         ('float64',  None,                AUSENTES),
+    'Restaurant_longitude':        ('float64',  None,                AUSENTES),
+    'Delivery_location_latitude':  ('float64',  None,                AUSENTES),
+    'Delivery_location_longitude': ('float64',  None,                AUSENTES),
+    'Order_Date':                  ('category', _data('%d-%m-%Y'),   ['']),
+    'Time_Orderd':                 ('object',   _texto,              ['']),
+    'Time_Order_picked':           ('object',   _texto,              ['']),
+    'Weatherconditions':           ('category', _categoria,          AUSENTES),
+    'Road_traffic_density':        ('category', _categoria,          ['']),
+    'Vehicle_condition':           ('float64',  None,                AUSENTES),
+    'Type_of_order':               ('category', _categoria,          ['']),
+    'Type_of_vehicle':             ('category', _categoria,          ['']),
+    'multiple_deliveries':         ('float64',  None,                AUSENTES),
+    'Festival':                    ('category', _categoria,          AUSENTES),
+    'City':                        ('category', _categoria,          AUSENTES),
+    'Time_taken(min)':             ('category', _numero_no_texto,    AUSENTES),
+}
+
+# Colunas inteiras: lidas como float64 (aceitam NaN) e convertidas para int depois do descarte
+COLUNAS_INTEIRAS = ['Delivery_person_Age', 'Vehicle_condition', 'multiple_deliveries', 'Time_taken(min)']
+
+# Colunas calculadas na limpeza: coluna -> (colunas do CSV de que depende, função df -> valores)
+DERIVADAS = {
+    'week_of_year': (['Order_Date'], lambda df: semana_do_ano(df['Order_Date'])),
+    'distance_delivery': (['Restaurant_latitude', 'Restaurant_longitude',
+                           'Delivery_location_latitude', 'Delivery_location_longitude'], distancia_entrega),
+}
+
+
+def colunas_leitura(colunas=None):
+    """ Esta função tem a responsabilidade de decidir quais colunas do CSV precisam ser lidas
+            para produzir as colunas pedidas
+
+            Entram as colunas pedidas, as colunas de que as derivadas pedidas
+            dependem e COLUNAS_OBRIGATORIAS. As outras nem passam pelo parser.
+
+            Input: lista de colunas do DataFrame limpo (None = todas)
+            Output: lista de colunas do CSV, na ordem do ESQUEMA (None = todas)
+    """
+    if colunas is None:
+        return None
+    desconhecidas = [c for c in colunas if c not in ESQUEMA and c not in DERIVADAS]
+    if desconhecidas:
+        raise ValueError(f'Colunas fora do esquema: {desconhecidas}')
+
+    lidas = set(COLUNAS_OBRIGATORIAS)
+    for coluna in colunas:
+        lidas.update(DERIVADAS[coluna][0] if coluna in DERIVADAS else [coluna])
+    return [coluna for coluna in ESQUEMA if coluna in lidas]
+
+
+def colunas_derivadas(lidas=None):
+    """ Esta função tem a responsabilidade de listar as colunas derivadas que dá para calcular
+            com as colunas lidas (todas as dependências presentes)
+
+            Input: lista de colunas lidas do CSV (None = todas)
+            Output: lista de colunas de DERIVADAS
+    """
+    return [coluna for coluna, (dependencias, _) in DERIVADAS.items()
+            if lidas is None or all(d in lidas for d in dependencias)]
+
+
+def opcoes_leitura(colunas=None):
+    """ Esta função tem a responsabilidade de montar os argumentos do pd.read_csv para o esquema
+
+            Input: lista de colunas do DataFrame limpo (None = todas)
+            Output: dict com usecols, dtype, na_values e keep_default_na
+    """
+    lidas = colunas_leitura(colunas)
+    esquema = ESQUEMA if lidas is None else {coluna: ESQUEMA[coluna] for coluna in lidas}
+    return {'usecols': lidas,
+            'dtype': {coluna: tipo for coluna, (tipo, _, _) in esquema.items()},
+            'na_values': {coluna: ausentes for coluna, (_, _, ausentes) in esquema.items()},
+            'keep_default_na': False}
@@ -0,0 +1,121 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Colunas de um acumulador: quantidade, média, soma dos quadrados dos desvios (M2), mínimo e máximo
+CAMPOS = ['n', 'media', 'm2', 'minimo', 'maximo']
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def acumular(valores, chaves=None):
+    """ Esta função tem a responsabilidade de criar os acumuladores de uma ou mais medidas por grupo
+
+            Cada grupo guarda n, média, M2 (soma dos quadrados dos desvios em
+            relação à média), mínimo e máximo dos valores não nulos. Com esses
+            campos os acumuladores podem ser combinados entre partições
+            (combinar / juntar) sem voltar às linhas originais.
+            Todas as medidas são agrupadas na mesma passada sobre as chaves.
+
+            Input: Series (uma medida) ou DataFrame (várias medidas),
+                   DataFrame com as colunas de grupo, alinhado aos valores (None = um único grupo)
+            Output: DataFrame indexado pelos grupos, com as colunas de CAMPOS
+                    (uma medida) ou '<medida>_<campo>' (várias medidas)
+    """
+    uma_medida = isinstance(valores, pd.Series)
+    valores = valores.to_frame('valor') if uma_medida else valores
+    if chaves is None:
+        chaves = pd.DataFrame({'grupo': np.zeros(len(valores), dtype=np.int8)}, index=valores.index)
+
+    aux = pd.concat([chaves, valores.astype(np.float64)], axis=1)
+    grupos = aux.groupby(list(chaves.columns), observed=True, dropna=False, sort=False)[list(valores.columns)]
+    agregados = grupos.agg(['count', 'mean', 'min', 'max'])
+    variancias = grupos.var(ddof=0)
+
+    resultado = {}
+    for medida in valores.columns:
+        n = agregados[(medida, 'count')]
+        campos = {'n': n,
+                  'media': agregados[(medida, 'mean')],
+                  'm2': variancias[medida] * n,
+                  'minimo': agregados[(medida, 'min')],
+                  'maximo': agregados[(medida, 'max')]}
+        for campo in CAMPOS:
+            resultado[campo if uma_medida else f'{medida}_{campo}'] = campos[campo]
+    return pd.DataFrame(resultado)
+
+
+def combinar(estatisticas, por, dropna=True):
+    """ Esta função tem a responsabilidade de combinar acumuladores agrupando-os por outras chaves
+
+            Usa a fórmula de Chan et al. para juntar médias e M2 de partes:
+                n = soma dos n
+                média = soma(n_i * média_i) / n
+                M2 = soma(M2_i + n_i * (média_i - média)^2)
+
+            Input: DataFrame com as colunas de CAMPOS e as colunas de 'por',
+                   coluna ou lista de colunas do novo agrupamento,
+                   dropna=False para manter grupos com chave ausente
+            Output: DataFrame com as colunas de CAMPOS, indexado por 'por'
+    """
+    n = estatisticas['n'].to_numpy(dtype=np.float64)
+    media = np.nan_to_num(estatisticas['media'].to_numpy(dtype=np.float64))
+    m2 = np.nan_to_num(estatisticas['m2'].to_numpy(dtype=np.float64))
+
+    aux = estatisticas[por if isinstance(por, list) else [por]].copy()
+    aux['n'] = n
+    aux['soma'] = n * media
+    grupos = aux.groupby(por, observed=True, sort=True, dropna=dropna)
+
+    n_grupo = grupos['n'].transform('sum').to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media_grupo = grupos['soma'].transform('sum').to_numpy() / n_grupo
+    aux['m2'] = np.where(n > 0, m2 + n * (media - media_grupo) ** 2, 0.0)
+    aux['minimo'] = estatisticas['minimo'].to_numpy(dtype=np.float64)
+    aux['maximo'] = estatisticas['maximo'].to_numpy(dtype=np.float64)
+
+    grupos = aux.groupby(por, observed=True, sort=True, dropna=dropna)
+    resultado = grupos[['n', 'soma', 'm2']].sum()
+    resultado['media'] = (resultado['soma'] / resultado['n']).where(resultado['n'] > 0)
+    resultado['minimo'] = grupos['minimo'].min()
+    resultado['maximo'] = grupos['maximo'].max()
+    return resultado[CAMPOS]
+
+
+def juntar(*estatisticas):
+    """ Esta função tem a responsabilidade de atualizar acumuladores com novas partes
+            (ex.: o histórico e um lote novo), grupo a grupo
+
+            Input: DataFrames de acumuladores com o mesmo tipo de índice
+            Output: DataFrame de acumuladores com a união dos grupos
+    """
+    juntos = pd.concat(estatisticas)
+    nomes = [nome if nome is not None else f'nivel_{i}' for i, nome in enumerate(juntos.index.names)]
+    juntos.index.names = nomes
+    return combinar(juntos.reset_index(), nomes if len(nomes) > 1 else nomes[0], dropna=False)
+
+
+def resumo(estatisticas):
+    """ Esta função tem a responsabilidade de transformar acumuladores em estatísticas finais
+
+            O desvio padrão é o amostral (ddof=1), igual ao std() do pandas.
+
+            Input: DataFrame de acumuladores
+            Output: DataFrame com n, mean, std, var, min e max por grupo
+    """
+    n = estatisticas['n']
+    variancia = (estatisticas['m2'] / (n - 1)).where(n > 1).clip(lower=0)
+    return pd.DataFrame({'n': n,
+                         'mean': estatisticas['media'],
+                         'std': np.sqrt(variancia),
+                         'var': variancia,
+                         'min': estatisticas['minimo'],
+                         'max': estatisticas['maximo']})
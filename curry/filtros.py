@@ -0,0 +1,141 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import weakref
+
+import numpy as np
+
+from curry.dados import congelar, derivado
+from curry.medicao import medido
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Colunas dos filtros de múltipla seleção da barra lateral
+COLUNAS_FILTRO = ['Road_traffic_density', 'City']
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+class IndiceFiltros:
+    """ Esta classe tem a responsabilidade de aplicar os filtros da barra lateral
+            (data limite, trânsito e cidade) sem percorrer e copiar o DataFrame a cada filtro
+
+            As datas e as máscaras ficam na ordem de Order_Date, então o filtro de
+            data vira um limite encontrado com searchsorted. Para cada valor de
+            trânsito e de cidade existe uma máscara booleana pronta; os outros
+            filtros viram OR/AND dessas máscaras. As linhas só são copiadas uma
+            vez, no final, e nem isso quando o DataFrame já está ordenado por data
+            e todas as opções estão selecionadas.
+
+            Se o DataFrame não está ordenado por data, o índice guarda só a
+            permutação que o ordena (ordem), não uma cópia ordenada das linhas.
+            O DataFrame de origem fica em uma referência fraca: o índice é uma
+            estrutura derivada do próprio DataFrame (derivado) e não pode impedir
+            que ele seja descartado.
+    """
+
+    @medido('indice_filtros')
+    def __init__(self, df):
+        self._origem = weakref.ref(df)
+        datas = df['Order_Date']
+        if not datas.is_monotonic_increasing:
+            # mergesort: mantém a ordem original entre pedidos do mesmo dia
+            self.ordem = np.argsort(datas.to_numpy(), kind='mergesort')
+        else:
+            self.ordem = None
+
+        self.datas = self._ordenar(datas.to_numpy())
+        self.mascaras = {}
+        for coluna in COLUNAS_FILTRO:
+            valores = self._ordenar(df[coluna].to_numpy())
+            self.mascaras[coluna] = {valor: valores == valor for valor in df[coluna].dropna().unique()}
+
+    def _ordenar(self, valores):
+        """ Valores de uma coluna na ordem de Order_Date
+        """
+        return valores if self.ordem is None else valores[self.ordem]
+
+    @property
+    def df(self):
+        """ DataFrame de origem do índice
+        """
+        df = self._origem()
+        if df is None:
+            raise RuntimeError('O DataFrame deste IndiceFiltros já foi descartado')
+        return df
+
+    def _mascara(self, coluna, selecionados, fim):
+        """ OR das máscaras dos valores selecionados até a linha fim (None = todas as linhas servem)
+        """
+        mascaras = self.mascaras[coluna]
+        if set(mascaras) <= set(selecionados):
+            return None
+
+        mascara = np.zeros(fim, dtype=bool)
+        for valor in selecionados:
+            if valor in mascaras:
+                mascara |= mascaras[valor][:fim]
+        return mascara
+
+    def _selecao(self, data_limite, trafego, cidades):
+        """ Linhas selecionadas na ordem de Order_Date: um slice (sem máscara) ou as posições
+        """
+        fim = int(np.searchsorted(self.datas, np.datetime64(data_limite, 'ns'), side='left'))
+
+        mascara = None
+        for coluna, selecionados in zip(COLUNAS_FILTRO, (trafego, cidades)):
+            parcial = self._mascara(coluna, selecionados, fim)
+            if parcial is not None:
+                mascara = parcial if mascara is None else mascara & parcial
+
+        return slice(0, fim) if mascara is None else np.flatnonzero(mascara)
+
+    def posicoes(self, data_limite, trafego, cidades):
+        """ Esta função tem a responsabilidade de devolver as posições, no DataFrame de origem,
+                das linhas que passam nos filtros (em ordem de Order_Date)
+
+                Input: datetime, lista de condições de trânsito, lista de cidades
+                Output: array de posições
+        """
+        selecao = self._selecao(data_limite, trafego, cidades)
+        if self.ordem is not None:
+            return self.ordem[selecao]
+        return np.arange(len(self.datas))[selecao]
+
+    @medido('filtro_barra_lateral')
+    def filtrar(self, data_limite, trafego, cidades):
+        """ Esta função tem a responsabilidade de devolver as linhas com
+                Order_Date < data_limite, trânsito em trafego e cidade em cidades
+
+                Input: datetime, lista de condições de trânsito, lista de cidades
+                Output: DataFrame em ordem de Order_Date (somente leitura: pode compartilhar
+                        memória com o DataFrame de origem)
+        """
+        selecao = self._selecao(data_limite, trafego, cidades)
+        if self.ordem is not None:
+            return congelar(self.df.take(self.ordem[selecao]))
+        return self.df.iloc[selecao]
+
+
+def indice_filtros(df):
+    """ Esta função tem a responsabilidade de devolver o IndiceFiltros de um DataFrame,
+            construindo-o só na primeira vez (um por DataFrame carregado)
+
+            Input: DataFrame limpo
+            Output: IndiceFiltros
+    """
+    return derivado(df, 'indice_filtros', IndiceFiltros)
+
+
+def chave_filtros(data_limite, trafego, cidades):
+    """ Esta função tem a responsabilidade de normalizar os filtros da barra lateral
+            para servir de chave de cache (a ordem das opções selecionadas não importa)
+
+            Input: datetime, lista de condições de trânsito, lista de cidades
+            Output: tupla
+    """
+    return (np.datetime64(data_limite, 'ns'), tuple(sorted(trafego)), tuple(sorted(cidades)))
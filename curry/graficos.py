@@ -0,0 +1,161 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+
+from curry.medicao import medido
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Pontos por série (linha ou barra) acima dos quais a série é reduzida por baldes de mínimo/máximo
+MAX_PONTOS_SERIE = 2000
+
+# Pontos por trace acima dos quais um scatter passa a ser desenhado com WebGL (scattergl)
+LIMITE_WEBGL = 1000
+
+# Tamanho máximo (bytes do JSON) de uma figura enviada ao navegador
+MAX_PAYLOAD = 1_000_000
+
+# Estimativa (por cima) do JSON de uma figura: layout e template + bytes por ponto
+# (medido com plotly 6: ~7 KB de base e 30 a 65 bytes por ponto com data e hover)
+BYTES_FIGURA = 10_000
+BYTES_POR_PONTO = 100
+
+# Atributos de um trace que têm um valor por ponto e precisam acompanhar a redução
+ATRIBUTOS_POR_PONTO = ['x', 'y', 'text', 'hovertext', 'customdata', 'ids']
+ATRIBUTOS_MARCADOR = ['size', 'color', 'symbol', 'opacity']
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def indices_min_max(x, y, max_pontos):
+    """ Esta função tem a responsabilidade de escolher os pontos de uma série longa
+            preservando picos e vales
+
+            Os pontos (ordenados por x) são divididos em max_pontos // 2 baldes
+            consecutivos; de cada balde ficam o ponto de menor e o de maior y.
+
+            Input: arrays x e y, quantidade máxima de pontos
+            Output: posições dos pontos mantidos, em ordem de x
+    """
+    n = len(y)
+    baldes = max(max_pontos // 2, 1)
+    ordem = np.argsort(np.asarray(x), kind='stable')
+    valores = np.asarray(y, dtype=np.float64)[ordem]
+    balde = np.arange(n) * baldes // n
+
+    # Ordena por (balde, y): o primeiro de cada balde é o mínimo e o último, o máximo
+    por_valor = np.lexsort((valores, balde))
+    inicios = np.searchsorted(balde[por_valor], np.arange(baldes), side='left')
+    fins = np.searchsorted(balde[por_valor], np.arange(baldes), side='right') - 1
+    mantidos = np.unique(np.concatenate([por_valor[inicios], por_valor[fins]]))
+    return ordem[mantidos]
+
+
+def tamanho_payload(fig):
+    """ Esta função tem a responsabilidade de medir quantos bytes a figura ocupa no navegador
+
+            Input: figura plotly
+            Output: bytes do JSON da figura
+    """
+    return len(fig.to_json().encode('utf-8'))
+
+
+def estimar_payload(fig):
+    """ Esta função tem a responsabilidade de estimar, sem serializar, quantos bytes a figura ocupa no navegador
+
+            Input: figura plotly
+            Output: bytes estimados do JSON (BYTES_FIGURA + BYTES_POR_PONTO por ponto)
+    """
+    return BYTES_FIGURA + BYTES_POR_PONTO * sum(_pontos(trace) for trace in fig.data)
+
+
+def _pontos(trace):
+    """ Quantidade de pontos de um trace com x/y (0 para pizza, sunburst...)
+    """
+    y = getattr(trace, 'y', None)
+    return 0 if y is None else len(y)
+
+
+def _manter(trace, posicoes):
+    """ Mantém só os pontos de 'posicoes' em todos os atributos por ponto do trace
+    """
+    n = _pontos(trace)
+    atualizacao = {}
+    for atributo in ATRIBUTOS_POR_PONTO:
+        valores = getattr(trace, atributo, None)
+        if valores is not None and not isinstance(valores, str) and len(valores) == n:
+            atualizacao[atributo] = np.asarray(valores)[posicoes]
+    marcador = getattr(trace, 'marker', None)
+    for atributo in ATRIBUTOS_MARCADOR:
+        valores = getattr(marcador, atributo, None) if marcador is not None else None
+        if valores is not None and not isinstance(valores, (str, int, float)) and len(valores) == n:
+            atualizacao[f'marker.{atributo}'] = np.asarray(valores)[posicoes]
+    trace.update(atualizacao, overwrite=True)
+
+
+def _e_serie(trace):
+    """ Linhas e barras são séries em x: podem ser reduzidas por mínimo/máximo
+    """
+    if trace.type == 'bar':
+        return True
+    return trace.type in ('scatter', 'scattergl') and 'lines' in (trace.mode or 'lines')
+
+
+def _reduzir(fig, max_pontos, soltos=False):
+    """ Reduz os traces com mais de max_pontos pontos: séries por mínimo/máximo e,
+        com soltos=True, também os scatter só de marcadores (por amostragem uniforme)
+    """
+    for trace in fig.data:
+        n = _pontos(trace)
+        if n <= max_pontos or getattr(trace, 'x', None) is None:
+            continue
+        if _e_serie(trace):
+            _manter(trace, indices_min_max(trace.x, trace.y, max_pontos))
+        elif soltos:
+            _manter(trace, np.linspace(0, n - 1, max_pontos).astype(np.int64))
+
+
+def _webgl(fig):
+    """ Troca os scatter com mais de LIMITE_WEBGL pontos por scattergl
+    """
+    import plotly.graph_objects as go
+
+    traces = []
+    for trace in fig.data:
+        if trace.type == 'scatter' and _pontos(trace) > LIMITE_WEBGL:
+            propriedades = trace.to_plotly_json()
+            propriedades.pop('type', None)
+            trace = go.Scattergl(propriedades, skip_invalid=True)
+        traces.append(trace)
+    fig.data = traces
+
+
+@medido('grafico.preparar')
+def preparar_figura(fig, max_pontos=MAX_PONTOS_SERIE, max_payload=MAX_PAYLOAD):
+    """ Esta função tem a responsabilidade de limitar o que uma figura envia ao navegador
+
+            1. séries com mais de max_pontos pontos são reduzidas por baldes de
+               mínimo/máximo (os picos continuam visíveis);
+            2. scatter com mais de LIMITE_WEBGL pontos vira scattergl (os
+               scatter só de marcadores não são reduzidos nesse passo);
+            3. se o JSON ainda passar de max_payload bytes, todos os traces
+               são reduzidos, com max_pontos caindo pela metade até caber.
+
+            O JSON só é gerado (fig.to_json) quando a estimativa pela quantidade
+            de pontos (estimar_payload) passa de max_payload: figuras pequenas
+            (o caso comum hoje) passam sem alteração e sem serializar.
+
+            Input: figura plotly, pontos por série, bytes máximos do JSON
+            Output: a mesma figura (alterada no lugar)
+    """
+    _reduzir(fig, max_pontos)
+    _webgl(fig)
+    while max_pontos > 2 and estimar_payload(fig) > max_payload and tamanho_payload(fig) > max_payload:
+        max_pontos = min(max_pontos, max(map(_pontos, fig.data), default=0)) // 2
+        _reduzir(fig, max_pontos, soltos=True)
+    return fig
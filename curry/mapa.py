@@ -0,0 +1,92 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+
+from curry.cache import CacheLRU
+from curry.dados import versao_dados
+from curry.medicao import medido, medir
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Quantidade máxima de mapas (HTML) guardados no processo, compartilhados entre as sessões
+MAX_MAPAS = 32
+
+# Cache de HTML: (versão do dataset, nome do mapa, filtros) -> HTML
+_mapas = CacheLRU(MAX_MAPAS)
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def html_mapa(df, nome, filtros, gerar):
+    """ Esta função tem a responsabilidade de devolver o HTML de um mapa, gerando-o
+            só quando a combinação dataset + filtros ainda não estiver no cache
+
+            Além de evitar recriar o folium.Map, devolver o mesmo texto faz o
+            Streamlit reaproveitar a mensagem já enviada ao navegador (o folium
+            gera ids aleatórios, então um mapa regerado nunca seria idêntico).
+
+            Input: DataFrame completo (versão do dataset), nome do mapa,
+                   chave dos filtros (curry.filtros.chave_filtros), função sem argumentos que gera o HTML
+            Output: HTML do mapa
+    """
+    def gerar_medido():
+        with medir(f'mapa.{nome}'):
+            return gerar()
+    return _mapas.obter((versao_dados(df), nome, filtros), gerar_medido)
+
+
+def adicionar_marcadores(mapa, latitudes, longitudes, rotulos):
+    """ Esta função tem a responsabilidade de adicionar vários marcadores ao mapa de uma vez
+
+            Os pontos viram uma única camada GeoJSON (um marcador por ponto, com
+            o rótulo no popup) em vez de um folium.Marker por linha.
+
+            Input: folium.Map, arrays de latitude, longitude e rótulo
+            Output: camada GeoJSON adicionada
+    """
+    import folium as fo
+
+    pontos = {
+        'type': 'FeatureCollection',
+        'features': [{'type': 'Feature',
+                      'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+                      'properties': {'rotulo': rotulo}}
+                     for lat, lon, rotulo in zip(np.asarray(latitudes, dtype=float).tolist(),
+                                                 np.asarray(longitudes, dtype=float).tolist(),
+                                                 list(rotulos))],
+    }
+    camada = fo.GeoJson(pontos, popup=fo.GeoJsonPopup(fields=['rotulo'], labels=False))
+    camada.add_to(mapa)
+    return camada
+
+
+@medido('mapa.mapa_empresa')
+def mapa_empresa(pontos):
+    """ Esta função tem a responsabilidade de desenhar o mapa com o local mediano das entregas
+            por cidade e trânsito
+
+            Input: DataFrame de curry.metricas.localizacao_mediana
+            Output: HTML do mapa
+    """
+    import folium as fo
+
+    # Coordenadas como float do Python/float64 (o folium não serializa float32)
+    latitudes = pontos['Delivery_location_latitude'].to_numpy(dtype=float)
+    longitudes = pontos['Delivery_location_longitude'].to_numpy(dtype=float)
+
+    mapa = fo.Map(location=[latitudes.mean(), longitudes.mean()],
+                  zoom_start=5)
+    # Todos os marcadores de uma vez (uma camada GeoJSON)
+    adicionar_marcadores(mapa, latitudes, longitudes,
+                         pontos['City'].astype(str) + ' - ' + pontos['Road_traffic_density'].astype(str))
+
+    bounds = [[latitudes.min(), longitudes.min()],
+              [latitudes.max(), longitudes.max()]]
+
+    mapa.fit_bounds(bounds)
+    return mapa._repr_html_()  # Cria o HTML do mapa
@@ -0,0 +1,265 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: sem getrusage, o pico de memória não é registrado
+    resource = None
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# CURRY_MEDICAO=0 desliga a medição (medir vira um contexto vazio)
+ATIVO = os.environ.get('CURRY_MEDICAO', '1') != '0'
+
+# CURRY_DEBUG=1 mostra o painel de medição em todas as sessões (senão, só com ?debug=1 na URL)
+DEBUG = os.environ.get('CURRY_DEBUG', '0') == '1'
+
+# Arquivo (JSON lines) onde gravar_log acrescenta os percentis
+ARQUIVO_LOG = os.environ.get('CURRY_MEDICAO_LOG', 'medicao.log')
+
+# Quantas durações recentes são guardadas por etapa para os percentis
+JANELA = 1000
+
+# ru_maxrss vem em KB no Linux e em bytes no macOS
+_UNIDADE_RSS = 1 if sys.platform == 'darwin' else 1024
+
+# Durações recentes por etapa (todas as sessões): etapa -> deque de segundos
+_historico = {}
+_historico_lock = threading.Lock()
+
+# Etapas do rerun atual, por thread (cada sessão do Streamlit roda o script em uma thread)
+_local = threading.local()
+
+_VAZIO = nullcontext()
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def pico_memoria_mb():
+    """ Esta função tem a responsabilidade de devolver o pico de memória (RSS) do processo até agora
+
+            Output: MB (None se o sistema não informa)
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _UNIDADE_RSS / 2**20
+
+
+class _Etapa:
+    """ Contexto que mede uma etapa: duração, pico de memória do processo e quanto o pico subiu
+    """
+    __slots__ = ('nome', 'inicio', 'pico_inicio')
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __enter__(self):
+        self.pico_inicio = pico_memoria_mb()
+        _local.profundidade = getattr(_local, 'profundidade', 0) + 1
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        duracao = time.perf_counter() - self.inicio
+        pico = pico_memoria_mb()
+        _local.profundidade -= 1
+
+        historico = _historico.get(self.nome)
+        if historico is None:
+            with _historico_lock:
+                historico = _historico.setdefault(self.nome, deque(maxlen=JANELA))
+        historico.append(duracao)
+
+        rerun = getattr(_local, 'rerun', None)
+        if rerun is not None:
+            rerun.append({'etapa': self.nome,
+                          'profundidade': _local.profundidade,
+                          'tempo_ms': duracao * 1000,
+                          'pico_memoria_mb': pico,
+                          'aumento_pico_mb': None if pico is None else pico - self.pico_inicio})
+        return False
+
+
+def medir(nome):
+    """ Esta função tem a responsabilidade de medir um trecho de código
+
+            Uso: with medir('leitura_csv'): ...
+            Custa duas leituras de relógio e duas de getrusage; com CURRY_MEDICAO=0
+            devolve um contexto vazio.
+
+            Input: nome da etapa (ex.: 'limpeza.tipos')
+            Output: gerenciador de contexto
+    """
+    if not ATIVO:
+        return _VAZIO
+    return _Etapa(nome)
+
+
+def medido(nome):
+    """ Esta função tem a responsabilidade de medir todas as chamadas de uma função (decorador)
+
+            Input: nome da etapa
+            Output: decorador
+    """
+    def decorador(funcao):
+        if not ATIVO:
+            return funcao
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            with _Etapa(nome):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorador
+
+
+def _rerun_de_fragmento():
+    """ True quando o Streamlit está reexecutando só fragmentos (não o script inteiro da página)
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    contexto = get_script_run_ctx(suppress_warning=True)
+    return contexto is not None and bool(contexto.fragment_ids_this_run)
+
+
+def fragmento_medido(nome):
+    """ Esta função tem a responsabilidade de transformar uma função em fragmento do Streamlit
+            medido (decorador: @st.fragment + @medido(nome))
+
+            Quando só o fragmento é reexecutado, o script da página (e o seu
+            iniciar_rerun) não roda: o fragmento começa a sua própria lista de
+            etapas, em vez de acrescentar as dele às do rerun anterior.
+
+            Input: nome da etapa
+            Output: decorador
+    """
+    import streamlit as st
+
+    def decorador(funcao):
+        medida = medido(nome)(funcao)
+
+        @functools.wraps(funcao)
+        def fragmento(*args, **kwargs):
+            if ATIVO and _rerun_de_fragmento():
+                iniciar_rerun()
+            return medida(*args, **kwargs)
+        return st.fragment(fragmento)
+    return decorador
+
+
+def iniciar_rerun():
+    """ Esta função tem a responsabilidade de começar a lista de etapas do rerun atual
+            (chamada no início de cada página e de cada reexecução de um fragmento, ver fragmento_medido)
+    """
+    _local.rerun = []
+    _local.profundidade = 0
+
+
+def etapas_rerun():
+    """ Esta função tem a responsabilidade de devolver as etapas medidas no rerun atual, em ordem de término
+
+            Output: lista de dicts (etapa, profundidade, tempo_ms, pico_memoria_mb, aumento_pico_mb)
+    """
+    return list(getattr(_local, 'rerun', None) or [])
+
+
+def percentis():
+    """ Esta função tem a responsabilidade de resumir as durações recentes de cada etapa
+
+            Output: dict etapa -> {n, media_ms, p50_ms, p90_ms, p99_ms, max_ms}
+    """
+    with _historico_lock:
+        historico = {nome: np.array(duracoes) * 1000 for nome, duracoes in _historico.items()}
+
+    resumo = {}
+    for nome, duracoes in sorted(historico.items()):
+        if len(duracoes) == 0:
+            continue
+        p50, p90, p99 = np.percentile(duracoes, [50, 90, 99])
+        resumo[nome] = {'n': int(len(duracoes)),
+                        'media_ms': float(duracoes.mean()),
+                        'p50_ms': float(p50),
+                        'p90_ms': float(p90),
+                        'p99_ms': float(p99),
+                        'max_ms': float(duracoes.max())}
+    return resumo
+
+
+def exportar_json(caminho=None):
+    """ Esta função tem a responsabilidade de exportar os percentis por etapa em JSON
+
+            Input: caminho do arquivo (opcional)
+            Output: texto JSON (também gravado em caminho, se informado)
+    """
+    texto = json.dumps({'gerado_em': datetime.now().isoformat(timespec='seconds'),
+                        'pico_memoria_mb': pico_memoria_mb(),
+                        'etapas': percentis()}, ensure_ascii=False, indent=2)
+    if caminho is not None:
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto)
+    return texto
+
+
+def gravar_log(caminho=ARQUIVO_LOG):
+    """ Esta função tem a responsabilidade de acrescentar uma linha JSON com os percentis ao arquivo de log
+
+            Input: caminho do log
+            Output: caminho do log
+    """
+    linha = json.dumps({'gerado_em': datetime.now().isoformat(timespec='seconds'),
+                        'pico_memoria_mb': pico_memoria_mb(),
+                        'etapas': percentis()}, ensure_ascii=False)
+    with open(caminho, 'a', encoding='utf-8') as arquivo:
+        arquivo.write(linha + '\n')
+    return caminho
+
+
+def painel_medicao():
+    """ Esta função tem a responsabilidade de mostrar, na barra lateral, o tempo de cada etapa
+            do rerun atual, os percentis recentes e a memória dos dados compartilhados
+            (chamada no fim de cada página)
+
+            O painel fica escondido: só aparece com ?debug=1 na URL ou CURRY_DEBUG=1.
+    """
+    import pandas as pd
+    import streamlit as st
+
+    from curry.dados import memoria_compartilhada
+
+    if not ATIVO or not (DEBUG or st.query_params.get('debug') == '1'):
+        return
+
+    with st.sidebar.expander('⏱️ Medição (debug)', expanded=True):
+        etapas = pd.DataFrame(etapas_rerun())
+        if not etapas.empty:
+            etapas['etapa'] = ['· ' * p + e for p, e in zip(etapas['profundidade'], etapas['etapa'])]
+            total = etapas.loc[etapas['profundidade'] == 0, 'tempo_ms'].sum()
+            st.markdown(f"**Rerun atual:** {total:.1f} ms nas etapas medidas")
+            st.dataframe(etapas.drop(columns='profundidade').round(2), hide_index=True)
+
+        compartilhada = memoria_compartilhada()
+        st.markdown(f"**Dados compartilhados (todas as sessões):** {compartilhada['total_mb']:.1f} MB "
+                    f"({compartilhada['dados_mb']:.1f} MB de DataFrames, "
+                    f"{compartilhada['derivados_mb']:.1f} MB de estruturas derivadas)")
+
+        st.markdown("**Percentis recentes (todas as sessões)**")
+        st.dataframe(pd.DataFrame(percentis()).T.round(2))
+        st.download_button('Exportar JSON', exportar_json(), file_name='medicao.json', mime='application/json')
+        if st.button('Gravar no log'):
+            st.caption(f'Gravado em {gravar_log()}')
@@ -0,0 +1,261 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import pandas as pd
+
+from curry.calendario import agregado_tempo_dados, calendario_dos_dias, dias_desde_epoca, rollup
+from curry.cubo import agregar, agregar_total, cubo_dados, filtrar_cubo
+from curry.filtros import indice_filtros
+from curry.medicao import medido
+from curry.quantis import filtrar_sketch, quantis, sketch_dados
+from curry.ranking import top_entregadores
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Opções dos filtros da barra lateral (padrão: todas selecionadas)
+OPCOES_TRAFEGO = ['High', 'Jam', 'Medium', 'Low']
+OPCOES_CIDADE = ['Metropolitian', 'Urban', 'Semi-Urban']
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+# Métricas do dashboard sem Streamlit, plotly ou folium: as páginas só desenham
+# o que estas funções devolvem, e o CLI (python -m curry) grava tudo em JSON/CSV.
+
+# --------------------------- VISÃO EMPRESA ---------------------------
+
+def pedidos_por_dia(cubo):
+    """ Esta função tem a responsabilidade de contar os pedidos por data
+    """
+    return agregar(cubo, 'Order_Date').reset_index()
+
+
+def pedidos_por_trafego(cubo):
+    """ Esta função tem a responsabilidade de contar os pedidos por densidade de trânsito
+    """
+    return agregar(cubo, 'Road_traffic_density').reset_index()
+
+
+def pedidos_cidade_trafego(cubo):
+    """ Esta função tem a responsabilidade de contar os pedidos por cidade e densidade de trânsito
+    """
+    return agregar(cubo, ['City','Road_traffic_density']).reset_index()
+
+
+def pedidos_por_semana(cubo):
+    """ Esta função tem a responsabilidade de contar os pedidos por semana do ano
+    """
+    return agregar(cubo, 'week_of_year').reset_index()
+
+
+def pedidos_por_periodo(agregado, granularidade):
+    """ Esta função tem a responsabilidade de contar os pedidos por dia, semana ISO, mês ou hora do dia
+
+            Input: pré-agregado de tempo filtrado (curry.calendario), granularidade (ver GRANULARIDADES)
+            Output: DataFrame com periodo, chave e pedidos
+    """
+    return rollup(agregado, granularidade)
+
+
+@medido('metricas.pedidos_entregador_semana')
+def pedidos_entregador_semana(df1):
+    """ Esta função tem a responsabilidade de calcular quantos pedidos cada entregador fez, em média, por semana
+
+            As semanas são as semanas ISO da dimensão calendário (as mesmas de
+            pedidos_por_periodo(..., 'semana')), identificadas pela segunda-feira em que começam.
+
+            Input: DataFrame filtrado
+            Output: DataFrame com periodo (início da semana), ID (pedidos), Delivery_person_ID (entregadores)
+                    e Order_by_delivery
+    """
+    # A dimensão calendário é consultada só uma vez por dia distinto
+    codigos, dias = pd.factorize(dias_desde_epoca(df1['Order_Date']), sort=True)
+    semanas = pd.Series(calendario_dos_dias(dias)['semana_inicio'].to_numpy()[codigos], name='periodo')
+
+    df_aux1 = df1['ID'].reset_index(drop=True).groupby(semanas).count()
+    df_aux2 = df1['Delivery_person_ID'].reset_index(drop=True).groupby(semanas, observed=True).nunique()
+
+    df_aux = pd.concat([df_aux1, df_aux2], axis=1).reset_index()
+    df_aux['Order_by_delivery'] = df_aux['ID'] / df_aux['Delivery_person_ID']
+    return df_aux
+
+
+@medido('metricas.localizacao_mediana')
+def localizacao_mediana(df1):
+    """ Esta função tem a responsabilidade de calcular o local mediano das entregas por cidade e trânsito
+
+            Input: DataFrame filtrado
+            Output: DataFrame com City, Road_traffic_density e as coordenadas medianas
+    """
+    return df1[['City', 'Road_traffic_density', 'Delivery_location_latitude', 'Delivery_location_longitude']] \
+        .groupby(['City', 'Road_traffic_density'], observed=True) \
+        .median().reset_index()
+
+# ------------------------- VISÃO ENTREGADORES ------------------------
+
+def limites_entregadores(df1):
+    """ Esta função tem a responsabilidade de calcular a menor e a maior idade dos entregadores
+            e a pior e a melhor condição dos veículos
+
+            Input: DataFrame filtrado
+            Output: DataFrame com as linhas 'min' e 'max' e as colunas Delivery_person_Age e Vehicle_condition
+    """
+    return df1[['Delivery_person_Age', 'Vehicle_condition']].agg(['min', 'max'])
+
+
+@medido('metricas.avaliacao_por_entregador')
+def avaliacao_por_entregador(df1):
+    """ Esta função tem a responsabilidade de calcular a avaliação média de cada entregador
+    """
+    return df1.loc[:,['Delivery_person_ID','Delivery_person_Ratings']] \
+        .groupby('Delivery_person_ID', observed=True).mean().reset_index()
+
+
+def avaliacao_por_trafego(cubo):
+    """ Esta função tem a responsabilidade de calcular a avaliação média e o desvio padrão por tipo de tráfego
+    """
+    df_aux = agregar(cubo, 'Road_traffic_density', 'Delivery_person_Ratings')[['mean', 'std']]
+    df_aux.columns = ['rating_traffic_mean', 'rating_traffic_std']
+    return df_aux
+
+
+def avaliacao_por_clima(cubo):
+    """ Esta função tem a responsabilidade de calcular a avaliação média e o desvio padrão por condição climática
+    """
+    df_aux = agregar(cubo, 'Weatherconditions', 'Delivery_person_Ratings')[['mean', 'std']]
+    df_aux.columns = ['rating_weather_mean', 'rating_weather_std']
+    return df_aux
+
+# ------------------------- VISÃO RESTAURANTES ------------------------
+
+def entregadores_distintos(df1):
+    """ Esta função tem a responsabilidade de contar os entregadores distintos
+    """
+    return int(df1['Delivery_person_ID'].nunique())
+
+
+def distancia_media(cubo):
+    """ Esta função tem a responsabilidade de calcular a distância média das entregas (km)
+    """
+    return float(agregar_total(cubo, 'distance_delivery')['mean'])
+
+
+def tempo_festival(cubo):
+    """ Esta função tem a responsabilidade de calcular as estatísticas do tempo de entrega
+            em dias de festival e em dias comuns, de uma vez (ver status_dia)
+    """
+    return agregar(cubo, 'Festival', 'Time_taken(min)')
+
+
+def status_dia(df_festival, festival):
+    """ Esta função tem a responsabilidade de calcular
+            o desvio padrao e a média das entregas
+                realizadas durante o festival
+
+                Orientacoes:
+                     Na condicional festival é necessário retornar duas condicoes possiveis, 'Yes' ou 'No'.
+                        dessa forma selecionará entre dias comuns e dias festivos
+
+                Input: estatísticas de tempo por Festival (tempo_festival(cubo)),
+                       calculadas uma vez e usadas para 'Yes' e 'No'
+    """
+    df_festival = df_festival[['mean', 'std']]
+    df_festival.columns = ['festival_mean', 'festival_std']
+    df_festival = df_festival.reset_index()
+
+    row = df_festival[df_festival['Festival'] == festival]
+    media = row['festival_mean'].values[0]
+    std = row['festival_std'].values[0]
+
+    return round(media, 2), round(std, 2)
+
+
+def tempo_por_cidade(cubo):
+    """ Esta função tem a responsabilidade de calcular o tempo médio de entrega e o desvio padrão por cidade
+    """
+    df_aux = agregar(cubo, 'City', 'Time_taken(min)')[['mean', 'std']]
+    df_aux.columns = ['time_city_mean', 'time_city_std']
+    return df_aux.reset_index()
+
+
+def tempo_cidade_pedido(cubo):
+    """ Esta função tem a responsabilidade de calcular o tempo médio de entrega e o desvio padrão
+            por cidade e tipo de pedido
+    """
+    df_aux = agregar(cubo, ['City','Type_of_order'], 'Time_taken(min)')[['mean', 'std']]
+    df_aux.columns = ['time_city_order_mean', 'time_city_order_std']
+    return df_aux.reset_index()
+
+
+def distancia_por_cidade(cubo):
+    """ Esta função tem a responsabilidade de calcular a distância média das entregas por cidade
+    """
+    return agregar(cubo, 'City', 'distance_delivery').reset_index()
+
+
+def tempo_cidade_trafego(cubo):
+    """ Esta função tem a responsabilidade de calcular o tempo médio de entrega e o desvio padrão
+            por cidade e densidade de trânsito
+    """
+    df_aux = agregar(cubo, ['City','Road_traffic_density'], 'Time_taken(min)')[['mean', 'std']]
+    df_aux.columns = ['avg_time', 'std_time']
+    return df_aux.reset_index()
+
+# ------------------------------ TUDO --------------------------------
+
+@medido('metricas.calcular_metricas')
+def calcular_metricas(df, data_limite, trafego=OPCOES_TRAFEGO, cidades=OPCOES_CIDADE):
+    """ Esta função tem a responsabilidade de calcular todas as métricas do dashboard para um filtro
+
+            Input: DataFrame limpo, datetime limite (exclusivo), lista de condições de trânsito, lista de cidades
+            Output: dict nome -> DataFrame (os valores únicos ficam juntos em 'resumo')
+    """
+    df1 = indice_filtros(df).filtrar(data_limite, trafego, cidades)
+    cubo = filtrar_cubo(cubo_dados(df), data_limite, trafego, cidades)
+    sketch = filtrar_sketch(sketch_dados(df), data_limite, trafego, cidades)
+    agregado = filtrar_cubo(agregado_tempo_dados(df), data_limite, trafego, cidades)
+
+    rapidos, lentos = top_entregadores(df1, k=10)
+    df_festival = tempo_festival(cubo)
+    limites = limites_entregadores(df1)
+
+    resumo = {'pedidos': len(df1),
+              'entregadores_distintos': entregadores_distintos(df1),
+              'distancia_media_km': distancia_media(cubo),
+              'menor_idade_entregador': limites.loc['min', 'Delivery_person_Age'],
+              'maior_idade_entregador': limites.loc['max', 'Delivery_person_Age'],
+              'pior_condicao_veiculo': limites.loc['min', 'Vehicle_condition'],
+              'melhor_condicao_veiculo': limites.loc['max', 'Vehicle_condition']}
+    for festival, nome in [('Yes', 'festival'), ('No', 'dia_comum')]:
+        if (df_festival.index == festival).any():
+            resumo[f'tempo_medio_{nome}'], resumo[f'desvio_padrao_{nome}'] = status_dia(df_festival, festival)
+
+    return {
+        'resumo': pd.DataFrame([resumo]),
+        'pedidos_por_dia': pedidos_por_dia(cubo),
+        'pedidos_por_trafego': pedidos_por_trafego(cubo),
+        'pedidos_cidade_trafego': pedidos_cidade_trafego(cubo),
+        'pedidos_por_semana': pedidos_por_semana(cubo),
+        'pedidos_por_semana_iso': pedidos_por_periodo(agregado, 'semana'),
+        'pedidos_por_mes': pedidos_por_periodo(agregado, 'mes'),
+        'pedidos_por_hora': pedidos_por_periodo(agregado, 'hora'),
+        'pedidos_entregador_semana': pedidos_entregador_semana(df1),
+        'localizacao_mediana': localizacao_mediana(df1),
+        'avaliacao_por_entregador': avaliacao_por_entregador(df1),
+        'avaliacao_por_trafego': avaliacao_por_trafego(cubo).reset_index(),
+        'avaliacao_por_clima': avaliacao_por_clima(cubo).reset_index(),
+        'top_entregadores_rapidos': rapidos,
+        'top_entregadores_lentos': lentos,
+        'tempo_por_festival': df_festival.reset_index(),
+        'tempo_por_cidade': tempo_por_cidade(cubo),
+        'tempo_cidade_pedido': tempo_cidade_pedido(cubo),
+        'distancia_por_cidade': distancia_por_cidade(cubo),
+        'tempo_cidade_trafego': tempo_cidade_trafego(cubo),
+        'percentis_por_cidade': quantis(sketch, 'City').reset_index(),
+        'percentis_por_trafego': quantis(sketch, 'Road_traffic_density').reset_index(),
+        'percentis_por_festival': quantis(sketch, 'Festival').reset_index(),
+    }
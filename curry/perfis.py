@@ -0,0 +1,152 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+
+from curry.dados import concatenar, congelar, derivado, registrar_incremental
+from curry.estatisticas import CAMPOS, acumular, combinar, resumo
+from curry.medicao import medido
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Chave dos perfis
+COLUNA_ENTREGADOR = 'Delivery_person_ID'
+
+# Medidas dos perfis: coluna original -> prefixo das colunas de acumulador
+MEDIDAS_PERFIL = {
+    'Delivery_person_Ratings': 'avaliacao',
+    'Time_taken(min)': 'tempo',
+}
+
+# Quebras de cada perfil: nome -> coluna
+QUEBRAS = {
+    'trafego': 'Road_traffic_density',
+    'clima': 'Weatherconditions',
+}
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def _acumular_por(df, chaves):
+    """ Pedidos e acumuladores das medidas do perfil por chaves (entregador e, nas quebras, a coluna da quebra)
+    """
+    grupos = df[chaves]
+    valores = pd.DataFrame({prefixo: df[coluna] for coluna, prefixo in MEDIDAS_PERFIL.items()})
+    estatisticas = acumular(valores, grupos)
+    estatisticas.insert(0, 'pedidos', grupos.groupby(chaves, observed=True, dropna=False, sort=False).size())
+    return estatisticas.reset_index()
+
+
+def _juntar_por(estatisticas, novas, chaves):
+    """ Soma os pedidos e combina os acumuladores existentes com os de um lote, chave a chave
+    """
+    juntos = concatenar(estatisticas, novas)
+    resultado = [juntos.groupby(chaves, observed=True, dropna=False, sort=False)['pedidos'].sum()]
+    for prefixo in MEDIDAS_PERFIL.values():
+        medida = juntos[chaves + [f'{prefixo}_{campo}' for campo in CAMPOS]] \
+            .rename(columns={f'{prefixo}_{campo}': campo for campo in CAMPOS})
+        resultado.append(combinar(medida, chaves if len(chaves) > 1 else chaves[0], dropna=False)
+                         .add_prefix(f'{prefixo}_'))
+    return pd.concat(resultado, axis=1).reset_index()
+
+
+def _resumir(estatisticas):
+    """ Pedidos, avaliação média e média, variância e desvio padrão do tempo de entrega
+    """
+    avaliacao = resumo(estatisticas[[f'avaliacao_{campo}' for campo in CAMPOS]]
+                       .rename(columns=lambda coluna: coluna.removeprefix('avaliacao_')))
+    tempo = resumo(estatisticas[[f'tempo_{campo}' for campo in CAMPOS]]
+                   .rename(columns=lambda coluna: coluna.removeprefix('tempo_')))
+    return pd.DataFrame({'pedidos': estatisticas['pedidos'],
+                         'avaliacao_media': avaliacao['mean'],
+                         'tempo_medio': tempo['mean'],
+                         'tempo_variancia': tempo['var'],
+                         'tempo_desvio': tempo['std']})
+
+
+class PerfisEntregadores:
+    """ Esta classe tem a responsabilidade de guardar o perfil de cada entregador:
+            pedidos, avaliação média, média e variância do tempo de entrega e as
+            mesmas medidas por trânsito e por clima
+
+            Os perfis guardam acumuladores (ver curry.estatisticas), então um lote
+            novo é combinado com eles sem voltar ao histórico de pedidos (anexar_perfis).
+            O resumo fica indexado por Delivery_person_ID (busca por hash) e as
+            linhas de cada entregador nas quebras ficam contíguas, na mesma ordem
+            do resumo: consultar um entregador não percorre os pedidos nem as quebras.
+    """
+
+    @medido('perfis_entregadores')
+    def __init__(self, geral, quebras):
+        self.geral = congelar(geral.sort_values(COLUNA_ENTREGADOR, ignore_index=True))
+        self.resumo = congelar(_resumir(self.geral).set_index(self.geral[COLUNA_ENTREGADOR].astype(str)))
+
+        posicoes = pd.Series(np.arange(len(self.resumo)), index=self.geral[COLUNA_ENTREGADOR])
+        self.quebras, self.resumos, self.inicios = {}, {}, {}
+        for nome, estatisticas in quebras.items():
+            linhas = posicoes.reindex(estatisticas[COLUNA_ENTREGADOR]).to_numpy()
+            valores = estatisticas[QUEBRAS[nome]].astype(str)
+            # Ordena por entregador (na ordem do resumo) e, dentro dele, pelo valor da quebra
+            ordem = np.lexsort((valores.to_numpy(), linhas))
+            self.quebras[nome] = congelar(estatisticas.take(ordem).reset_index(drop=True))
+            self.resumos[nome] = congelar(_resumir(self.quebras[nome]).set_index(valores.take(ordem)))
+            # inicios[nome][i]:inicios[nome][i + 1] são as linhas do i-ésimo entregador do resumo
+            self.inicios[nome] = np.searchsorted(linhas[ordem], np.arange(len(self.resumo) + 1))
+
+    def perfil(self, entregador):
+        """ Esta função tem a responsabilidade de consultar o perfil de um entregador
+
+                Input: Delivery_person_ID
+                Output: Series com o resumo e dict nome da quebra -> DataFrame
+                        indexado pelos valores da quebra, ou None se o entregador não existe
+        """
+        if entregador not in self.resumo.index:
+            return None
+        posicao = self.resumo.index.get_loc(entregador)
+
+        quebras = {nome: resumo_quebra.iloc[self.inicios[nome][posicao]:self.inicios[nome][posicao + 1]]
+                   for nome, resumo_quebra in self.resumos.items()}
+        return self.resumo.iloc[posicao], quebras
+
+
+@medido('construir_perfis')
+def construir_perfis(df):
+    """ Esta função tem a responsabilidade de montar os perfis dos entregadores a partir dos pedidos
+
+            Input: DataFrame limpo
+            Output: PerfisEntregadores
+    """
+    return PerfisEntregadores(_acumular_por(df, [COLUNA_ENTREGADOR]),
+                              {nome: _acumular_por(df, [COLUNA_ENTREGADOR, coluna]) for nome, coluna in QUEBRAS.items()})
+
+
+@medido('anexar_perfis')
+def anexar_perfis(perfis, lote):
+    """ Esta função tem a responsabilidade de atualizar os perfis com um lote novo de pedidos
+
+            Só o lote é agregado; os acumuladores de cada entregador (e de cada
+            quebra) são combinados com os que já existiam.
+
+            Input: PerfisEntregadores, DataFrame limpo do lote
+            Output: PerfisEntregadores novo
+    """
+    geral = _juntar_por(perfis.geral, _acumular_por(lote, [COLUNA_ENTREGADOR]), [COLUNA_ENTREGADOR])
+    quebras = {nome: _juntar_por(perfis.quebras[nome], _acumular_por(lote, [COLUNA_ENTREGADOR, coluna]),
+                                 [COLUNA_ENTREGADOR, coluna])
+               for nome, coluna in QUEBRAS.items()}
+    return PerfisEntregadores(geral, quebras)
+
+
+def perfis_dados(df):
+    """ Esta função tem a responsabilidade de devolver os perfis dos entregadores de um DataFrame,
+            construindo-os só na primeira vez (um por DataFrame carregado)
+    """
+    return derivado(df, 'perfis', construir_perfis)
+
+
+registrar_incremental('perfis', anexar_perfis)
@@ -0,0 +1,150 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+
+from curry.cubo import filtrar_cubo
+from curry.dados import concatenar, derivado, registrar_incremental
+from curry.medicao import medido
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Erro relativo máximo dos quantis estimados (0.01 = 1% do valor)
+ERRO_RELATIVO = 0.01
+
+# Dimensões do sketch: as dos filtros da barra lateral (data, trânsito, cidade) e o Festival
+DIMENSOES_QUANTIS = ['Order_Date', 'City', 'Road_traffic_density', 'Festival']
+
+# Medida resumida pelos quantis
+MEDIDA_QUANTIS = 'Time_taken(min)'
+
+# Quantis mostrados no dashboard
+QUANTIS = [0.5, 0.9, 0.99]
+
+# Balde dos valores <= 0 (representa o zero); fica antes de todos os outros na ordem dos baldes
+BALDE_ZERO = np.iinfo(np.int32).min
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def _gama(erro_relativo):
+    return (1 + erro_relativo) / (1 - erro_relativo)
+
+
+def baldes(valores, erro_relativo=ERRO_RELATIVO):
+    """ Esta função tem a responsabilidade de levar cada valor ao seu balde logarítmico
+
+            O balde i cobre (gama^(i-1), gama^i], com gama = (1 + erro) / (1 - erro);
+            qualquer valor do balde fica a no máximo erro_relativo do representante
+            (valor_balde). Valores entre 0 e 1 ficam em baldes negativos; valores <= 0
+            vão para o BALDE_ZERO, que representa o zero.
+
+            Input: array de valores, erro relativo
+            Output: array de índices de balde (int32)
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        indices = np.ceil(np.log(valores) / np.log(_gama(erro_relativo)))
+    return np.where(valores > 0, indices, BALDE_ZERO).astype(np.int32)
+
+
+def valor_balde(indices, erro_relativo=ERRO_RELATIVO):
+    """ Esta função tem a responsabilidade de devolver o representante de cada balde
+
+            Input: array de índices de balde, erro relativo
+            Output: array de valores
+    """
+    gama = _gama(erro_relativo)
+    indices = np.asarray(indices, dtype=np.float64)
+    zero = indices == BALDE_ZERO
+    return np.where(zero, 0.0, 2 * gama ** np.where(zero, 0, indices) / (gama + 1))
+
+
+@medido('construir_sketch')
+def construir_sketch(df, erro_relativo=ERRO_RELATIVO):
+    """ Esta função tem a responsabilidade de montar o sketch de quantis do tempo de entrega
+
+            O sketch é um histograma com baldes logarítmicos (DDSketch) por
+            célula de DIMENSOES_QUANTIS, guardado em formato longo (uma linha
+            por célula e balde ocupado). Sketches se juntam somando as contagens
+            dos mesmos baldes, então filtrar, agrupar e anexar lotes não precisam
+            das linhas originais, e o tamanho não cresce com o número de pedidos.
+
+            Input: DataFrame limpo, erro relativo
+            Output: DataFrame com DIMENSOES_QUANTIS, 'balde' e 'pedidos'
+    """
+    tempos = df[MEDIDA_QUANTIS]
+    validos = tempos.notna().to_numpy()
+    chaves = df.loc[validos, DIMENSOES_QUANTIS].assign(balde=baldes(tempos[validos], erro_relativo))
+    return chaves.groupby(DIMENSOES_QUANTIS + ['balde'], observed=True, dropna=False, sort=False) \
+        .size().rename('pedidos').reset_index()
+
+
+def anexar_sketch(sketch, lote):
+    """ Esta função tem a responsabilidade de atualizar o sketch com um lote novo de pedidos
+
+            Input: sketch, DataFrame limpo do lote
+            Output: sketch novo
+    """
+    juntos = concatenar(sketch, construir_sketch(lote))
+    return juntos.groupby(DIMENSOES_QUANTIS + ['balde'], observed=True, dropna=False, sort=False)['pedidos'] \
+        .sum().reset_index()
+
+
+def sketch_dados(df):
+    """ Esta função tem a responsabilidade de devolver o sketch de quantis de um DataFrame,
+            construindo-o só na primeira vez (um por DataFrame carregado)
+    """
+    return derivado(df, 'sketch_quantis', construir_sketch)
+
+
+def filtrar_sketch(sketch, data_limite, trafego, cidades):
+    """ Esta função tem a responsabilidade de aplicar os filtros da barra lateral ao sketch
+
+            Input: sketch, datetime limite (exclusivo), lista de condições de trânsito, lista de cidades
+            Output: sketch filtrado
+    """
+    return filtrar_cubo(sketch, data_limite, trafego, cidades)
+
+
+@medido('quantis')
+def quantis(sketch, por, qs=QUANTIS, erro_relativo=ERRO_RELATIVO):
+    """ Esta função tem a responsabilidade de estimar os quantis do tempo de entrega por grupo
+
+            As contagens dos baldes são somadas por grupo (juntando as células
+            que passaram no filtro) e o quantil q é o representante do balde onde
+            a contagem acumulada passa de q * (n - 1), como em DDSketch.
+            O erro em relação ao quantil exato é de no máximo erro_relativo.
+
+            Input: sketch (filtrado ou não), dimensão ou lista de dimensões,
+                   lista de quantis entre 0 e 1, erro relativo usado no sketch
+            Output: DataFrame indexado por 'por' com 'pedidos' e uma coluna 'p<q*100>' por quantil
+    """
+    por = por if isinstance(por, list) else [por]
+    contagens = sketch.groupby(por + ['balde'], observed=True)['pedidos'].sum().reset_index()
+    contagens = contagens[contagens['pedidos'] > 0].sort_values(por + ['balde'], kind='stable')
+
+    grupos = contagens.groupby(por, observed=True, sort=False)['pedidos']
+    acumulado = grupos.cumsum().to_numpy()
+    total = grupos.transform('sum').to_numpy()
+    inicio_grupo = acumulado - contagens['pedidos'].to_numpy()
+    valores = valor_balde(contagens['balde'].to_numpy(), erro_relativo)
+
+    resultado = contagens[por].drop_duplicates().set_index(por)
+    resultado['pedidos'] = grupos.sum().reindex(resultado.index).to_numpy()
+    for q in qs:
+        posto = q * (total - 1)
+        # Balde que contém o posto: acumulado antes dele <= posto < acumulado até ele
+        contem = (inicio_grupo <= posto) & (posto < acumulado)
+        estimativa = pd.Series(valores[contem], index=pd.MultiIndex.from_frame(contagens.loc[contem, por])
+                               if len(por) > 1 else pd.Index(contagens.loc[contem, por[0]]))
+        resultado[f'p{q * 100:g}'] = estimativa.reindex(resultado.index).to_numpy()
+    return resultado.sort_index()
+
+
+registrar_incremental('sketch_quantis', anexar_sketch)
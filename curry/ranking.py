@@ -0,0 +1,75 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+
+from curry.medicao import medido
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Ordem das cidades nas tabelas do ranking (a do dashboard original); outras cidades vêm depois, em ordem alfabética
+ORDEM_CIDADES = ['Metropolitian', 'Urban', 'Semi-Urban']
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def _k_menores(valores, k):
+    """ Posições dos k menores valores, em ordem crescente, sem ordenar o array inteiro
+
+            Empates são desfeitos pela posição (a menor primeiro), inclusive no k-ésimo
+            valor: entram todos os candidatos até ele e a ordenação estável escolhe.
+    """
+    posicoes = np.arange(len(valores))
+    if len(valores) > k:
+        limite = np.partition(valores, k - 1)[k - 1]
+        if not np.isnan(limite):
+            posicoes = posicoes[valores <= limite]
+    return posicoes[np.argsort(valores[posicoes], kind='stable')][:k]
+
+
+@medido('top_entregadores')
+def top_entregadores(df1, k=10):
+    """ Esta função tem a responsabilidade de calcular os k entregadores
+            mais rápidos e os k mais lentos de cada cidade
+
+            O tempo médio por entregador é calculado uma única vez; dentro de
+            cada cidade os k primeiros e os k últimos são escolhidos com seleção
+            parcial (argpartition), sem ordenar todos os entregadores.
+            Funciona para qualquer conjunto de cidades presente nos dados: as
+            cidades saem na ordem de ORDEM_CIDADES e as demais em seguida.
+
+            Rank_fast é o dense rank dentro da cidade: 1 = mais rápido na lista
+            dos rápidos e 1 = mais lento na lista dos lentos.
+
+            Entregadores com o mesmo tempo médio saem em ordem de Delivery_person_ID,
+            nas duas listas, como no sort_values(...).head(k) do dashboard original.
+
+            Input: DataFrame filtrado, quantidade k por cidade
+            Output: (DataFrame dos mais rápidos, DataFrame dos mais lentos)
+    """
+    medias = df1.loc[:, ['City', 'Delivery_person_ID', 'Time_taken(min)']] \
+        .groupby(['City', 'Delivery_person_ID'], observed=True)['Time_taken(min)'] \
+        .mean()
+    valores = medias.to_numpy(dtype=np.float64)
+
+    cidades = medias.groupby(level='City', observed=True, sort=True).indices
+    ordem = [c for c in ORDEM_CIDADES if c in cidades] + [c for c in cidades if c not in ORDEM_CIDADES]
+
+    rapidos, lentos = [], []
+    for posicoes in (cidades[cidade] for cidade in ordem):
+        valores_cidade = valores[posicoes]
+        rapidos.append(posicoes[_k_menores(valores_cidade, k)])
+        lentos.append(posicoes[_k_menores(-valores_cidade, k)])
+
+    def montar(partes, ascending):
+        posicoes = np.concatenate(partes) if partes else np.array([], dtype=np.intp)
+        top = medias.iloc[posicoes].reset_index()
+        top['Rank_fast'] = top.groupby('City', observed=True)['Time_taken(min)'] \
+            .rank(method='dense', ascending=ascending).astype(int)
+        return top
+
+    return montar(rapidos, True), montar(lentos, False)
@@ -0,0 +1,469 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Versão do formato em disco; mudar quando a estrutura dos arquivos mudar
+VERSAO_FORMATO = 3
+
+ARQUIVO_MANIFESTO = 'manifest.json'
+
+# Tamanho fixo do cabeçalho dos .npy: anexar linhas só reescreve o shape, sem mover os dados
+TAMANHO_CABECALHO = 128
+
+# Linhas copiadas por vez quando uma coluna inteira precisa ser regravada
+LINHAS_POR_VEZ = 1_000_000
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def _nome_arquivo(indice):
+    """ Nome base dos arquivos de uma coluna (os nomes originais podem ter parênteses e espaços)
+    """
+    return f'col_{indice:03d}'
+
+
+def _tipo_codigos(quantidade):
+    """ Menor tipo inteiro para os códigos de uma coluna categórica (como o pandas faz)
+    """
+    for tipo in (np.int8, np.int16, np.int32):
+        if quantidade < np.iinfo(tipo).max:
+            return np.dtype(tipo)
+    return np.dtype(np.int64)
+
+
+def _cabecalho(dtype, linhas):
+    """ Cabeçalho .npy (versão 1.0) com TAMANHO_CABECALHO bytes, para um array 1-D de linhas valores
+    """
+    texto = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" \
+        % (np.lib.format.dtype_to_descr(np.dtype(dtype)), linhas)
+    texto = texto.ljust(TAMANHO_CABECALHO - 11) + '\n'
+    return np.lib.format.MAGIC_PREFIX + bytes([1, 0]) + len(texto).to_bytes(2, 'little') + texto.encode('latin1')
+
+
+def _gravar_npy(destino, origem, dtype, linhas, converter=None, deslocamento=0):
+    """ Copia um arquivo binário (a partir de deslocamento bytes) para .npy, em pedaços de tamanho fixo
+    """
+    with open(destino, 'wb') as saida:
+        saida.write(_cabecalho(dtype, linhas))
+        if linhas == 0:
+            return
+        bruto = np.memmap(origem, dtype=dtype if converter is None else converter[0], mode='r',
+                          offset=deslocamento, shape=(linhas,))
+        for inicio in range(0, linhas, LINHAS_POR_VEZ):
+            pedaco = np.asarray(bruto[inicio:inicio + LINHAS_POR_VEZ])
+            if converter is not None:
+                pedaco = converter[1](pedaco)
+            saida.write(np.ascontiguousarray(pedaco, dtype=dtype).tobytes())
+        del bruto
+
+
+def _codificar_texto(serie, inicio=0):
+    """ Textos de uma coluna no formato de strings do Arrow
+
+            Output: (fim de cada valor em bytes, somado a inicio; bytes utf-8 de todos os valores; máscara de ausentes)
+    """
+    textos = pa.array(serie.to_numpy(dtype=object), type=pa.large_string(), from_pandas=True)
+    _, posicoes, dados = textos.buffers()
+    fins = np.frombuffer(posicoes, dtype=np.int64)[1:len(textos) + 1] + inicio
+    conteudo = dados.to_pybytes()[:int(fins[-1] - inicio)] if len(textos) and dados is not None else b''
+    return fins, conteudo, textos.is_null().to_numpy(zero_copy_only=False)
+
+
+class EscritorSnapshot:
+    """ Esta classe tem a responsabilidade de gravar um snapshot em partes
+
+            Cada bloco anexado (DataFrame com as mesmas colunas) é escrito direto
+            nos arquivos das colunas, então a memória usada depende do tamanho
+            do bloco e não do tamanho total. Em finalizar() os arquivos viram
+            .npy e o snapshot substitui o anterior de uma vez.
+
+            Tipos das colunas no disco:
+                numéricas e datas: .npy com os valores (tipo ampliado se um bloco precisar)
+                categoria: .npy com os códigos + lista de categorias no manifest (ordenada como no pandas)
+                texto: como as strings do Arrow: .dados com os bytes utf-8, .offsets.npy com
+                       o início de cada valor (linhas + 1 posições) e .npy com a máscara de ausentes
+    """
+
+    def __init__(self, destino, metadados):
+        self.destino = destino
+        self.metadados = metadados
+        self.linhas = 0
+        self.colunas = None
+
+        pasta_pai = os.path.dirname(os.path.abspath(destino))
+        os.makedirs(pasta_pai, exist_ok=True)
+        self.temporaria = tempfile.mkdtemp(prefix='.snapshot-', dir=pasta_pai)
+
+    def _caminho(self, info, extensao):
+        return os.path.join(self.temporaria, info['arquivo'] + extensao)
+
+    def _iniciar(self, df):
+        """ Define o tipo de cada coluna a partir do primeiro bloco
+        """
+        self.colunas = []
+        for indice, coluna in enumerate(df.columns):
+            serie = df[coluna]
+            info = {'nome': coluna, 'arquivo': _nome_arquivo(indice)}
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                info['tipo'] = 'categoria'
+                info['ordenada'] = bool(serie.cat.ordered)
+                info['mapa'] = {}
+            elif serie.dtype == object:
+                info['tipo'] = 'texto'
+                info['bytes'] = 0
+            else:
+                info['tipo'] = 'valor'
+                info['dtype'] = serie.dtype
+            self.colunas.append(info)
+
+    def _ampliar(self, info, dtype):
+        """ Regrava os valores já escritos de uma coluna com um tipo mais largo
+        """
+        antigo = self._caminho(info, '.bin')
+        novo = self._caminho(info, '.bin.novo')
+        with open(novo, 'wb') as saida:
+            if self.linhas:
+                valores = np.memmap(antigo, dtype=info['dtype'], mode='r', shape=(self.linhas,))
+                for inicio in range(0, self.linhas, LINHAS_POR_VEZ):
+                    saida.write(np.asarray(valores[inicio:inicio + LINHAS_POR_VEZ]).astype(dtype).tobytes())
+                del valores
+        os.replace(novo, antigo)
+        info['dtype'] = dtype
+
+    def anexar(self, df):
+        """ Esta função tem a responsabilidade de escrever mais um bloco de linhas no snapshot
+
+                Input: DataFrame com as mesmas colunas (e na mesma ordem) dos blocos anteriores
+        """
+        if self.colunas is None:
+            self._iniciar(df)
+
+        for info, coluna in zip(self.colunas, df.columns):
+            serie = df[coluna]
+            if info['tipo'] == 'texto':
+                fins, conteudo, nulos = _codificar_texto(serie, info['bytes'])
+                with open(self._caminho(info, '.dados'), 'ab') as saida:
+                    saida.write(conteudo)
+                with open(self._caminho(info, '.offsets.bin'), 'ab') as saida:
+                    saida.write(fins.tobytes())
+                with open(self._caminho(info, '.nulos.bin'), 'ab') as saida:
+                    saida.write(nulos.tobytes())
+                info['bytes'] += len(conteudo)
+
+            elif info['tipo'] == 'categoria':
+                categorico = pd.Categorical(serie)
+                mapa = info['mapa']
+                locais = np.array([mapa.setdefault(categoria, len(mapa)) for categoria in categorico.categories]
+                                  + [-1], dtype=np.int64)
+                # O código -1 (ausente) aponta para o -1 colocado no final
+                with open(self._caminho(info, '.bin'), 'ab') as saida:
+                    saida.write(locais[categorico.codes].tobytes())
+
+            else:
+                valores = serie.to_numpy()
+                dtype = np.promote_types(info['dtype'], valores.dtype)
+                if dtype != info['dtype']:
+                    self._ampliar(info, dtype)
+                with open(self._caminho(info, '.bin'), 'ab') as saida:
+                    saida.write(np.ascontiguousarray(valores, dtype=info['dtype']).tobytes())
+
+        self.linhas += len(df)
+
+    def finalizar(self):
+        """ Esta função tem a responsabilidade de fechar os arquivos e publicar o snapshot no destino
+        """
+        try:
+            colunas = []
+            for info in self.colunas or []:
+                saida = {'nome': info['nome'], 'arquivo': info['arquivo'] + '.npy'}
+
+                if info['tipo'] == 'texto':
+                    saida['tipo'] = 'texto'
+                    saida['dados'] = info['arquivo'] + '.dados'
+                    saida['offsets'] = info['arquivo'] + '.offsets.npy'
+                    saida['bytes'] = info['bytes']
+                    _gravar_npy(self._caminho(info, '.npy'), self._caminho(info, '.nulos.bin'),
+                                np.dtype(bool), self.linhas)
+                    with open(self._caminho(info, '.offsets.npy'), 'wb') as arquivo:
+                        arquivo.write(_cabecalho(np.int64, self.linhas + 1) + np.int64(0).tobytes())
+                    if self.linhas:
+                        with open(self._caminho(info, '.offsets.npy'), 'ab') as arquivo, \
+                                open(self._caminho(info, '.offsets.bin'), 'rb') as fins:
+                            shutil.copyfileobj(fins, arquivo)
+                    for extensao in ('.nulos.bin', '.offsets.bin'):
+                        if os.path.exists(self._caminho(info, extensao)):
+                            os.remove(self._caminho(info, extensao))
+                    if not os.path.exists(self._caminho(info, '.dados')):
+                        open(self._caminho(info, '.dados'), 'wb').close()
+
+                elif info['tipo'] == 'categoria':
+                    # Mesma ordem de categorias que o astype('category') do pandas (ordenadas)
+                    categorias = list(info['mapa'])
+                    ordem = sorted(range(len(categorias)), key=lambda i: categorias[i])
+                    novo_codigo = np.empty(len(categorias) + 1, dtype=np.int64)
+                    novo_codigo[ordem] = np.arange(len(categorias))
+                    novo_codigo[-1] = -1
+                    _gravar_npy(self._caminho(info, '.npy'), self._caminho(info, '.bin'),
+                                _tipo_codigos(len(categorias)), self.linhas,
+                                converter=(np.int64, lambda codigos: novo_codigo[codigos]))
+                    os.remove(self._caminho(info, '.bin'))
+                    saida['tipo'] = 'categoria'
+                    saida['categorias'] = [categorias[i] for i in ordem]
+                    saida['ordenada'] = info['ordenada']
+
+                else:
+                    _gravar_npy(self._caminho(info, '.npy'), self._caminho(info, '.bin'),
+                                info['dtype'], self.linhas)
+                    os.remove(self._caminho(info, '.bin'))
+                    saida['tipo'] = str(info['dtype'])
+
+                colunas.append(saida)
+
+            manifesto = {'versao_formato': VERSAO_FORMATO,
+                         'linhas': self.linhas,
+                         'metadados': self.metadados,
+                         'colunas': colunas}
+            with open(os.path.join(self.temporaria, ARQUIVO_MANIFESTO), 'w', encoding='utf-8') as arquivo:
+                json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+
+            # TROCA DO SNAPSHOT ANTIGO PELO NOVO
+            if os.path.isdir(self.destino):
+                shutil.rmtree(self.destino)
+            os.replace(self.temporaria, self.destino)
+        except BaseException:
+            self.descartar()
+            raise
+
+    def descartar(self):
+        """ Esta função tem a responsabilidade de apagar os arquivos de um snapshot não finalizado
+        """
+        shutil.rmtree(self.temporaria, ignore_errors=True)
+
+
+def salvar_snapshot(df, destino, metadados):
+    """ Esta função tem a responsabilidade de gravar o DataFrame limpo em disco
+            em formato colunar: arquivos .npy por coluna e um manifest.json
+            com o esquema e os metadados de validade
+
+            Colunas numéricas, de data e categóricas podem ser abertas com memory-map.
+            A gravação é feita em uma pasta temporária e trocada no final,
+            então um leitor nunca enxerga um snapshot pela metade.
+
+            Input: DataFrame, pasta de destino, dict de metadados (ex.: origem e versão da limpeza)
+            Output: None
+    """
+    escritor = EscritorSnapshot(destino, metadados)
+    try:
+        escritor.anexar(df)
+    except BaseException:
+        escritor.descartar()
+        raise
+    escritor.finalizar()
+
+
+def _ler_manifesto(destino, metadados):
+    """ Manifest do snapshot, ou None se ele não existir, for de outro formato ou tiver outros metadados
+    """
+    try:
+        with open(os.path.join(destino, ARQUIVO_MANIFESTO), encoding='utf-8') as arquivo:
+            manifesto = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    if manifesto.get('versao_formato') != VERSAO_FORMATO or manifesto.get('metadados') != metadados:
+        return None
+    return manifesto
+
+
+def _gravar_manifesto(destino, manifesto):
+    """ Troca o manifest de uma vez (arquivo temporário + os.replace): é o que confirma uma anexação
+    """
+    temporario = os.path.join(destino, '.' + ARQUIVO_MANIFESTO + '.tmp')
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, os.path.join(destino, ARQUIVO_MANIFESTO))
+
+
+def _anexar_npy(caminho, dtype, linhas, valores):
+    """ Acrescenta valores a um .npy de cabeçalho fixo que tem (ao menos) linhas valores confirmados
+
+            O que passar de linhas (uma anexação interrompida) é descartado antes.
+    """
+    with open(caminho, 'r+b') as arquivo:
+        arquivo.truncate(TAMANHO_CABECALHO + linhas * np.dtype(dtype).itemsize)
+        arquivo.seek(0, os.SEEK_END)
+        arquivo.write(np.ascontiguousarray(valores, dtype=dtype).tobytes())
+        arquivo.seek(0)
+        arquivo.write(_cabecalho(dtype, linhas + len(valores)))
+
+
+def _regravar_npy(destino, info, dtype, linhas, converter=None):
+    """ Grava uma coluna inteira em um arquivo novo (outra geração) com outro tipo ou outros códigos
+
+            O arquivo antigo só é apagado depois que o manifest passa a apontar para o novo.
+            Output: nome do arquivo antigo
+    """
+    geracao = info.get('geracao', 0) + 1
+    antigo = info['arquivo']
+    novo = f"{antigo.split('.')[0].split('-')[0]}-{geracao}.npy"
+    origem = np.dtype(info['tipo']) if info['tipo'] != 'categoria' else _tipo_codigos(len(info['categorias']))
+    _gravar_npy(os.path.join(destino, novo), os.path.join(destino, antigo), dtype, linhas,
+                converter=(origem, converter or (lambda valores: valores)), deslocamento=TAMANHO_CABECALHO)
+    info['arquivo'], info['geracao'] = novo, geracao
+    return antigo
+
+
+def anexar_snapshot(destino, metadados, lote, novos_metadados):
+    """ Esta função tem a responsabilidade de acrescentar um lote ao snapshot em disco, no lugar,
+            sem regravar as linhas que já estão lá
+
+            Cada coluna recebe só as linhas do lote (texto: bytes, fins e ausentes).
+            Uma coluna só é regravada inteira (em um arquivo novo) quando o lote
+            pede um tipo mais largo ou traz categorias que entram no meio da
+            ordem das existentes (os códigos antigos mudam).
+            A anexação só vale quando o manifest novo é gravado: um leitor ou uma
+            anexação interrompida enxergam as linhas confirmadas no manifest.
+
+            Input: pasta do snapshot, metadados atuais do snapshot, DataFrame limpo do lote
+                   (mesmas colunas, na mesma ordem), metadados depois da anexação
+            Output: True se o lote foi anexado; False se o snapshot não existe, está
+                    desatualizado ou tem outras colunas (então é preciso gravá-lo inteiro)
+    """
+    manifesto = _ler_manifesto(destino, metadados)
+    if manifesto is None or [info['nome'] for info in manifesto['colunas']] != list(lote.columns):
+        return False
+
+    linhas = manifesto['linhas']
+    substituidos = []
+    for info in manifesto['colunas']:
+        serie = lote[info['nome']]
+        caminho = os.path.join(destino, info['arquivo'])
+
+        if info['tipo'] == 'texto':
+            if serie.dtype != object:
+                return False
+            fins, conteudo, nulos = _codificar_texto(serie, info['bytes'])
+            with open(os.path.join(destino, info['dados']), 'r+b') as arquivo:
+                arquivo.truncate(info['bytes'])
+                arquivo.seek(0, os.SEEK_END)
+                arquivo.write(conteudo)
+            _anexar_npy(os.path.join(destino, info['offsets']), np.int64, linhas + 1, fins)
+            _anexar_npy(caminho, bool, linhas, nulos)
+            info['bytes'] += len(conteudo)
+
+        elif info['tipo'] == 'categoria':
+            if not isinstance(serie.dtype, pd.CategoricalDtype):
+                return False
+            antigas = info['categorias']
+            todas = sorted(set(antigas) | set(serie.cat.categories))
+            tipo_antigo, tipo_novo = _tipo_codigos(len(antigas)), _tipo_codigos(len(todas))
+            posicoes = np.searchsorted(np.array(todas, dtype=object), np.array(antigas, dtype=object))
+            if tipo_novo != tipo_antigo or not np.array_equal(posicoes, np.arange(len(antigas))):
+                novo_codigo = np.append(posicoes, -1)
+                substituidos.append(_regravar_npy(destino, info, tipo_novo, linhas,
+                                                  converter=lambda codigos: novo_codigo[codigos]))
+                caminho = os.path.join(destino, info['arquivo'])
+            info['categorias'] = todas
+            locais = np.append(np.searchsorted(np.array(todas, dtype=object),
+                                               np.array(serie.cat.categories, dtype=object)), -1)
+            _anexar_npy(caminho, tipo_novo, linhas, locais[serie.cat.codes.to_numpy()])
+
+        else:
+            valores = serie.to_numpy()
+            if valores.dtype == object:
+                return False
+            dtype = np.promote_types(np.dtype(info['tipo']), valores.dtype)
+            if dtype != np.dtype(info['tipo']):
+                substituidos.append(_regravar_npy(destino, info, dtype, linhas))
+                caminho = os.path.join(destino, info['arquivo'])
+                info['tipo'] = str(dtype)
+            _anexar_npy(caminho, dtype, linhas, valores)
+
+    manifesto['linhas'] = linhas + len(lote)
+    manifesto['metadados'] = novos_metadados
+    _gravar_manifesto(destino, manifesto)
+    for antigo in substituidos:
+        try:
+            os.remove(os.path.join(destino, antigo))
+        except OSError:
+            pass
+    return True
+
+
+def _abrir_npy(destino, arquivo, linhas):
+    """ Abre um .npy do snapshot com memory-map (somente leitura), só com as linhas confirmadas
+    """
+    # view(np.ndarray): mesmo buffer mapeado, sem a subclasse memmap no DataFrame
+    valores = np.load(os.path.join(destino, arquivo), mmap_mode='r').view(np.ndarray)
+    if len(valores) < linhas:
+        raise ValueError(f'{arquivo} tem menos linhas que o manifest')
+    return valores[:linhas]
+
+
+def _abrir_texto(destino, info, linhas):
+    """ Abre uma coluna de texto como strings do Arrow sobre os arquivos mapeados (sem copiar os bytes)
+    """
+    nulos = _abrir_npy(destino, info['arquivo'], linhas)
+    posicoes = _abrir_npy(destino, info['offsets'], linhas + 1)
+    tamanho = int(posicoes[-1])
+    dados = np.memmap(os.path.join(destino, info['dados']), dtype=np.uint8, mode='r', shape=(tamanho,)) \
+        if tamanho else np.zeros(1, dtype=np.uint8)
+    validos = pa.py_buffer(np.packbits(~nulos, bitorder='little'))
+    return pa.LargeStringArray.from_buffers(linhas, pa.py_buffer(posicoes), pa.py_buffer(dados), validos)
+
+
+def ler_snapshot(destino, metadados, texto_mapeado=False):
+    """ Esta função tem a responsabilidade de abrir um snapshot gravado por salvar_snapshot
+
+            As colunas numéricas, de data e os códigos das categóricas são abertos
+            com memory-map (somente leitura),
+            sem copiar os dados para a memória do processo.
+            As colunas de texto viram objetos str (como as do ler_csv); com
+            texto_mapeado=True elas ficam como strings do Arrow (pd.ArrowDtype)
+            sobre os arquivos mapeados, também sem cópia.
+            Só as linhas confirmadas no manifest são lidas (ver anexar_snapshot).
+            Se o snapshot não existir, estiver corrompido ou tiver metadados diferentes
+            dos informados (CSV alterado ou nova versão da limpeza), devolve None.
+
+            Input: pasta do snapshot, dict de metadados esperado, manter o texto mapeado
+            Output: DataFrame ou None
+    """
+    manifesto = _ler_manifesto(destino, metadados)
+    if manifesto is None:
+        return None
+
+    linhas = manifesto['linhas']
+    dados = {}
+    try:
+        for info in manifesto['colunas']:
+            if info['tipo'] == 'texto' and texto_mapeado:
+                dados[info['nome']] = pd.arrays.ArrowExtensionArray(_abrir_texto(destino, info, linhas))
+            elif info['tipo'] == 'texto':
+                texto = _abrir_texto(destino, info, linhas).to_numpy(zero_copy_only=False)
+                texto[_abrir_npy(destino, info['arquivo'], linhas)] = np.nan
+                dados[info['nome']] = texto
+            elif info['tipo'] == 'categoria':
+                dados[info['nome']] = pd.Categorical.from_codes(_abrir_npy(destino, info['arquivo'], linhas),
+                                                                  info['categorias'], ordered=info['ordenada'])
+            else:
+                dados[info['nome']] = _abrir_npy(destino, info['arquivo'], linhas)
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        return None
+
+    df = pd.DataFrame(dados, copy=False)
+    if len(df) != linhas:
+        return None
+    return df
@@ -0,0 +1,225 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import math
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from curry.dados import derivado
+from curry.medicao import medido
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Linhas por página das tabelas paginadas
+TAMANHO_PAGINA = 25
+
+# Opções de linhas por página mostradas no seletor
+TAMANHOS_PAGINA = [10, 25, 50, 100]
+
+# Até n / FRACAO_PARCIAL linhas ordenadas, a página sai de uma seleção parcial (argpartition);
+# acima disso a ordem completa da coluna é calculada e guardada
+FRACAO_PARCIAL = 8
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def _chave_ordenacao(valores, crescente):
+    """ Valores float64 em que a ordem crescente é a ordem pedida, com os ausentes no final
+
+            Datas viram nanossegundos; texto e categorias, o código da posição na ordem dos valores distintos.
+    """
+    valores = pd.Series(valores)
+    ausentes = valores.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(valores):
+        chave = valores.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    elif pd.api.types.is_numeric_dtype(valores):
+        chave = valores.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        chave = pd.factorize(valores, sort=True, use_na_sentinel=True)[0].astype(np.float64)
+    return np.where(ausentes, np.inf, chave if crescente else -chave)
+
+
+class FonteTabela:
+    """ Esta classe tem a responsabilidade de servir as páginas de uma tabela grande
+            (ex.: perfis dos entregadores) já filtradas e ordenadas, sem copiar a tabela
+
+            O índice da tabela é tratado como mais uma coluna. A ordem de cada
+            coluna e sentido é calculada uma vez e guardada (índices pré-ordenados);
+            enquanto só as primeiras páginas são pedidas, uma seleção parcial
+            (argpartition) evita ordenar a tabela inteira. O filtro de texto
+            compara só os valores distintos das colunas de texto.
+            Só as linhas da página pedida são copiadas.
+
+            A fonte guarda só uma referência fraca à tabela: guardada em derivado
+            (fonte_tabela), ela não impede que a tabela seja descartada.
+            Uma fonte compartilhada é usada por várias sessões (threads) ao mesmo
+            tempo: as ordens e o último filtro são lidos e gravados sob um lock.
+    """
+
+    def __init__(self, tabela):
+        self._tabela = weakref.ref(tabela)
+        self.nome_indice = tabela.index.name if not isinstance(tabela.index, pd.RangeIndex) else None
+        self.colunas = ([self.nome_indice] if self.nome_indice is not None else []) + list(tabela.columns)
+        self.ordens = {}
+        self.ultimo_filtro = None
+        self._lock = threading.Lock()
+
+    @property
+    def tabela(self):
+        """ Tabela servida pela fonte
+        """
+        tabela = self._tabela()
+        if tabela is None:
+            raise RuntimeError('A tabela desta FonteTabela já foi descartada')
+        return tabela
+
+    def _valores(self, coluna):
+        """ Valores de uma coluna (ou do índice) da tabela
+        """
+        return self.tabela.index if coluna == self.nome_indice else self.tabela[coluna]
+
+    def _ordem(self, coluna, crescente):
+        """ Posições de todas as linhas na ordem da coluna, calculadas na primeira vez
+
+                A ordem é calculada com o lock: duas sessões que pedem a mesma coluna
+                ao mesmo tempo não ordenam a tabela duas vezes.
+        """
+        with self._lock:
+            ordem = self.ordens.get((coluna, crescente))
+            if ordem is None:
+                chave = _chave_ordenacao(self._valores(coluna), crescente)
+                ordem = np.argsort(chave, kind='stable')
+                ordem.flags.writeable = False
+                self.ordens[(coluna, crescente)] = ordem
+            return ordem
+
+    def _ordem_pronta(self, coluna, crescente):
+        """ True se a ordem da coluna já foi calculada
+        """
+        with self._lock:
+            return (coluna, crescente) in self.ordens
+
+    def _primeiras(self, coluna, crescente, k):
+        """ Posições das k primeiras linhas na ordem da coluna, com seleção parcial
+        """
+        chave = _chave_ordenacao(self._valores(coluna), crescente)
+        if k >= len(chave):
+            return np.argsort(chave, kind='stable')
+        candidatas = np.argpartition(chave, k - 1)[:k]
+        # Empates no limite da seleção: inclui todos e desempata pela posição, como a ordenação estável
+        limite = chave[candidatas].max()
+        empatadas = np.flatnonzero(chave == limite)
+        if len(empatadas) > len(chave) // FRACAO_PARCIAL:
+            return self._ordem(coluna, crescente)[:k]
+        candidatas = np.union1d(candidatas[chave[candidatas] < limite], empatadas)
+        return candidatas[np.argsort(chave[candidatas], kind='stable')][:k]
+
+    def filtrar_texto(self, texto):
+        """ Esta função tem a responsabilidade de marcar as linhas em que alguma coluna de texto
+                (ou o índice) contém o texto, sem diferenciar maiúsculas de minúsculas
+
+                Input: texto buscado ('' = todas as linhas)
+                Output: array booleano por linha, ou None quando todas as linhas servem
+        """
+        texto = texto.strip().lower()
+        if not texto:
+            return None
+        # A última busca fica guardada: o total de linhas e a página saem da mesma máscara
+        with self._lock:
+            ultimo = self.ultimo_filtro
+        if ultimo is not None and ultimo[0] == texto:
+            return ultimo[1]
+
+        mascara = np.zeros(len(self.tabela), dtype=bool)
+        for coluna in self.colunas:
+            valores = self._valores(coluna)
+            if pd.api.types.is_numeric_dtype(valores) or pd.api.types.is_datetime64_any_dtype(valores):
+                continue
+            codigos, distintos = pd.factorize(pd.Series(valores), use_na_sentinel=True)
+            achados = pd.Series(np.asarray(distintos, dtype=object)).astype(str).str.lower() \
+                .str.contains(texto, regex=False)
+            mascara |= np.append(achados.to_numpy(dtype=bool), False)[codigos]
+        mascara.flags.writeable = False
+        # A máscara é calculada fora do lock (outra sessão pode buscar outro texto enquanto isso)
+        with self._lock:
+            self.ultimo_filtro = (texto, mascara)
+        return mascara
+
+    @medido('pagina_tabela')
+    def pagina(self, pagina, tamanho, coluna=None, crescente=True, texto=''):
+        """ Esta função tem a responsabilidade de devolver uma página da tabela filtrada e ordenada
+
+                Input: número da página (começa em 0), linhas por página,
+                       coluna de ordenação (None = ordem original), sentido, texto do filtro
+                Output: DataFrame só com as linhas da página, total de linhas depois do filtro
+        """
+        mascara = self.filtrar_texto(texto)
+        total = len(self.tabela) if mascara is None else int(mascara.sum())
+        inicio, fim = pagina * tamanho, min((pagina + 1) * tamanho, total)
+        if inicio >= fim:
+            return self.tabela.iloc[:0], total
+
+        if coluna is None:
+            posicoes = np.arange(inicio, fim) if mascara is None else np.flatnonzero(mascara)[inicio:fim]
+        elif mascara is not None:
+            # Filtradas: a ordem guardada da coluna é percorrida mantendo só as linhas que passam no filtro
+            ordem = self._ordem(coluna, crescente)
+            posicoes = ordem[mascara[ordem]][inicio:fim]
+        elif self._ordem_pronta(coluna, crescente) or fim > len(self.tabela) // FRACAO_PARCIAL:
+            posicoes = self._ordem(coluna, crescente)[inicio:fim]
+        else:
+            posicoes = self._primeiras(coluna, crescente, fim)[inicio:]
+        return self.tabela.iloc[posicoes], total
+
+
+def fonte_tabela(tabela):
+    """ Esta função tem a responsabilidade de devolver a FonteTabela de uma tabela,
+            construindo-a só na primeira vez (uma por tabela; tabelas compartilhadas
+            entre sessões, como os perfis, compartilham também as ordens já calculadas)
+    """
+    return derivado(tabela, 'fonte_tabela', FonteTabela)
+
+
+def tabela_paginada(tabela, chave, tamanho=TAMANHO_PAGINA, compartilhada=False):
+    """ Esta função tem a responsabilidade de mostrar uma tabela paginada, ordenável e com filtro
+            de texto, enviando ao navegador só as linhas da página visível
+
+            Com compartilhada=True (tabelas que duram entre as execuções, como os
+            perfis), a FonteTabela e as ordens já calculadas ficam guardadas com a
+            tabela (fonte_tabela). Tabelas pequenas montadas de novo a cada execução
+            usam uma FonteTabela só daquela execução.
+
+            Input: DataFrame (não é alterado), prefixo das chaves dos widgets,
+                   linhas por página padrão, tabela compartilhada entre execuções
+    """
+    import streamlit as st
+
+    fonte = fonte_tabela(tabela) if compartilhada else FonteTabela(tabela)
+    col1, col2, col3, col4 = st.columns([3, 3, 2, 2])
+    with col1:
+        texto = st.text_input('Filtrar', key=f'{chave}_filtro', placeholder='texto em qualquer coluna')
+    with col2:
+        coluna = st.selectbox('Ordenar por', [None] + fonte.colunas, key=f'{chave}_coluna',
+                              format_func=lambda c: 'ordem original' if c is None else str(c))
+    with col3:
+        sentido = st.selectbox('Sentido', ['crescente', 'decrescente'], key=f'{chave}_sentido')
+    with col4:
+        tamanho = st.selectbox('Linhas por página', TAMANHOS_PAGINA, key=f'{chave}_tamanho',
+                               index=TAMANHOS_PAGINA.index(tamanho) if tamanho in TAMANHOS_PAGINA else 0)
+
+    mascara = fonte.filtrar_texto(texto)
+    total = len(tabela) if mascara is None else int(mascara.sum())
+    paginas = max(1, math.ceil(total / tamanho))
+    pagina = st.number_input(f'Página (de {paginas})', min_value=1, max_value=paginas, value=1, step=1,
+                             key=f'{chave}_pagina_{paginas}')
+    linhas, total = fonte.pagina(int(pagina) - 1, tamanho, coluna, sentido == 'crescente', texto)
+    st.dataframe(linhas, use_container_width=True, hide_index=fonte.nome_indice is None)
+    inicio = (int(pagina) - 1) * tamanho
+    st.caption(f'Linhas {min(inicio + 1, total)}–{inicio + len(linhas)} de {total}')
@@ -3,131 +3,58 @@
 # ====================================================================
 
 import plotly.express as px
-from haversine import haversine
 
 # ====================================================================
 # ==========================BIBLIOTECAS NECESSARIAS=============================
 # ====================================================================
 
-import pandas as pd
 import streamlit as st
 from PIL import Image
 from datetime import datetime
-import folium as fo
+
+from curry.cache import por_filtros
+from curry.dados import carregar_dados
+from curry.medicao import fragmento_medido, iniciar_rerun, medido, medir, painel_medicao
+from curry.calendario import GRANULARIDADES, agregado_tempo_dados
+from curry.cubo import cubo_dados, filtrar_cubo
+from curry.filtros import chave_filtros, indice_filtros
+from curry.graficos import preparar_figura
+from curry.espacial import RESOLUCOES, celulas_filtradas, mapa_celulas
+from curry.mapa import html_mapa, mapa_empresa
+from curry.metricas import (localizacao_mediana, pedidos_cidade_trafego, pedidos_entregador_semana,
+                            pedidos_por_periodo, pedidos_por_trafego)
 
 st.set_page_config( page_title='Visão Empresa', page_icon='📈', layout='wide')
+# Começa a lista de etapas medidas neste rerun (painel de medição na barra lateral)
+iniciar_rerun()
 
 # ====================================================================
 # ==========================IMPORTAR CSV=============================
 # ====================================================================
 
-df = pd.read_csv("dataset/train.csv")
-df_copy = df
+# Colunas usadas nesta página (as avaliações e as coordenadas dos restaurantes nem são lidas)
+COLUNAS = ['ID', 'Delivery_person_ID', 'Order_Date', 'week_of_year', 'City', 'Road_traffic_density',
+           'Delivery_location_latitude', 'Delivery_location_longitude', 'Time_taken(min)',
+           'Time_Orderd', 'Time_Order_picked']
+
+# DataFrame já limpo, compartilhado pelo cache (não deve ser alterado)
+df = carregar_dados("dataset/train.csv", colunas=COLUNAS)
 
 # ====================================================================
 # ==========================FUNCOES=============================
 # ====================================================================
 
-def clean_code(df):
-    """ Esta função tem a responsabilidade de limpar o DataFrame
-
-            Tipos de limpeza:
-            
-            Remoção dos dados NaN
-            Mudança do tipo da coluna
-            Remoção dos espaços das variáveis de texto
-            Formatação da coluna de datas
-            impeza da coluna de tempo (remoção do texto da variável numérica)
-            
-            Input: DataFrame
-            Output: DataFrame  
-    """
-    # REMOVENDO ESPAÇOS DE TODA COLUNA QUE POSSUA TEXTO
-    for col in df.select_dtypes(include='object').columns:
-        df[col] = df[col].map(lambda x: x.strip() if isinstance(x, str) else x)
-
-    # REMOVENDO NaN DAS COLUNAS QUE IREI TROCAR OS TIPOS
-    colunas_limpeza = ['Delivery_person_Age', 'multiple_deliveries', 'Festival', 
-                       'Weatherconditions', 'City', 'Time_taken(min)']
-
-    for coluna in colunas_limpeza:
-        df = df[df[coluna].str.lower().str.strip() != 'nan']
-
-    # REINICIANDO O INDEX
-    df = df.reset_index(drop=True)
-
-    # ALTERANDO OS TIPOS DAS COLUNAS
-    df['Delivery_person_Age'] = df['Delivery_person_Age'].astype(int)
-    df['Delivery_person_Ratings'] = df['Delivery_person_Ratings'].astype(float)
-    df['multiple_deliveries'] = df['multiple_deliveries'].astype(int)
-    df['Order_Date'] = pd.to_datetime(df['Order_Date'], format='%d-%m-%Y')
-
-    # LIMPANDO COLUNA DE TEMPO
-    df['Time_taken(min)'] = df['Time_taken(min)'].astype(str).str.extract(r'(\d+)')
-    df['Time_taken(min)'] = pd.to_numeric(df['Time_taken(min)'], errors='coerce')
-
-    # ADICIONANDO COLUNA DIA DA SEMANA
-    df['week_of_year'] = df['Order_Date'].dt.strftime('%U').astype(int)
-
-    # DISTÂNCIA ENTRE RESTAURANTE E LOCAL DE ENTREGA
-    df['distance_delivery'] = df.loc[:, ['Restaurant_latitude', 'Restaurant_longitude', 
-                                         'Delivery_location_latitude', 'Delivery_location_longitude']].apply(
-        lambda x: haversine((x['Restaurant_latitude'], x['Restaurant_longitude']),
-                            (x['Delivery_location_latitude'], x['Delivery_location_longitude'])),
-        axis=1
-    )
-
-    return df
-
-
-
-def mapa_empresa(df1):
-    """     
-                Essa funcao é responsável por fazer os filtros para o mapa      
-    """
-    df_aux = df1[['City', 'Road_traffic_density', 'Delivery_location_latitude', 'Delivery_location_longitude']] \
-    .groupby(['City', 'Road_traffic_density']) \
-    .median().reset_index()
-    
-    mapa = fo.Map(location=[df_aux['Delivery_location_latitude'].mean(),
-                            df_aux['Delivery_location_longitude'].mean()],
-                  zoom_start=5)    
-    for _, row in df_aux.iterrows():
-        fo.Marker(
-            location=[row['Delivery_location_latitude'], row['Delivery_location_longitude']],
-            popup=f"{row['City']} - {row['Road_traffic_density']}"
-        ).add_to(mapa)
-    
-    bounds = [[df_aux['Delivery_location_latitude'].min(), df_aux['Delivery_location_longitude'].min()],
-              [df_aux['Delivery_location_latitude'].max(), df_aux['Delivery_location_longitude'].max()]]
-    
-    mapa.fit_bounds(bounds)
-    return mapa._repr_html_()  # Cria o HTML do mapa
-
-    
-
+@medido('empresa.pedidos_semana')
 def pedidos_semana(df1):
     """     
                 Essa funcao é responsável por filtrar os pedidos feitos na semana e plotar um gráfico de linhas    
     """
-    df_aux1 = df1.loc[:, ['ID','week_of_year']].groupby('week_of_year').count().reset_index()
-    df_aux2 = df1.loc[:, ['Delivery_person_ID', 'week_of_year']].groupby('week_of_year').nunique().reset_index()
-    
-    df_aux = pd.merge(df_aux1, df_aux2, how='inner')
-    df_aux['Order_by_delivery'] = df_aux['ID'] / df_aux['Delivery_person_ID']
-    fig = px.line(df_aux, x='week_of_year', y='Order_by_delivery')
+    df_aux = pedidos_entregador_semana(df1)
+    # Mesmas semanas (ISO) e mesmo eixo x do gráfico de pedidos por semana
+    fig = px.line(df_aux, x='periodo', y='Order_by_delivery', labels={'periodo': GRANULARIDADES['semana']})
     return fig
 
 
-# ====================================================================
-# ==========================LIMPAR DADOS=============================
-# ====================================================================
-
-
-df = clean_code(df)
-df1 = df.copy()
-
-
 # ====================================================================
 # ==========================BARRA LATERAL=============================
 # ====================================================================
@@ -183,29 +110,41 @@ if not city_options:
 st.sidebar.markdown("""---""")
 st.sidebar.markdown('### Powered by Comunidade DS')
 
-# FILTRO DE DATA
-linhas_selecionadas = df1['Order_Date'] < date_slider
-df1 = df1.loc[linhas_selecionadas, :]
-# FILTRO DE TRANSTITO
-linhas_selecionadas = df1['Road_traffic_density'].isin(traffic_options)
-df1 = df1.loc[linhas_selecionadas, :]
-# FILTRO DE CIDADE
-linhas_selecionadas = df1['City'].isin(city_options)
-df1 = df1.loc[linhas_selecionadas, :]
+# FILTROS DE DATA, TRÂNSITO E CIDADE
+# O filtro das linhas (df1) só é aplicado pelas seções que usam as linhas
+filtros = (date_slider, traffic_options, city_options)
+# Os gráficos de contagem usam o cubo de agregados com os mesmos filtros
+cubo = filtrar_cubo(cubo_dados(df), *filtros)
+# Os gráficos por período usam o pré-agregado de tempo (dia x hora) com os mesmos filtros
+agregado = filtrar_cubo(agregado_tempo_dados(df), *filtros)
 
 # ====================================================================
 # =========================LAYOUT NO STREAMLIT=======================#
 # ====================================================================
 
+# Cada visão é um fragmento: só a visão escolhida é calculada, e os widgets
+# de dentro de uma visão (ex.: camada do mapa de densidade) só reexecutam essa visão.
+
+@fragmento_medido('empresa.pedidos_periodo')
+def pedidos_periodo(agregado, padrao, chave, grafico=px.bar):
+    """
+                Essa funcao é responsável por plotar os pedidos por período, na granularidade escolhida
+
+                Fragmento próprio: trocar a granularidade só refaz este gráfico, a partir
+                do pré-agregado de tempo (dia x hora) já filtrado.
+    """
+    granularidade = st.segmented_control('Granularidade', list(GRANULARIDADES), default=padrao, key=chave,
+                                         format_func=GRANULARIDADES.get) or padrao
+    df_aux = pedidos_por_periodo(agregado, granularidade)
+    fig = grafico(df_aux, x='periodo', y='pedidos', labels={'periodo': GRANULARIDADES[granularidade]})
+    st.plotly_chart(preparar_figura(fig), use_container_width=True)
 
-tab1, tab2, tab3 = st.tabs( ['Visão Gerencial','Visão Tática','Visão Geográfica'] )
 
-with tab1:
+@fragmento_medido('empresa.visao_gerencial')
+def visao_gerencial(cubo, agregado):
     st.markdown("## 📅 Pedidos diários")
-    st.markdown("*Número total de pedidos por data.*")
-    df_aux = df1.loc[:, ['ID', 'Order_Date']].groupby(['Order_Date']).count().reset_index()
-    fig = px.bar(df_aux, x='Order_Date', y='ID')
-    st.plotly_chart(fig, use_container_width=True)
+    st.markdown("*Número total de pedidos por data (ou por semana, mês e hora do dia).*")
+    pedidos_periodo(agregado, 'dia', 'granularidade_gerencial')
     st.markdown("""---""")
     
     col1, col2 = st.columns(2)
@@ -213,80 +152,72 @@ with tab1:
     with col1:
         st.markdown("## 🚦 Pedidos por densidade de tráfego")
         st.markdown("*Distribuição dos pedidos segundo a densidade do trânsito.*")
-        df_aux = df1.loc[:, ['ID', 'Road_traffic_density']].groupby('Road_traffic_density').count().reset_index()
-        fig = px.pie(df_aux, values='ID', names = 'Road_traffic_density')
-        st.plotly_chart(fig, use_container_width=True)
+        df_aux = pedidos_por_trafego(cubo)
+        fig = px.pie(df_aux, values='pedidos', names = 'Road_traffic_density')
+        st.plotly_chart(preparar_figura(fig), use_container_width=True)
     with col2:
         st.markdown("## 🌆 Pedidos por cidade e tráfego")
         st.markdown("*Pedidos agrupados por cidade e densidade de trânsito.*")
-        df_aux = df1.loc[:,['ID','City','Road_traffic_density']].groupby(['City','Road_traffic_density']).count().reset_index()
-        fig = px.scatter(df_aux, x='City', y='Road_traffic_density', size='ID', color='City')
-        st.plotly_chart(fig, use_container_width=True)
+        df_aux = pedidos_cidade_trafego(cubo)
+        fig = px.scatter(df_aux, x='City', y='Road_traffic_density', size='pedidos', color='City')
+        st.plotly_chart(preparar_figura(fig), use_container_width=True)
+
 
-with tab2:
+@fragmento_medido('empresa.visao_tatica')
+def visao_tatica(agregado, filtros):
     with st.container():
         st.markdown("## 📈 Pedidos por semana")
-        st.markdown("*Evolução do número total de pedidos ao longo das semanas.*")
-        # Quantidade de pedidos por semana.
-        df_aux = df1.loc[:,['ID','week_of_year']].groupby('week_of_year').count().reset_index()
-        fig = px.line(df_aux, x='week_of_year', y='ID')
-        st.plotly_chart(fig, use_container_width=True)
+        st.markdown("*Evolução do número total de pedidos ao longo das semanas (ou dos dias, meses e horas do dia).*")
+        # Quantidade de pedidos por semana ISO (as semanas saem da soma dos dias).
+        pedidos_periodo(agregado, 'semana', 'granularidade_tatica', px.line)
     st.markdown("""---""")
     with st.container():
         st.markdown("## 🛵 Pedidos por entregador por semana")
         st.markdown("*Número médio de pedidos realizados por entregador a cada semana.*")
-        fig = pedidos_semana(df1)
+        # Depende das linhas (entregadores distintos): guardado por dataset + filtros
+        fig = por_filtros(df, 'pedidos_semana', chave_filtros(*filtros),
+                          lambda: preparar_figura(pedidos_semana(indice_filtros(df).filtrar(*filtros))))
         st.plotly_chart(fig, use_container_width=True)
 
-    
-with tab3:
+
+@fragmento_medido('empresa.visao_geografica')
+def visao_geografica(filtros):
+    chave = chave_filtros(*filtros)
     st.markdown("## 🗺️ Mapa das entregas por cidade e tráfego")
     st.markdown("*Localização média das entregas agrupadas por cidade e densidade do trânsito.*")
-    map_html = mapa_empresa(df1)
-    st.components.v1.html(map_html, height=600)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    # HTML em cache por versão do dataset + filtros: só é gerado quando algum dos dois muda
+    map_html = html_mapa(df, 'mapa_empresa', chave,
+                         lambda: mapa_empresa(localizacao_mediana(indice_filtros(df).filtrar(*filtros))))
+    with medir('render.mapa_empresa'):
+        st.components.v1.html(map_html, height=600)
+    st.markdown("""---""")
 
+    st.markdown("## 🔥 Densidade das entregas")
+    st.markdown("*Entregas agrupadas em células de uma grade: quantidade de pedidos (calor) ou tempo médio de entrega (grade).*")
+    col1, col2 = st.columns(2)
+    with col1:
+        modo = st.radio('Camada', ['calor', 'grade'], horizontal=True,
+                        format_func={'calor': 'Mapa de calor (pedidos)', 'grade': 'Grade (tempo médio)'}.get)
+    with col2:
+        resolucao = st.select_slider('Resolução da grade', options=list(RESOLUCOES), value='Região (0,25°)')
+    # Só as células (no máximo MAX_CELULAS) vão para o navegador, nunca os pontos de cada entrega
+    densidade_html = html_mapa(df, f'densidade_{modo}_{resolucao}', chave,
+                               lambda: mapa_celulas(celulas_filtradas(df, resolucao, filtros),
+                                                    resolucao, modo)._repr_html_())
+    with medir('render.densidade'):
+        st.components.v1.html(densidade_html, height=600)
+
+
+# No lugar de st.tabs (que executa o conteúdo de todas as abas), só a visão selecionada é montada
+ABAS = ['Visão Gerencial', 'Visão Tática', 'Visão Geográfica']
+aba = st.segmented_control('Visão', ABAS, default=ABAS[0], key='aba_empresa', label_visibility='collapsed') or ABAS[0]
+
+if aba == 'Visão Gerencial':
+    visao_gerencial(cubo, agregado)
+elif aba == 'Visão Tática':
+    visao_tatica(agregado, filtros)
+else:
+    visao_geografica(filtros)
+
+# Painel de medição (escondido; aparece com ?debug=1 na URL)
+painel_medicao()
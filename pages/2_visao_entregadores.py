@@ -2,118 +2,39 @@
 # ==========================BIBLIOTECAS=============================
 # ====================================================================
 
-from haversine import haversine
 
 # ====================================================================
 # ==========================BIBLIOTECAS NECESSARIAS=============================
 # ====================================================================
 
-import pandas as pd
 import streamlit as st
 from PIL import Image
 from datetime import datetime
 
+from curry.cache import por_filtros
+from curry.dados import carregar_dados
+from curry.medicao import fragmento_medido, iniciar_rerun, painel_medicao
+from curry.cubo import cubo_dados, filtrar_cubo
+from curry.filtros import chave_filtros, indice_filtros
+from curry.metricas import avaliacao_por_clima, avaliacao_por_entregador, avaliacao_por_trafego, limites_entregadores
+from curry.perfis import perfis_dados
+from curry.ranking import top_entregadores
+from curry.tabelas import tabela_paginada
+
 st.set_page_config( page_title='Visão Entregadores', page_icon='🚴‍♂️', layout='wide')
+# Começa a lista de etapas medidas neste rerun (painel de medição na barra lateral)
+iniciar_rerun()
 
 # ====================================================================
 # ==========================IMPORTAR CSV=============================
 # ====================================================================
 
-df = pd.read_csv("dataset/train.csv")
-df_copy = df
-
-# ====================================================================
-# ==========================FUNCOES=============================
-# ====================================================================
-
-def clean_code(df):
-    """ Esta função tem a responsabilidade de limpar o DataFrame
-
-            Tipos de limpeza:
-            
-            Remoção dos dados NaN
-            Mudança do tipo da coluna
-            Remoção dos espaços das variáveis de texto
-            Formatação da coluna de datas
-            impeza da coluna de tempo (remoção do texto da variável numérica)
-            
-            Input: DataFrame
-            Output: DataFrame  
-    """
-    # REMOVENDO ESPAÇOS DE TODA COLUNA QUE POSSUA TEXTO
-    for col in df.select_dtypes(include='object').columns:
-        df[col] = df[col].map(lambda x: x.strip() if isinstance(x, str) else x)
-
-    # REMOVENDO NaN DAS COLUNAS QUE IREI TROCAR OS TIPOS
-    colunas_limpeza = ['Delivery_person_Age', 'multiple_deliveries', 'Festival', 
-                       'Weatherconditions', 'City', 'Time_taken(min)']
-
-    for coluna in colunas_limpeza:
-        df = df[df[coluna].str.lower().str.strip() != 'nan']
-
-    # REINICIANDO O INDEX
-    df = df.reset_index(drop=True)
-
-    # ALTERANDO OS TIPOS DAS COLUNAS
-    df['Delivery_person_Age'] = df['Delivery_person_Age'].astype(int)
-    df['Delivery_person_Ratings'] = df['Delivery_person_Ratings'].astype(float)
-    df['multiple_deliveries'] = df['multiple_deliveries'].astype(int)
-    df['Order_Date'] = pd.to_datetime(df['Order_Date'], format='%d-%m-%Y')
-
-    # LIMPANDO COLUNA DE TEMPO
-    df['Time_taken(min)'] = df['Time_taken(min)'].astype(str).str.extract(r'(\d+)')
-    df['Time_taken(min)'] = pd.to_numeric(df['Time_taken(min)'], errors='coerce')
-
-    # ADICIONANDO COLUNA DIA DA SEMANA
-    df['week_of_year'] = df['Order_Date'].dt.strftime('%U').astype(int)
-
-    # DISTÂNCIA ENTRE RESTAURANTE E LOCAL DE ENTREGA
-    df['distance_delivery'] = df.loc[:, ['Restaurant_latitude', 'Restaurant_longitude', 
-                                         'Delivery_location_latitude', 'Delivery_location_longitude']].apply(
-        lambda x: haversine((x['Restaurant_latitude'], x['Restaurant_longitude']),
-                            (x['Delivery_location_latitude'], x['Delivery_location_longitude'])),
-        axis=1
-    )
-
-    return df
-
-
-def top_delivery(df1, top_geral, top_velocidade):
-    """ Esta função tem a responsabilidade de calcular os 10 
-            entregadores mais rapidos por cidade
-
-            top_geral = será o primeiro ascending, para selecionar os 10 primeiros entregadores
-            top_velocidade = será o rank realizado pelo dense
-
-            Resumo: Para os mais rápidos = (True, True)
-                    Para os mais lentos = (False, False)
-    """
-    df2 = df1.loc[:, ['Delivery_person_ID', 'Time_taken(min)', 'City']] \
-        .groupby(['City', 'Delivery_person_ID']) \
-        .mean() \
-        .sort_values(['City', 'Time_taken(min)'], ascending=top_geral) \
-        .reset_index()
-    
-    # Seleciona os 10 primeiros entregadores por cidade
-    df_aux01 = df2.loc[df2['City'] == 'Metropolitian', :].head(10)
-    df_aux02 = df2.loc[df2['City'] == 'Urban', :].head(10)
-    df_aux03 = df2.loc[df2['City'] == 'Semi-Urban'].head(10)
-    
-    df_aux_final = pd.concat([df_aux01, df_aux02, df_aux03]).reset_index(drop=True)
-    
-    # Aplica dense rank dentro de cada cidade
-    df_aux_final['Rank_fast'] = df_aux_final.groupby('City')['Time_taken(min)'] \
-        .rank(method='dense', ascending=top_velocidade).astype(int)
-    return df_aux_final
-
-                
-# ====================================================================
-# ==========================LIMPAR DADOS=============================
-# ====================================================================
-
-df = clean_code(df)
-df1 = df.copy()
+# Colunas usadas nesta página (as coordenadas nem são lidas)
+COLUNAS = ['Delivery_person_ID', 'Delivery_person_Age', 'Delivery_person_Ratings', 'Vehicle_condition',
+           'Weatherconditions', 'Road_traffic_density', 'City', 'Time_taken(min)']
 
+# DataFrame já limpo, compartilhado pelo cache (não deve ser alterado)
+df = carregar_dados("dataset/train.csv", colunas=COLUNAS)
 
 # ====================================================================
 # ==========================BARRA LATERAL=============================
@@ -170,119 +91,133 @@ if not city_options:
 st.sidebar.markdown("""---""")
 st.sidebar.markdown('### Powered by Comunidade DS')
 
-# FILTRO DE DATA
-linhas_selecionadas = df1['Order_Date'] < date_slider
-df1 = df1.loc[linhas_selecionadas, :]
-# FILTRO DE TRANSTITO
-linhas_selecionadas = df1['Road_traffic_density'].isin(traffic_options)
-df1 = df1.loc[linhas_selecionadas, :]
-# FILTRO DE CIDADE
-linhas_selecionadas = df1['City'].isin(city_options)
-df1 = df1.loc[linhas_selecionadas, :]
+# FILTROS DE DATA, TRÂNSITO E CIDADE
+# O filtro das linhas só é aplicado (e guardado por filtros) nas seções que usam as linhas
+filtros = (date_slider, traffic_options, city_options)
+# Médias e desvios padrão por trânsito e clima vêm do cubo de agregados com os mesmos filtros
+cubo = filtrar_cubo(cubo_dados(df), *filtros)
 
 
 # ====================================================================
 # =========================LAYOUT NO STREAMLIT=======================#
 # ====================================================================
 
+# Cada seção é um fragmento; as partes que percorrem as linhas filtradas ficam
+# em cache por dataset + filtros (por_filtros) e só são recalculadas quando eles mudam.
+
+@fragmento_medido('entregadores.secao_idades_veiculos')
+def secao_idades_veiculos(filtros):
+    st.markdown("## 🕰️ Idades dos entregadores e condições dos veículos")
+    limites = por_filtros(df, 'idades_veiculos', chave_filtros(*filtros),
+                          lambda: limites_entregadores(indice_filtros(df).filtrar(*filtros)))
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+          st.metric(
+            label="🧒 Menor idade entregador", 
+            value=str(limites.loc['min', 'Delivery_person_Age'])
+        )
+    with col2:
+          st.metric(
+            label="👴 Maior idade entregador", 
+            value=str(limites.loc['max', 'Delivery_person_Age'])
+        )
+    with col3:
+        st.metric(
+            label='🚗 Pior condição veículo',
+            value=str(limites.loc['min', 'Vehicle_condition'])
+        )
+    with col4:
+        st.metric(
+            label='🚙 Melhor condição veículo',
+            value=str(limites.loc['max', 'Vehicle_condition'])
+        )
+
+
+@fragmento_medido('entregadores.secao_avaliacoes')
+def secao_avaliacoes(cubo, filtros):
+    st.markdown("""---""")
+    st.markdown("## 📝 Análise das avaliações")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("*⭐ Avaliação média por entregador*")
+        # A avaliação média por entregador segue os filtros da barra lateral; a tabela fica em cache
+        # por dataset + filtros (a mesma para todas as sessões) e só a página visível vai para o navegador
+        tabela = por_filtros(df, 'avaliacao_entregador', chave_filtros(*filtros),
+                             lambda: avaliacao_por_entregador(indice_filtros(df).filtrar(*filtros)))
+        tabela_paginada(tabela, 'avaliacao_entregador', compartilhada=True)
+    with col2:
+        st.markdown("*🚦 Avaliação média e desvio padrão por tipo de tráfego*")
+        # A avaliação média e o desvio padrão por tipo de tráfego.
+        df_aux = avaliacao_por_trafego(cubo)
+        st.dataframe(df_aux)
+
+        st.markdown("*🌤 Avaliação média e desvio padrão por condições climáticas*")
+        #A avaliação média e o desvio padrão por condições climáticas
+        df_aux = avaliacao_por_clima(cubo)
+        st.dataframe(df_aux)
+
+
+@fragmento_medido('entregadores.secao_perfil_entregador')
+def secao_perfil_entregador():
+    st.markdown("""---""")
+    st.markdown("## 🔎 Perfil do entregador")
+    # Busca um entregador pelo ID nos perfis (sem percorrer os pedidos)
+    entregador = st.text_input('ID do entregador', placeholder='ex.: INDORES13DEL02').strip()
+    if not entregador:
+        return
+    perfil = perfis_dados(df).perfil(entregador)
+    if perfil is None:
+        st.info(f'Entregador {entregador} não encontrado')
+        return
+
+    resumo, quebras = perfil
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(label='📦 Pedidos', value=int(resumo['pedidos']))
+    with col2:
+        st.metric(label='⭐ Avaliação média', value=f"{resumo['avaliacao_media']:.2f}")
+    with col3:
+        st.metric(label='⏱️ Tempo médio (min)', value=f"{resumo['tempo_medio']:.2f}")
+    with col4:
+        st.metric(label='📐 Variância do tempo', value=f"{resumo['tempo_variancia']:.2f}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("*🚦 Por tipo de tráfego*")
+        st.dataframe(quebras['trafego'])
+    with col2:
+        st.markdown("*🌤 Por condições climáticas*")
+        st.dataframe(quebras['clima'])
+
+
+@fragmento_medido('entregadores.secao_top_entregadores')
+def secao_top_entregadores(filtros):
+    st.markdown("""---""")
+    st.markdown("## 🚴‍♂️ Top 10 Entregadores por velocidade e por cidade")
+    # Os 10 entregadores mais rápidos e os 10 mais lentos por cidade, em uma única passada
+    df_top10_rapidos, df_top10_lentos = por_filtros(df, 'top_entregadores', chave_filtros(*filtros),
+                                                    lambda: top_entregadores(indice_filtros(df).filtrar(*filtros), k=10))
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("*⚡ Top 10 entregadores mais rápidos por cidade*")
+        st.dataframe(df_top10_rapidos)
+
+    with col2:
+        st.markdown("*🐢 Top 10 entregadores mais lentos por cidade*")
+        st.dataframe(df_top10_lentos)
+
+
 tab1, tab2, tab3 = st.tabs( ['Visão Gerencial','_','_'] )
 
 with tab1:
     with st.container():
-        st.markdown("## 🕰️ Idades dos entregadores e condições dos veículos")
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-              st.metric(
-                label="🧒 Menor idade entregador", 
-                value=str(df1['Delivery_person_Age'].min())
-            )
-        with col2:
-              st.metric(
-                label="👴 Maior idade entregador", 
-                value=str(df1['Delivery_person_Age'].max())
-            )
-        with col3:
-            st.metric(
-                label='🚗 Pior condição veículo',
-                value=str(df1['Vehicle_condition'].min())
-            )
-        with col4:
-            st.metric(
-                label='🚙 Melhor condição veículo',
-                value=str(df1['Vehicle_condition'].max())
-            )
+        secao_idades_veiculos(filtros)
     with st.container():
-        st.markdown("""---""")
-        st.markdown("## 📝 Análise das avaliações")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("*⭐ Avaliação média por entregador*")
-            # A avaliação médida por entregador.
-            df_aux = df1.loc[:,['Delivery_person_ID','Delivery_person_Ratings']].groupby('Delivery_person_ID').mean().reset_index()
-            st.dataframe(df_aux)
-        with col2:
-            st.markdown("*🚦 Avaliação média e desvio padrão por tipo de tráfego*")
-            # A avaliação média e o desvio padrão por tipo de tráfego.
-            df_aux = df1.loc[:,['Road_traffic_density','Delivery_person_Ratings']].groupby('Road_traffic_density').agg({'Delivery_person_Ratings': ['mean', 'std']})
-            # Mudar nome coluna
-            df_aux.columns = ['rating_traffic_mean', 'rating_traffic_std']
-            # resetar index
-            df_aux.reset_index()
-            st.dataframe(df_aux)
-
-            st.markdown("*🌤 Avaliação média e desvio padrão por condições climáticas*")
-            #A avaliação média e o desvio padrão por condições climáticas
-            df_aux = df1.loc[:,['Weatherconditions','Delivery_person_Ratings']].groupby('Weatherconditions').agg({'Delivery_person_Ratings': ['mean', 'std']})
-            # Mudar nome coluna
-            df_aux.columns = ['rating_weather_mean', 'rating_weather_std']
-            # resetar index
-            df_aux.reset_index()
-            st.dataframe(df_aux)
-
-                    
+        secao_avaliacoes(cubo, filtros)
     with st.container():
-        st.markdown("""---""")
-        st.markdown("## 🚴‍♂️ Top 10 Entregadores por velocidade e por cidade")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("*⚡ Top 10 entregadores mais rápidos por cidade*")
-            # Os 10 entregadores mais rápidos por cidade
-            df_top10_rapidos = top_delivery(df1, top_geral=True, top_velocidade=True)
-            st.dataframe(df_top10_rapidos)
-
-        with col2:
-            st.markdown("*🐢 Top 10 entregadores mais lentos por cidade*")
-            # Os 10 entregadores mais lentos por cidade
-            df_top10_lentos = top_delivery(df1, top_geral=False, top_velocidade=False)
-            st.dataframe(df_top10_lentos)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        secao_perfil_entregador()
+    with st.container():
+        secao_top_entregadores(filtros)
 
+# Painel de medição (escondido; aparece com ?debug=1 na URL)
+painel_medicao()
@@ -3,120 +3,56 @@
 # ====================================================================
 
 import plotly.express as px
-from haversine import haversine
 
 # ====================================================================
 # ==========================BIBLIOTECAS NECESSARIAS=============================
 # ====================================================================
 
-import pandas as pd
 import streamlit as st
 from PIL import Image
 from datetime import datetime
+
+from curry.cache import por_filtros
+from curry.dados import carregar_dados
+from curry.medicao import fragmento_medido, iniciar_rerun, medido, painel_medicao
+from curry.cubo import cubo_dados, filtrar_cubo
+from curry.filtros import chave_filtros, indice_filtros
+from curry.graficos import preparar_figura
+from curry.metricas import (distancia_media, distancia_por_cidade, entregadores_distintos, status_dia,
+                            tempo_cidade_pedido, tempo_cidade_trafego, tempo_festival, tempo_por_cidade)
+from curry.quantis import ERRO_RELATIVO, filtrar_sketch, quantis, sketch_dados
+from curry.tabelas import tabela_paginada
 import plotly.graph_objects as go
 import numpy as np
 
 st.set_page_config( page_title='Visão Restaurantes', page_icon='🍽️', layout='wide')
+# Começa a lista de etapas medidas neste rerun (painel de medição na barra lateral)
+iniciar_rerun()
 
 # ====================================================================
 # ==========================IMPORTAR CSV=============================
 # ====================================================================
 
-df = pd.read_csv("dataset/train.csv")
-df_copy = df
+# Colunas usadas nesta página (distance_delivery traz as coordenadas de restaurante e entrega)
+COLUNAS = ['Delivery_person_ID', 'distance_delivery', 'Time_taken(min)', 'Festival', 'City',
+           'Road_traffic_density', 'Type_of_order']
+
+# DataFrame já limpo, compartilhado pelo cache (não deve ser alterado)
+df = carregar_dados("dataset/train.csv", colunas=COLUNAS)
 
 # ====================================================================
 # ==========================FUNCOES=============================
 # ====================================================================
 
-def clean_code(df):
-    """ Esta função tem a responsabilidade de limpar o DataFrame
-
-            Tipos de limpeza:
-            
-            Remoção dos dados NaN
-            Mudança do tipo da coluna
-            Remoção dos espaços das variáveis de texto
-            Formatação da coluna de datas
-            impeza da coluna de tempo (remoção do texto da variável numérica)
-            
-            Input: DataFrame
-            Output: DataFrame  
-    """
-    # REMOVENDO ESPAÇOS DE TODA COLUNA QUE POSSUA TEXTO
-    for col in df.select_dtypes(include='object').columns:
-        df[col] = df[col].map(lambda x: x.strip() if isinstance(x, str) else x)
-
-    # REMOVENDO NaN DAS COLUNAS QUE IREI TROCAR OS TIPOS
-    colunas_limpeza = ['Delivery_person_Age', 'multiple_deliveries', 'Festival', 
-                       'Weatherconditions', 'City', 'Time_taken(min)']
-
-    for coluna in colunas_limpeza:
-        df = df[df[coluna].str.lower().str.strip() != 'nan']
-
-    # REINICIANDO O INDEX
-    df = df.reset_index(drop=True)
-
-    # ALTERANDO OS TIPOS DAS COLUNAS
-    df['Delivery_person_Age'] = df['Delivery_person_Age'].astype(int)
-    df['Delivery_person_Ratings'] = df['Delivery_person_Ratings'].astype(float)
-    df['multiple_deliveries'] = df['multiple_deliveries'].astype(int)
-    df['Order_Date'] = pd.to_datetime(df['Order_Date'], format='%d-%m-%Y')
-
-    # LIMPANDO COLUNA DE TEMPO
-    df['Time_taken(min)'] = df['Time_taken(min)'].astype(str).str.extract(r'(\d+)')
-    df['Time_taken(min)'] = pd.to_numeric(df['Time_taken(min)'], errors='coerce')
-
-    # ADICIONANDO COLUNA DIA DA SEMANA
-    df['week_of_year'] = df['Order_Date'].dt.strftime('%U').astype(int)
-
-    # DISTÂNCIA ENTRE RESTAURANTE E LOCAL DE ENTREGA
-    df['distance_delivery'] = df.loc[:, ['Restaurant_latitude', 'Restaurant_longitude', 
-                                         'Delivery_location_latitude', 'Delivery_location_longitude']].apply(
-        lambda x: haversine((x['Restaurant_latitude'], x['Restaurant_longitude']),
-                            (x['Delivery_location_latitude'], x['Delivery_location_longitude'])),
-        axis=1
-    )
-
-    return df
-
     
 
-def status_dia(df, festival):
-    """ Esta função tem a responsabilidade de calcular
-            o desvio padrao e a média das entregas
-                realizadas durante o festival
-
-                Orientacoes:
-                     Na condicional festival é necessário retornar duas condicoes possiveis, 'Yes' ou 'No'.
-                        dessa forma selecionará entre dias comuns e dias festivos
-    """
-    df_festival = (
-        df.loc[:, ['Time_taken(min)', 'Festival']]
-        .groupby('Festival')
-        .agg({'Time_taken(min)': ['mean', 'std']})
-    )
-    df_festival.columns = ['festival_mean', 'festival_std']
-    df_festival = df_festival.reset_index()
-
-    row = df_festival[df_festival['Festival'] == festival]
-    media = row['festival_mean'].values[0]
-    std = row['festival_std'].values[0]
-
-    return round(media, 2), round(std, 2)
-
-
-
-def mean_std_city(df1):
+@medido('restaurantes.mean_std_city')
+def mean_std_city(cubo):
     """ Esta função tem a responsabilidade de calcular
             o tempo médio e variabilidade de entrega 
                 por cidade e tipo de pedido
     """
-    df_aux = df1.loc[:,['City', 'Time_taken(min)']].groupby('City').agg({'Time_taken(min)': ('mean','std')})
-    # Mudar nome coluna
-    df_aux.columns = ['time_city_mean', 'time_city_std']
-    # resetar index
-    df_aux = df_aux.reset_index()
+    df_aux = tempo_por_cidade(cubo)
     fig = go.Figure()
     fig.add_trace(go.Bar( name='Control', x=df_aux['City'], y=df_aux['time_city_mean'], error_y=dict(type='data', array=df_aux['time_city_std']),
     text=[f"{v:.2f}" for v in df_aux['time_city_mean']],
@@ -136,43 +72,31 @@ def mean_std_city(df1):
     return fig
 
 
-def percent_distance(df1):
+@medido('restaurantes.percent_distance')
+def percent_distance(cubo):
     """ Esta função tem a responsabilidade de calcular
             a distribuição percentual da distância média de entregas 
                 por cidade em relação ao total.
     """
-# Calcular distância usando Haversine
-    df1['distance'] = df1.apply(
-        lambda x: haversine(
-            (x['Restaurant_latitude'], x['Restaurant_longitude']),
-            (x['Delivery_location_latitude'], x['Delivery_location_longitude'])
-        ),
-        axis=1
-    )
-    
-    # Distância média por cidade
-    avg_distance = df1[['City', 'distance']].groupby('City').mean().reset_index()
+    # Distância média por cidade (distance_delivery, vinda do cubo)
+    avg_distance = distancia_por_cidade(cubo)
     
     # Gráfico de pizza
     fig = go.Figure(data=[
-        go.Pie(labels=avg_distance['City'], values=avg_distance['distance'], pull=[0, 0.1, 0])
+        go.Pie(labels=avg_distance['City'], values=avg_distance['mean'], pull=[0, 0.1, 0])
     ])
     fig.update_layout(width=600, height=600)
     return fig
 
 
 
-def mean_std_road_traffic_density(df1):
+@medido('restaurantes.mean_std_road_traffic_density')
+def mean_std_road_traffic_density(cubo):
     """ Esta função tem a responsabilidade de calcular
             a distribuição percentual da distância média de entregas 
                 por cidade em relação ao total.
     """
-    df_aux = df1.loc[:, ['City','Time_taken(min)','Road_traffic_density']] \
-                 .groupby(['City','Road_traffic_density']) \
-                 .agg({'Time_taken(min)': ['mean','std']})
-    
-    df_aux.columns = ['avg_time', 'std_time']
-    df_aux = df_aux.reset_index()
+    df_aux = tempo_cidade_trafego(cubo)
     
     fig = px.sunburst(
         df_aux,
@@ -186,14 +110,6 @@ def mean_std_road_traffic_density(df1):
     return fig
 
                 
-# ====================================================================
-# ==========================LIMPAR DADOS=============================
-# ====================================================================
-
-df = clean_code(df)
-df1 = df.copy()
-
-
 # ====================================================================
 # ==========================BARRA LATERAL=============================
 # ====================================================================
@@ -249,104 +165,109 @@ if not city_options:
 st.sidebar.markdown("""---""")
 st.sidebar.markdown('### Powered by Comunidade DS')
 
-# FILTRO DE DATA
-linhas_selecionadas = df1['Order_Date'] < date_slider
-df1 = df1.loc[linhas_selecionadas, :]
-# FILTRO DE TRANSTITO
-linhas_selecionadas = df1['Road_traffic_density'].isin(traffic_options)
-df1 = df1.loc[linhas_selecionadas, :]
-# FILTRO DE CIDADE
-linhas_selecionadas = df1['City'].isin(city_options)
-df1 = df1.loc[linhas_selecionadas, :]
+# FILTROS DE DATA, TRÂNSITO E CIDADE
+# O filtro das linhas só é aplicado (e guardado por filtros) na métrica que usa as linhas
+filtros = (date_slider, traffic_options, city_options)
+# Médias e desvios padrão vêm do cubo de agregados com os mesmos filtros
+cubo = filtrar_cubo(cubo_dados(df), *filtros)
+# Percentis do tempo de entrega vêm do sketch de quantis com os mesmos filtros
+sketch = filtrar_sketch(sketch_dados(df), *filtros)
 
 
 # ====================================================================
 # =========================LAYOUT NO STREAMLIT=======================#
 # ====================================================================
 
+# Cada seção é um fragmento; a métrica que percorre as linhas filtradas fica
+# em cache por dataset + filtros (por_filtros) e só é recalculada quando eles mudam.
+
+@fragmento_medido('restaurantes.secao_metricas')
+def secao_metricas(cubo, filtros):
+    st.markdown("## 📊 Métricas de entrega")
+    st.markdown("*Principais indicadores do desempenho das entregas.*")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        # Quantidade de entregas únicas
+        st.metric(
+            label="📦 Entregadores distintos", 
+            value=str(por_filtros(df, 'entregadores_distintos', chave_filtros(*filtros),
+                                  lambda: entregadores_distintos(indice_filtros(df).filtrar(*filtros)))))
+        # Distancia média das entregas
+        st.metric(
+            label="🛣️ Distância média das entregas", 
+            value=f"{round(distancia_media(cubo), 2)} km")
+    # Estatísticas de tempo por Festival, usadas nas duas colunas
+    df_festival = tempo_festival(cubo)
+    with col2:
+        # Mean e std durante os Festivais.
+        media, std = status_dia(df_festival, 'Yes')
+        st.metric(label="🎉 Tempo médio (Festival)", value=f"{media}")
+        st.metric(label="🎉 Desvio padrão (Festival)", value=f"{std}")
+        
+    with col3:
+        # Mean e std em dias comuns.
+        media, std = status_dia(df_festival, 'No')
+        st.metric(label="📅 Tempo médio (Dia comum)", value=str(media))
+        st.metric(label="📅 Desvio padrão (Dia comum)", value=str(std))
+
+
+@fragmento_medido('restaurantes.secao_tempo_cidade')
+def secao_tempo_cidade(cubo):
+    st.markdown("""---""")
+    st.markdown("## ⏱️ Tempo médio e variabilidade de entrega por cidade e tipo de pedido")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("*Tempo médio de entrega e seu desvio padrão por cidade.*")
+        fig = mean_std_city(cubo)          
+        st.plotly_chart(preparar_figura(fig), use_container_width=True)
+        
+    with col2:
+        st.markdown("*Tempo médio de entrega e seu desvio padrão por cidade e tipo de pedido.*")
+        df_aux = tempo_cidade_pedido(cubo)
+        tabela_paginada(df_aux, 'tempo_cidade_pedido', tamanho=10)
+
+
+@fragmento_medido('restaurantes.secao_distancia_trafego')
+def secao_distancia_trafego(cubo):
+    st.markdown("""---""")
+    col1, col2 = st.columns(2)
+    with col1: 
+        st.markdown("## 🏙️ Distância média por cidade")
+        st.markdown("*Distribuição percentual da distância média de entregas por cidade em relação ao total.*")
+        fig = percent_distance(cubo)
+        st.plotly_chart(preparar_figura(fig), use_container_width=True)
+        
+    with col2:
+        st.markdown("## ⏱️ Tempo médio de entrega por cidade e tráfego")
+        st.markdown("*Azul = baixo desvio padrão; vermelho = alto desvio padrão.*")
+        fig = mean_std_road_traffic_density(cubo)
+        st.plotly_chart(preparar_figura(fig), use_container_width=True)
+
+
+@fragmento_medido('restaurantes.secao_percentis')
+def secao_percentis(sketch):
+    st.markdown("""---""")
+    st.markdown("## 🎯 Percentis do tempo de entrega")
+    st.markdown(f"*p50, p90 e p99 do tempo de entrega (min), estimados com erro de até {ERRO_RELATIVO:.0%}.*")
+    col1, col2, col3 = st.columns(3)
+    for col, por, titulo in [(col1, 'City', 'Por cidade'),
+                             (col2, 'Road_traffic_density', 'Por densidade de tráfego'),
+                             (col3, 'Festival', 'Por festival')]:
+        with col:
+            st.markdown(f"*{titulo}*")
+            st.dataframe(quantis(sketch, por).round(1), use_container_width=True)
+
+
 tab1, tab2, tab3 = st.tabs( ['Visão Gerencial','_','_'] )
 with tab1:
     with st.container():
-        st.markdown("## 📊 Métricas de entrega")
-        st.markdown("*Principais indicadores do desempenho das entregas.*")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            # Quantidade de entregas únicas
-            st.metric(
-                label="📦 Entregadores distintos", 
-                value=str(df1['Delivery_person_ID'].nunique()))
-            # Distancia média das entregas
-            st.metric(
-                label="🛣️ Distância média das entregas", 
-                value=f"{round(df1['distance_delivery'].mean(), 2)} km")
-        with col2:
-            # Mean e std durante os Festivais.
-            media, std = status_dia(df1, 'Yes')
-            st.metric(label="🎉 Tempo médio (Festival)", value=f"{media}")
-            st.metric(label="🎉 Desvio padrão (Festival)", value=f"{std}")
-            
-        with col3:
-            # Mean e std em dias comuns.
-            media, std = status_dia(df1, 'No')
-            st.metric(label="📅 Tempo médio (Dia comum)", value=str(media))
-            st.metric(label="📅 Desvio padrão (Dia comum)", value=str(std))
-
-    
+        secao_metricas(cubo, filtros)
     with st.container():
-        st.markdown("""---""")
-        st.markdown("## ⏱️ Tempo médio e variabilidade de entrega por cidade e tipo de pedido")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("*Tempo médio de entrega e seu desvio padrão por cidade.*")
-            fig = mean_std_city(df1)          
-            st.plotly_chart(fig, use_container_width=True)
-            
-        with col2:
-            st.markdown("*Tempo médio de entrega e seu desvio padrão por cidade e tipo de pedido.*")
-            df_aux = df1.loc[:,['ID','City','Type_of_order','Time_taken(min)']].groupby(['City','Type_of_order']).agg({'Time_taken(min)':['mean','std']})
-            # Mudar nome coluna
-            df_aux.columns = ['time_city_order_mean', 'time_city_order_std']
-            # resetar index
-            df_aux = df_aux.reset_index()
-            st.dataframe(df_aux, use_container_width=True)
-
-    
+        secao_tempo_cidade(cubo)
     with st.container():
-        st.markdown("""---""")
-        col1, col2 = st.columns(2)
-        with col1: 
-            st.markdown("## 🏙️ Distância média por cidade")
-            st.markdown("*Distribuição percentual da distância média de entregas por cidade em relação ao total.*")
-            fig = percent_distance(df1)
-            st.plotly_chart(fig, use_container_width=True)
-            
-        with col2:
-            st.markdown("## ⏱️ Tempo médio de entrega por cidade e tráfego")
-            st.markdown("*Azul = baixo desvio padrão; vermelho = alto desvio padrão.*")
-            fig = mean_std_road_traffic_density(df1)
-            st.plotly_chart(fig, use_container_width=True)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        secao_distancia_trafego(cubo)
+    with st.container():
+        secao_percentis(sketch)
 
+# Painel de medição (escondido; aparece com ?debug=1 na URL)
+painel_medicao()
@@ -0,0 +1,26 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import pytest
+
+from benchmarks.gerar_dados import gerar_csv
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Linhas do CSV de teste: poucas, mas com todos os marcadores 'NaN ' e espaços no final do dataset original
+LINHAS_AMOSTRA = 3000
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+@pytest.fixture(scope='session')
+def csv_amostra(tmp_path_factory):
+    """ CSV sintético com o esquema e as peculiaridades do dataset/train.csv
+    """
+    caminho = tmp_path_factory.mktemp('dados') / 'amostra.csv'
+    gerar_csv(str(caminho), LINHAS_AMOSTRA, semente=7)
+    return str(caminho)
@@ -0,0 +1,80 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+
+from curry.dados import carregar_dados, concatenar_partes, ler_csv, limpar_cache, limpar_em_blocos, salvar_lote
+from curry.perfis import perfis_dados
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Orçamento pequeno o bastante para o CSV de teste passar em vários blocos (o mínimo é 1000 linhas)
+MEMORIA_MB = 0.1
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def texto_como_objeto(df):
+    """ Colunas de texto do Arrow (texto mapeado do snapshot) como objetos str, como as do ler_csv
+    """
+    df = df.copy()
+    for coluna in df.columns:
+        if isinstance(df[coluna].dtype, pd.ArrowDtype):
+            df[coluna] = df[coluna].to_numpy(dtype=object, na_value=np.nan)
+    return df
+
+
+def test_limpar_em_blocos_igual_a_limpeza_em_memoria(csv_amostra, tmp_path):
+    bruto = pd.read_csv(csv_amostra)
+    caminhos = [str(tmp_path / 'principal.csv'), str(tmp_path / 'lote.csv')]
+    bruto.iloc[:2500].to_csv(caminhos[0], index=False)
+    bruto.iloc[2500:].to_csv(caminhos[1], index=False)
+
+    descartes = {}
+    blocos = limpar_em_blocos(caminhos, str(tmp_path / 'snap'), {'teste': 1}, MEMORIA_MB, descartes=descartes)
+    por_arquivo = [{}, {}]
+    memoria = concatenar_partes([ler_csv(caminho, descartes=contagem)
+                                 for caminho, contagem in zip(caminhos, por_arquivo)])
+    esperados = {regra: por_arquivo[0][regra] + por_arquivo[1][regra] for regra in por_arquivo[0]}
+
+    assert all(isinstance(blocos[coluna].dtype, pd.ArrowDtype) for coluna in ['ID', 'Time_Orderd'])
+    pd.testing.assert_frame_equal(texto_como_objeto(blocos), memoria)
+    assert descartes == esperados
+
+
+def test_limpar_em_blocos_com_projecao(csv_amostra, tmp_path):
+    colunas = ['Delivery_person_ID', 'Delivery_person_Ratings', 'distance_delivery']
+    blocos = limpar_em_blocos([csv_amostra], str(tmp_path / 'snap'), {'teste': 1}, MEMORIA_MB, colunas=colunas)
+    pd.testing.assert_frame_equal(texto_como_objeto(blocos), ler_csv(csv_amostra, colunas))
+
+
+def test_carregar_dados_com_orcamento_anexa_lotes_em_blocos(csv_amostra, tmp_path):
+    caminho = str(tmp_path / 'pedidos.csv')
+    bruto = pd.read_csv(csv_amostra)
+    bruto.iloc[:1500].to_csv(caminho, index=False)
+    limpar_cache()
+    historico = carregar_dados(caminho, memoria_mb=MEMORIA_MB)
+    perfis = perfis_dados(historico)
+
+    salvar_lote(bruto.iloc[1500:2800], caminho, '001.csv')
+    salvar_lote(bruto.iloc[2800:], caminho, '002.csv')
+    anexado = carregar_dados(caminho, memoria_mb=MEMORIA_MB)
+
+    # As colunas continuam abertas do snapshot (memory-map), sem cópia em memória
+    assert not anexado['distance_delivery'].to_numpy().flags.owndata
+    assert isinstance(anexado['ID'].dtype, pd.ArrowDtype)
+
+    limpar_cache()
+    memoria = carregar_dados(caminho, usar_snapshot=False, processos=1)
+    pd.testing.assert_frame_equal(texto_como_objeto(anexado), memoria)
+
+    # Os perfis foram atualizados bloco a bloco e batem com os construídos do zero
+    atualizados = perfis_dados(anexado)
+    assert atualizados is not perfis
+    pd.testing.assert_frame_equal(atualizados.resumo, perfis_dados(memoria).resumo, check_exact=False)
+    limpar_cache()
@@ -0,0 +1,29 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import pandas as pd
+import pytest
+
+from curry.dados import carregar_dados, limpar_cache
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def test_dataframe_alterado_sai_do_cache(csv_amostra):
+    limpar_cache()
+    original = carregar_dados(csv_amostra, usar_snapshot=False, processos=1)
+    esperado = original.copy()
+    assert carregar_dados(csv_amostra, usar_snapshot=False, processos=1) is original
+
+    # Uma página troca uma coluna do DataFrame compartilhado
+    original['Time_taken(min)'] = 0
+
+    with pytest.raises(RuntimeError):
+        carregar_dados(csv_amostra, usar_snapshot=False, processos=1)
+    recarregado = carregar_dados(csv_amostra, usar_snapshot=False, processos=1)
+    assert recarregado is not original
+    pd.testing.assert_frame_equal(recarregado, esperado)
+    assert carregar_dados(csv_amostra, usar_snapshot=False, processos=1) is recarregado
+    limpar_cache()
@@ -0,0 +1,118 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from curry.calendario import HORA_AUSENTE, construir_agregado_tempo, rollup
+from curry.metricas import pedidos_entregador_semana
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# Duas semanas ISO na virada do ano: 2021-W52 (27/12 a 02/01, que cruza o mês) e 2022-W01
+INICIO, FIM = '2021-12-27', '2022-01-09'
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+@pytest.fixture(scope='module')
+def pedidos():
+    """ Pedidos sintéticos entre INICIO e FIM, com horários ausentes ou inválidos em parte das linhas
+    """
+    gerador = np.random.default_rng(3)
+    n = 2000
+    datas = pd.to_datetime(INICIO) + pd.to_timedelta(gerador.integers(0, 14, n), unit='D')
+    horarios = np.array([f'{h:02d}:{m:02d}:00' for h, m in zip(gerador.integers(0, 24, n), gerador.integers(0, 60, n))],
+                        dtype=object)
+    sem_pedido = gerador.random(n) < 0.2
+    sem_coleta = gerador.random(n) < 0.5
+    coletas = horarios.copy()
+    horarios[sem_pedido] = np.nan
+    coletas[sem_coleta] = 'NaN'
+    return pd.DataFrame({
+        'ID': [f'0x{i:04x}' for i in range(n)],
+        'Delivery_person_ID': gerador.choice([f'ENT{i:02d}' for i in range(25)], n),
+        'Order_Date': datas,
+        'Time_Orderd': horarios,
+        'Time_Order_picked': coletas,
+        'City': gerador.choice(['Urban', 'Metropolitian', 'Semi-Urban'], n),
+        'Road_traffic_density': gerador.choice(['Low', 'Medium', 'High', 'Jam'], n),
+    })
+
+
+def contagem(chaves):
+    """ Pedidos por chave, direto sobre as linhas (groupby().size()), em ordem de chave
+    """
+    return chaves.groupby(chaves).size().sort_index()
+
+
+def test_datas_cruzam_o_ano(pedidos):
+    semanas = pedidos['Order_Date'].dt.isocalendar()
+    assert set(zip(semanas['year'], semanas['week'])) == {(2021, 52), (2022, 1)}
+    assert set(pedidos['Order_Date'].dt.year) == {2021, 2022}
+
+
+def test_rollup_semana_igual_ao_groupby_iso(pedidos):
+    iso = pedidos['Order_Date'].dt.isocalendar()
+    esperado = contagem(iso['year'].astype(int) * 100 + iso['week'].astype(int))
+
+    semanas = rollup(construir_agregado_tempo(pedidos), 'semana')
+    assert semanas['chave'].tolist() == [202152, 202201]
+    assert semanas['periodo'].tolist() == [pd.Timestamp('2021-12-27'), pd.Timestamp('2022-01-03')]
+    assert semanas['pedidos'].tolist() == esperado.tolist()
+    assert semanas['pedidos'].sum() == len(pedidos)
+
+
+def test_rollup_mes_igual_ao_groupby(pedidos):
+    datas = pedidos['Order_Date']
+    esperado = contagem(datas.dt.year * 100 + datas.dt.month)
+
+    meses = rollup(construir_agregado_tempo(pedidos), 'mes')
+    assert meses['chave'].tolist() == [202112, 202201]
+    assert meses['periodo'].tolist() == [pd.Timestamp('2021-12-01'), pd.Timestamp('2022-01-01')]
+    assert meses['pedidos'].tolist() == esperado.tolist()
+
+
+def test_rollup_dia_igual_ao_groupby(pedidos):
+    dias = rollup(construir_agregado_tempo(pedidos), 'dia')
+    esperado = contagem(pedidos['Order_Date'])
+    assert list(dias['periodo']) == list(esperado.index)
+    assert dias['pedidos'].tolist() == esperado.tolist()
+
+
+def test_hora_ausente_fica_no_total_e_fora_do_rollup_de_hora(pedidos):
+    # Hora do pedido; sem ela, a da coleta; sem nenhuma das duas, HORA_AUSENTE
+    horario = pedidos['Time_Orderd'].where(pedidos['Time_Orderd'].notna(),
+                                           pedidos['Time_Order_picked'].replace('NaN', np.nan))
+    horas = pd.to_numeric(horario.str[:2], errors='coerce').fillna(HORA_AUSENTE).astype(int)
+    assert (horas == HORA_AUSENTE).any()
+
+    agregado = construir_agregado_tempo(pedidos)
+    por_hora = agregado.groupby('hora')['pedidos'].sum()
+    assert por_hora.to_dict() == contagem(horas).to_dict()
+
+    rollup_hora = rollup(agregado, 'hora')
+    assert HORA_AUSENTE not in rollup_hora['chave'].tolist()
+    assert rollup_hora['pedidos'].sum() == (horas != HORA_AUSENTE).sum()
+    # Os pedidos sem horário continuam nos totais por semana e por mês
+    assert rollup(agregado, 'semana')['pedidos'].sum() == len(pedidos)
+    assert rollup(agregado, 'mes')['pedidos'].sum() == len(pedidos)
+
+
+def test_pedidos_entregador_semana_pelas_semanas_iso(pedidos):
+    inicio_semana = pedidos['Order_Date'] - pd.to_timedelta(pedidos['Order_Date'].dt.dayofweek, unit='D')
+    esperado = pedidos.groupby(inicio_semana.rename('periodo')) \
+        .agg(ID=('ID', 'count'), Delivery_person_ID=('Delivery_person_ID', 'nunique')).reset_index()
+
+    obtido = pedidos_entregador_semana(pedidos)
+    assert list(obtido['periodo']) == [pd.Timestamp('2021-12-27'), pd.Timestamp('2022-01-03')]
+    assert obtido['ID'].tolist() == esperado['ID'].tolist()
+    assert obtido['Delivery_person_ID'].tolist() == esperado['Delivery_person_ID'].tolist()
+    np.testing.assert_allclose(obtido['Order_by_delivery'], esperado['ID'] / esperado['Delivery_person_ID'])
+    # Mesmas semanas do rollup do dashboard
+    assert list(obtido['periodo']) == list(rollup(construir_agregado_tempo(pedidos), 'semana')['periodo'])
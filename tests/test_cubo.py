@@ -0,0 +1,88 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from curry.cubo import agregar_total, construir_cubo, filtrar_cubo
+from curry.dados import ler_csv
+from curry.metricas import (OPCOES_CIDADE, OPCOES_TRAFEGO, distancia_por_cidade, tempo_cidade_trafego,
+                            tempo_festival, tempo_por_cidade)
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+# (data limite, trânsito, cidades)
+FILTROS = {
+    'tudo': ('2022-04-13', OPCOES_TRAFEGO, OPCOES_CIDADE),
+    'parcial': ('2022-03-20', ['Jam', 'Low'], ['Urban', 'Metropolitian']),
+    'uma_cidade': ('2022-04-13', ['High'], ['Semi-Urban']),
+    'data_inicial': ('2022-02-13', OPCOES_TRAFEGO, OPCOES_CIDADE),
+    'nenhuma_linha': ('2022-04-13', OPCOES_TRAFEGO, []),
+}
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def filtrar_linhas(df, data_limite, trafego, cidades):
+    """ Filtro da barra lateral como no dashboard original (máscara booleana sobre as linhas)
+    """
+    return df[(df['Order_Date'] < data_limite) & df['Road_traffic_density'].isin(trafego) & df['City'].isin(cidades)]
+
+
+def original(df1, chaves, coluna):
+    """ Média e desvio padrão como nas páginas originais: groupby().agg(['mean', 'std']) sobre as linhas
+    """
+    return df1.groupby(chaves, observed=True)[coluna].agg(['mean', 'std'])
+
+
+def por_chave(tabela, chaves, colunas):
+    """ Tabela indexada pelas chaves como texto, só com as colunas comparadas, em ordem de chave
+    """
+    tabela = tabela.reset_index() if not set(chaves) <= set(tabela.columns) else tabela
+    indice = pd.MultiIndex.from_frame(tabela[chaves].astype(str)) if len(chaves) > 1 \
+        else pd.Index(tabela[chaves[0]].astype(str), name=chaves[0])
+    resultado = pd.DataFrame(tabela[colunas].to_numpy(dtype=np.float64), index=indice, columns=['mean', 'std'])
+    return resultado.sort_index()
+
+
+@pytest.fixture(scope='module')
+def dados_e_cubo(csv_amostra):
+    df = ler_csv(csv_amostra)
+    return df, construir_cubo(df)
+
+
+@pytest.mark.parametrize('nome', list(FILTROS))
+@pytest.mark.parametrize('metrica, chaves, coluna, colunas', [
+    (tempo_festival, ['Festival'], 'Time_taken(min)', ['mean', 'std']),
+    (tempo_por_cidade, ['City'], 'Time_taken(min)', ['time_city_mean', 'time_city_std']),
+    (tempo_cidade_trafego, ['City', 'Road_traffic_density'], 'Time_taken(min)', ['avg_time', 'std_time']),
+    (distancia_por_cidade, ['City'], 'distance_delivery', ['mean', 'std']),
+])
+def test_metricas_do_cubo_iguais_ao_groupby(dados_e_cubo, nome, metrica, chaves, coluna, colunas):
+    df, cubo = dados_e_cubo
+    filtros = FILTROS[nome]
+    esperado = por_chave(original(filtrar_linhas(df, *filtros), chaves, coluna), chaves, ['mean', 'std'])
+    obtido = por_chave(metrica(filtrar_cubo(cubo, *filtros)), chaves, colunas)
+
+    if nome == 'nenhuma_linha':
+        assert len(esperado) == 0
+    pd.testing.assert_frame_equal(obtido, esperado, rtol=1e-9)
+
+
+@pytest.mark.parametrize('nome', list(FILTROS))
+def test_agregar_total_igual_as_linhas(dados_e_cubo, nome):
+    df, cubo = dados_e_cubo
+    df1 = filtrar_linhas(df, *FILTROS[nome])
+    total = agregar_total(filtrar_cubo(cubo, *FILTROS[nome]), 'Delivery_person_Ratings')
+
+    assert total['pedidos'] == len(df1)
+    if len(df1):
+        assert total['mean'] == pytest.approx(df1['Delivery_person_Ratings'].mean(), rel=1e-9)
+        assert total['std'] == pytest.approx(df1['Delivery_person_Ratings'].std(), rel=1e-9)
+    else:
+        assert np.isnan(total['mean'])
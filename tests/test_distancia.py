@@ -0,0 +1,49 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pytest
+from haversine import haversine
+
+from curry.dados import ler_csv
+from curry.distancia import distancia_entrega, haversine_np
+
+# ====================================================================
+# ==========================CONFIGURACAO=============================
+# ====================================================================
+
+COORDENADAS = ['Restaurant_latitude', 'Restaurant_longitude',
+               'Delivery_location_latitude', 'Delivery_location_longitude']
+
+# Tolerâncias documentadas em haversine_np (km)
+TOLERANCIA = {np.float64: 1e-9, np.float32: 1e-2}
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+@pytest.fixture(scope='module')
+def coordenadas(csv_amostra):
+    return ler_csv(csv_amostra)[COORDENADAS].dropna()
+
+
+def original(coordenadas):
+    """ Distância como no dashboard original: haversine() linha a linha
+    """
+    return np.array([haversine((lat1, lon1), (lat2, lon2))
+                     for lat1, lon1, lat2, lon2 in coordenadas.itertuples(index=False)])
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_haversine_np_igual_ao_pacote(coordenadas, dtype):
+    esperado = original(coordenadas)
+    obtido = haversine_np(*(coordenadas[coluna].to_numpy() for coluna in COORDENADAS), dtype=dtype)
+
+    assert obtido.dtype == dtype
+    assert len(obtido) == len(esperado) > 0
+    np.testing.assert_allclose(obtido.astype(np.float64), esperado, rtol=0, atol=TOLERANCIA[dtype])
+
+
+def test_distancia_entrega_usa_as_colunas_do_dataframe(coordenadas):
+    np.testing.assert_allclose(distancia_entrega(coordenadas), original(coordenadas), rtol=0, atol=1e-9)
@@ -0,0 +1,76 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from curry.estatisticas import acumular, combinar, juntar, resumo
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def dados_aleatorios(linhas=2000, semente=0):
+    """ Valores com escala e deslocamento grandes (onde a fórmula ingênua da variância perde precisão),
+            alguns ausentes e grupos com um único valor
+    """
+    rng = np.random.default_rng(semente)
+    df = pd.DataFrame({'grupo': rng.choice(['a', 'b', 'c', 'd'], linhas),
+                       'valor': 1e6 + rng.normal(0, 50, linhas)})
+    df.loc[rng.random(linhas) < 0.05, 'valor'] = np.nan
+    unicos = pd.DataFrame({'grupo': ['so_um', 'so_ausente'], 'valor': [7.5, np.nan]})
+    return pd.concat([df, unicos], ignore_index=True)
+
+
+def esperado(df):
+    return df.groupby('grupo')['valor'].agg(['count', 'mean', 'std', 'min', 'max'])
+
+
+def comparar(obtido, df):
+    obtido = resumo(obtido).rename(columns={'n': 'count'})[['count', 'mean', 'std', 'min', 'max']]
+    obtido.index.name = 'grupo'
+    pd.testing.assert_frame_equal(obtido.sort_index(), esperado(df), check_dtype=False, rtol=1e-9, atol=0)
+
+
+def partes_de(df, cortes):
+    return [df.iloc[inicio:fim] for inicio, fim in zip([0] + cortes, cortes + [len(df)])]
+
+
+@pytest.mark.parametrize('cortes', [
+    [],                                  # uma parte só
+    [1000],                              # duas partes
+    [300, 700, 1200, 1900],              # k partes
+    [0, 0, 1000, 1000],                  # partes vazias
+    [1, 2, 3, 1999],                     # partes de uma linha
+])
+def test_juntar_igual_a_groupby(cortes):
+    df = dados_aleatorios()
+    partes = [acumular(parte['valor'], parte[['grupo']]) for parte in partes_de(df, cortes)]
+    comparar(juntar(*partes), df)
+
+
+def test_juntar_em_sequencia_igual_a_groupby():
+    # Como os lotes: o acumulador do histórico é atualizado uma parte por vez
+    df = dados_aleatorios(semente=1)
+    total = None
+    for parte in partes_de(df, list(range(97, len(df), 97))):
+        novo = acumular(parte['valor'], parte[['grupo']])
+        total = novo if total is None else juntar(total, novo)
+    comparar(total, df)
+
+
+def test_combinar_por_outra_chave():
+    df = dados_aleatorios(semente=2)
+    df['sub'] = np.arange(len(df)) % 5
+    finos = acumular(df['valor'], df[['grupo', 'sub']]).reset_index()
+    comparar(combinar(finos, 'grupo'), df)
+
+
+def test_resumo_com_um_valor_ou_nenhum():
+    estatisticas = acumular(pd.Series([3.0, np.nan, 4.0, 6.0]), pd.DataFrame({'g': ['um', 'zero', 'dois', 'dois']}))
+    final = resumo(estatisticas)
+    assert final.loc['um', 'mean'] == 3.0 and np.isnan(final.loc['um', 'std'])
+    assert final.loc['zero', 'n'] == 0 and np.isnan(final.loc['zero', 'mean'])
+    assert final.loc['dois', 'std'] == pytest.approx(np.std([4.0, 6.0], ddof=1))
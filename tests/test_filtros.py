@@ -0,0 +1,97 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import gc
+import weakref
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from curry.dados import congelar, ler_csv
+from curry.espacial import RESOLUCOES, celulas_filtradas
+from curry.filtros import indice_filtros
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def test_filtrar_igual_a_filtro_com_mascara(csv_amostra):
+    df = ler_csv(csv_amostra)
+    data_limite = df['Order_Date'].quantile(0.7)
+    trafego, cidades = ['Low', 'Jam'], ['Urban', 'Semi-Urban']
+
+    filtrado = indice_filtros(df).filtrar(data_limite, trafego, cidades)
+    esperado = df[(df['Order_Date'] < data_limite) & df['Road_traffic_density'].isin(trafego)
+                  & df['City'].isin(cidades)]
+    assert len(esperado) > 0
+    pd.testing.assert_frame_equal(filtrado.sort_values('ID', ignore_index=True),
+                                  esperado.sort_values('ID', ignore_index=True))
+
+
+def test_indice_nao_prende_dataframe_ja_ordenado(csv_amostra):
+    df = congelar(ler_csv(csv_amostra).sort_values('Order_Date', kind='mergesort', ignore_index=True))
+    indice = indice_filtros(df)
+    assert indice.df is df
+
+    referencia = weakref.ref(df)
+    del df, indice
+    gc.collect()
+    assert referencia() is None
+
+
+def test_indice_de_dataframe_fora_de_ordem_guarda_so_a_permutacao(csv_amostra):
+    df = congelar(ler_csv(csv_amostra))
+    assert not df['Order_Date'].is_monotonic_increasing
+    indice = indice_filtros(df)
+    assert indice.df is df
+    assert indice.ordem is not None
+    assert not any(isinstance(valor, pd.DataFrame) for valor in vars(indice).values())
+
+    data_limite = df['Order_Date'].quantile(0.5)
+    for trafego, cidades in [(['Low', 'Medium', 'High', 'Jam'], ['Urban', 'Metropolitian', 'Semi-Urban']),
+                             (['Jam'], ['Urban', 'Metropolitian'])]:
+        filtrado = indice.filtrar(data_limite, trafego, cidades)
+        esperado = df[(df['Order_Date'] < data_limite) & df['Road_traffic_density'].isin(trafego)
+                      & df['City'].isin(cidades)].sort_values('Order_Date', kind='mergesort')
+        pd.testing.assert_frame_equal(filtrado, esperado)
+        assert list(indice.posicoes(data_limite, trafego, cidades)) == list(esperado.index)
+
+    referencia = weakref.ref(df)
+    del df, indice, filtrado, esperado
+    gc.collect()
+    assert referencia() is None
+
+
+def test_celulas_filtradas_iguais_ao_groupby(csv_amostra):
+    df = congelar(ler_csv(csv_amostra))
+    filtros = (df['Order_Date'].quantile(0.6), ['Low', 'High'], ['Urban', 'Semi-Urban'])
+    resolucao = list(RESOLUCOES)[0]
+    tamanho, _ = RESOLUCOES[resolucao]
+
+    linhas = indice_filtros(df).filtrar(*filtros)
+    linhas = linhas[linhas['Delivery_location_latitude'].notna() & linhas['Delivery_location_longitude'].notna()]
+    celulas = pd.DataFrame({'latitude': np.floor(linhas['Delivery_location_latitude'].to_numpy() / tamanho) * tamanho,
+                            'longitude': np.floor(linhas['Delivery_location_longitude'].to_numpy() / tamanho) * tamanho,
+                            'tempo': linhas['Time_taken(min)'].to_numpy(dtype=np.float64)})
+    esperado = celulas.groupby(['latitude', 'longitude'])['tempo'].agg(['size', 'mean'])
+
+    obtido = celulas_filtradas(df, resolucao, filtros).set_index(['latitude', 'longitude']).sort_index()
+    esperado = esperado.loc[obtido.index]
+    assert obtido['pedidos'].tolist() == esperado['size'].tolist()
+    np.testing.assert_allclose(obtido['tempo_medio'], esperado['mean'])
+
+
+def test_fatias_filtradas_somente_leitura_sem_copy_on_write(csv_amostra):
+    # O pacote não liga o Copy-on-Write global: a proteção do DataFrame compartilhado vem de congelar
+    assert not pd.get_option('mode.copy_on_write')
+    df = congelar(ler_csv(csv_amostra).sort_values('Order_Date', kind='mergesort', ignore_index=True))
+    filtrado = indice_filtros(df).filtrar(df['Order_Date'].max(), df['Road_traffic_density'].unique(),
+                                         df['City'].unique())
+    assert np.shares_memory(filtrado['Time_taken(min)'].to_numpy(), df['Time_taken(min)'].to_numpy())
+
+    antes = df['Time_taken(min)'].iloc[0]
+    with pytest.raises(ValueError):
+        filtrado.iloc[0, filtrado.columns.get_loc('Time_taken(min)')] = antes + 1
+    assert df['Time_taken(min)'].iloc[0] == antes
@@ -0,0 +1,42 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import pytest
+
+from curry import graficos
+from curry.graficos import estimar_payload, preparar_figura, tamanho_payload
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def figura(n, grafico=px.scatter):
+    gerador = np.random.default_rng(n)
+    df = pd.DataFrame({'x': pd.date_range('2022-01-01', periods=n, freq='min'), 'y': gerador.random(n),
+                       'cidade': gerador.choice(['Urban', 'Semi-Urban', 'Metropolitian'], n)})
+    return grafico(df, x='x', y='y', color='cidade', hover_data=['cidade'])
+
+
+@pytest.mark.parametrize('n', [10, 1000, 20000])
+@pytest.mark.parametrize('grafico', [px.scatter, px.line, px.bar])
+def test_estimativa_nao_fica_abaixo_do_json(n, grafico):
+    fig = figura(n, grafico)
+    assert estimar_payload(fig) >= tamanho_payload(fig)
+
+
+def test_figura_pequena_nao_e_serializada(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(graficos, 'tamanho_payload', lambda fig: chamadas.append(fig) or 0)
+    fig = figura(500)
+    assert preparar_figura(fig) is fig
+    assert chamadas == []
+    assert sum(len(trace.y) for trace in fig.data) == 500
+
+
+def test_figura_grande_cabe_no_payload():
+    fig = preparar_figura(figura(60000), max_payload=200_000)
+    assert tamanho_payload(fig) <= 200_000
@@ -0,0 +1,117 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import pandas as pd
+from haversine import haversine
+
+from curry.dados import PLANO_TIPOS, aplicar_plano_tipos, clean_code, ler_csv, relatorio_memoria
+from curry.esquema import COLUNAS_NAN
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def limpeza_original(df):
+    """ Limpeza em várias passadas, como estava nas páginas antes do pacote curry (referência)
+    """
+    for col in df.select_dtypes(include='object').columns:
+        df[col] = df[col].map(lambda x: x.strip() if isinstance(x, str) else x)
+
+    for coluna in COLUNAS_NAN:
+        df = df[df[coluna].str.lower().str.strip() != 'nan']
+
+    df = df.reset_index(drop=True)
+
+    df['Delivery_person_Age'] = df['Delivery_person_Age'].astype(int)
+    df['Delivery_person_Ratings'] = df['Delivery_person_Ratings'].astype(float)
+    df['multiple_deliveries'] = df['multiple_deliveries'].astype(int)
+    df['Order_Date'] = pd.to_datetime(df['Order_Date'], format='%d-%m-%Y')
+
+    df['Time_taken(min)'] = df['Time_taken(min)'].astype(str).str.extract(r'(\d+)')
+    df['Time_taken(min)'] = pd.to_numeric(df['Time_taken(min)'], errors='coerce')
+
+    df['week_of_year'] = df['Order_Date'].dt.strftime('%U').astype(int)
+
+    df['distance_delivery'] = df.loc[:, ['Restaurant_latitude', 'Restaurant_longitude',
+                                         'Delivery_location_latitude', 'Delivery_location_longitude']].apply(
+        lambda x: haversine((x['Restaurant_latitude'], x['Restaurant_longitude']),
+                            (x['Delivery_location_latitude'], x['Delivery_location_longitude'])),
+        axis=1
+    )
+    return df
+
+
+def descartes_esperados(bruto):
+    """ Linhas rejeitadas por cada coluna de COLUNAS_NAN (contadas de forma independente) e o total
+    """
+    esperados = {coluna: int((bruto[coluna].astype(str).str.strip().str.lower() == 'nan').sum())
+                 for coluna in COLUNAS_NAN}
+    rejeitadas = pd.concat([bruto[coluna].astype(str).str.strip().str.lower() == 'nan' for coluna in COLUNAS_NAN],
+                           axis=1).any(axis=1)
+    esperados['total'] = int(rejeitadas.sum())
+    return esperados
+
+
+def test_amostra_tem_os_marcadores(csv_amostra):
+    bruto = pd.read_csv(csv_amostra)
+    assert (bruto['City'] == 'NaN ').any()
+    assert bruto['Road_traffic_density'].str.endswith(' ').all()
+    assert descartes_esperados(bruto)['total'] > 0
+
+
+def test_clean_code_igual_a_limpeza_original(csv_amostra):
+    bruto = pd.read_csv(csv_amostra)
+    esperado = limpeza_original(bruto.copy())
+
+    descartes = {}
+    resultado = clean_code(bruto, aplicar_tipos=False, descartes=descartes)
+
+    pd.testing.assert_frame_equal(resultado, esperado)
+    assert descartes == descartes_esperados(bruto)
+
+
+def test_clean_code_nao_altera_a_entrada(csv_amostra):
+    bruto = pd.read_csv(csv_amostra)
+    copia = bruto.copy()
+    clean_code(bruto)
+    pd.testing.assert_frame_equal(bruto, copia)
+
+
+def test_ler_csv_igual_a_limpeza_original(csv_amostra):
+    bruto = pd.read_csv(csv_amostra)
+    esperado = aplicar_plano_tipos(limpeza_original(bruto.copy()))
+
+    descartes = {}
+    resultado = ler_csv(csv_amostra, descartes=descartes)
+
+    pd.testing.assert_frame_equal(resultado, esperado)
+    assert descartes == descartes_esperados(bruto)
+
+
+def test_ler_csv_com_projecao(csv_amostra):
+    colunas = ['Delivery_person_ID', 'Delivery_person_Ratings', 'distance_delivery']
+    completo = ler_csv(csv_amostra)
+    projetado = ler_csv(csv_amostra, colunas)
+
+    assert set(colunas) <= set(projetado.columns)
+    pd.testing.assert_frame_equal(projetado, completo[projetado.columns])
+
+
+def test_relatorio_memoria_do_plano_de_tipos(csv_amostra):
+    antes = clean_code(pd.read_csv(csv_amostra), aplicar_tipos=False)
+    depois = aplicar_plano_tipos(antes)
+    relatorio = relatorio_memoria(antes, depois)
+
+    assert list(relatorio.index) == list(antes.columns) + ['TOTAL']
+    colunas = relatorio.drop(index='TOTAL')
+    assert colunas['bytes_antes'].tolist() == antes.memory_usage(index=False, deep=True).tolist()
+    assert colunas['bytes_depois'].tolist() == depois.memory_usage(index=False, deep=True).tolist()
+    assert relatorio.loc['TOTAL', 'bytes_antes'] == colunas['bytes_antes'].sum()
+    assert relatorio.loc['TOTAL', 'bytes_depois'] == colunas['bytes_depois'].sum()
+
+    # Só as colunas do plano mudam de tipo, e todas encolhem
+    mudaram = colunas.index[colunas['tipo_antes'] != colunas['tipo_depois']]
+    assert set(mudaram) <= set(PLANO_TIPOS)
+    assert (colunas.loc[mudaram, 'reducao_%'] > 0).all()
+    assert relatorio.loc['TOTAL', 'reducao_%'] > 0
@@ -0,0 +1,54 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import pytest
+import streamlit as st
+
+from curry import medicao
+from curry.medicao import etapas_rerun, fragmento_medido, iniciar_rerun, medir
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+@pytest.fixture
+def secao(monkeypatch):
+    monkeypatch.setattr(medicao, '_historico', {})
+    # Fora do servidor o st.fragment não executa a função: aqui ele só devolve o corpo
+    monkeypatch.setattr(st, 'fragment', lambda funcao: funcao)
+
+    @fragmento_medido('teste.secao')
+    def secao():
+        with medir('teste.dentro'):
+            pass
+    return secao
+
+
+def test_rerun_completo_acumula_pagina_e_fragmento(secao, monkeypatch):
+    monkeypatch.setattr(medicao, '_rerun_de_fragmento', lambda: False)
+    iniciar_rerun()
+    with medir('teste.pagina'):
+        pass
+    secao()
+    assert [etapa['etapa'] for etapa in etapas_rerun()] == ['teste.pagina', 'teste.dentro', 'teste.secao']
+
+
+def test_rerun_do_fragmento_comeca_lista_nova(secao, monkeypatch):
+    monkeypatch.setattr(medicao, '_rerun_de_fragmento', lambda: False)
+    iniciar_rerun()
+    with medir('teste.pagina'):
+        pass
+    secao()
+
+    monkeypatch.setattr(medicao, '_rerun_de_fragmento', lambda: True)
+    for _ in range(3):
+        secao()
+        etapas = etapas_rerun()
+        assert [etapa['etapa'] for etapa in etapas] == ['teste.dentro', 'teste.secao']
+        assert [etapa['profundidade'] for etapa in etapas] == [1, 0]
+    assert len(medicao._historico['teste.secao']) == 4
+
+
+def test_fora_do_streamlit_nao_e_rerun_de_fragmento():
+    assert not medicao._rerun_de_fragmento()
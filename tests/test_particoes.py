@@ -0,0 +1,101 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from curry import medicao
+from curry.dados import ler_csv, limpar_em_paralelo, particoes_csv
+from curry.medicao import medir
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def comparar_com_ler_csv(caminho, processos, colunas=None):
+    """ limpar_em_paralelo deve dar o mesmo DataFrame e os mesmos descartes que ler_csv
+    """
+    esperados, descartes = {}, {}
+    esperado = ler_csv(caminho, colunas, descartes=esperados)
+    resultado = limpar_em_paralelo(caminho, processos, descartes=descartes, colunas=colunas)
+    pd.testing.assert_frame_equal(resultado, esperado)
+    assert descartes == esperados
+
+
+def test_particoes_cobrem_o_arquivo_em_fins_de_linha(csv_amostra):
+    cabecalho, faixas = particoes_csv(csv_amostra, 7)
+    with open(csv_amostra, 'rb') as arquivo:
+        conteudo = arquivo.read()
+
+    assert conteudo.startswith(cabecalho) and cabecalho.endswith(b'\n')
+    assert faixas[0][0] == len(cabecalho) and faixas[-1][1] == len(conteudo)
+    assert all(fim == proximo for (_, fim), (proximo, _) in zip(faixas, faixas[1:]))
+    assert all(conteudo[fim - 1:fim] == b'\n' for _, fim in faixas)
+    assert b''.join(conteudo[inicio:fim] for inicio, fim in faixas) == conteudo[len(cabecalho):]
+
+
+@pytest.mark.parametrize('processos', [1, 2, 7])
+def test_limpar_em_paralelo_igual_a_ler_csv(csv_amostra, processos):
+    comparar_com_ler_csv(csv_amostra, processos)
+
+
+def test_limpar_em_paralelo_com_projecao(csv_amostra):
+    comparar_com_ler_csv(csv_amostra, 3, ['Delivery_person_ID', 'Delivery_person_Ratings', 'City'])
+
+
+def test_limpar_em_paralelo_sem_quebra_de_linha_no_final(csv_amostra, tmp_path):
+    caminho = str(tmp_path / 'sem_quebra.csv')
+    with open(csv_amostra, 'rb') as origem, open(caminho, 'wb') as destino:
+        destino.write(origem.read().rstrip(b'\r\n'))
+
+    _, faixas = particoes_csv(caminho, 4)
+    assert faixas[-1][1] == os.path.getsize(caminho)
+    comparar_com_ler_csv(caminho, 4)
+
+
+def test_limpar_em_paralelo_com_particoes_menores_que_uma_linha(csv_amostra, tmp_path):
+    # Mais processos que linhas: cada faixa pedida é menor que uma linha e acaba virando uma linha inteira
+    caminho = str(tmp_path / 'pequeno.csv')
+    pd.read_csv(csv_amostra, nrows=12).to_csv(caminho, index=False)
+
+    _, faixas = particoes_csv(caminho, 50)
+    assert len(faixas) == 12
+    comparar_com_ler_csv(caminho, 50)
+
+
+def test_limpar_em_paralelo_so_com_cabecalho(csv_amostra, tmp_path):
+    caminho = str(tmp_path / 'vazio.csv')
+    pd.read_csv(csv_amostra, nrows=0).to_csv(caminho, index=False)
+
+    assert particoes_csv(caminho, 4)[1] == []
+    comparar_com_ler_csv(caminho, 4)
+
+
+def test_limpar_em_paralelo_com_outra_thread_dentro_de_medir(csv_amostra, monkeypatch):
+    # Outra thread (como outra sessão do Streamlit) está dentro de um span e segura o lock do histórico
+    # da medição; os processos da limpeza não podem herdar esse lock travado
+    monkeypatch.setattr(medicao, '_historico', {})
+    segurando, soltar = threading.Event(), threading.Event()
+
+    def outra_sessao():
+        with medir('teste.outra_sessao'), medicao._historico_lock:
+            segurando.set()
+            soltar.wait(120)
+
+    outra = threading.Thread(target=outra_sessao, daemon=True)
+    outra.start()
+    segurando.wait(10)
+
+    resultado = {}
+    limpeza = threading.Thread(target=lambda: resultado.update(df=limpar_em_paralelo(csv_amostra, 2)), daemon=True)
+    limpeza.start()
+    limpeza.join(60)
+    soltar.set()
+    outra.join(10)
+
+    assert not limpeza.is_alive(), 'limpar_em_paralelo travou com o lock da medição preso em outra thread'
+    pd.testing.assert_frame_equal(resultado['df'], ler_csv(csv_amostra))
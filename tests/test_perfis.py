@@ -0,0 +1,61 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+
+from curry import dados
+from curry.dados import anexar, ler_csv
+from curry.perfis import construir_perfis, perfis_dados
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def resumo_esperado(df):
+    """ Resumo dos perfis calculado direto com groupby, sobre todos os pedidos
+    """
+    grupos = df.groupby(df['Delivery_person_ID'].astype(str), observed=True)
+    esperado = pd.DataFrame({'pedidos': grupos.size(),
+                             'avaliacao_media': grupos['Delivery_person_Ratings'].mean(),
+                             'tempo_medio': grupos['Time_taken(min)'].mean(),
+                             'tempo_variancia': grupos['Time_taken(min)'].var(),
+                             'tempo_desvio': grupos['Time_taken(min)'].std()})
+    esperado.index.name = None
+    return esperado
+
+
+def comparar_perfis(perfis, df):
+    resumo = perfis.resumo.rename_axis(None)
+    pd.testing.assert_frame_equal(resumo, resumo_esperado(df), check_dtype=False, rtol=1e-9)
+
+    # Quebra por trânsito de um entregador com vários pedidos
+    entregador = df['Delivery_person_ID'].astype(str).value_counts().index[0]
+    _, quebras = perfis.perfil(entregador)
+    linhas = df[df['Delivery_person_ID'].astype(str) == entregador]
+    grupos = linhas.groupby(linhas['Road_traffic_density'].astype(str))
+    np.testing.assert_array_equal(quebras['trafego'].index, sorted(grupos.groups))
+    np.testing.assert_allclose(quebras['trafego']['pedidos'], grupos.size().to_numpy())
+    np.testing.assert_allclose(quebras['trafego']['tempo_medio'], grupos['Time_taken(min)'].mean().to_numpy(),
+                               rtol=1e-9)
+
+
+def test_construir_perfis_igual_a_groupby(csv_amostra):
+    df = ler_csv(csv_amostra)
+    comparar_perfis(construir_perfis(df), df)
+    assert construir_perfis(df).perfil('nao-existe') is None
+
+
+def test_perfis_incrementais_iguais_a_groupby(csv_amostra):
+    df = ler_csv(csv_amostra)
+    historico, lote = df.iloc[:2000].reset_index(drop=True), df.iloc[2000:].reset_index(drop=True)
+    perfis = perfis_dados(historico)
+
+    # anexar atualiza os perfis registrados com registrar_incremental só com o lote
+    novo = anexar(historico, lote)
+    assert (id(novo), 'perfis') in dados._derivados
+    atualizados = perfis_dados(novo)
+    assert atualizados is not perfis
+
+    comparar_perfis(atualizados, pd.concat([historico, lote], ignore_index=True))
@@ -0,0 +1,84 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from curry.quantis import (BALDE_ZERO, DIMENSOES_QUANTIS, ERRO_RELATIVO, MEDIDA_QUANTIS, QUANTIS, anexar_sketch, baldes,
+                           construir_sketch, quantis, valor_balde)
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def pedidos(tempos, cidade='Urban'):
+    """ DataFrame com as colunas do sketch: todos os pedidos na mesma célula, exceto a cidade
+    """
+    return pd.DataFrame({'Order_Date': pd.Timestamp('2022-03-01'), 'City': cidade,
+                         'Road_traffic_density': 'Low', 'Festival': 'No',
+                         MEDIDA_QUANTIS: np.asarray(tempos, dtype=np.float64)})[DIMENSOES_QUANTIS + [MEDIDA_QUANTIS]]
+
+
+def exatos(tempos, q):
+    """ Quantil exato na definição do sketch: o valor de posto floor(q * (n - 1)) entre os ordenados
+    """
+    return np.quantile(tempos, q, method='lower')
+
+
+@pytest.mark.parametrize('amostra', ['lognormal', 'uniforme'])
+@pytest.mark.parametrize('erro', [ERRO_RELATIVO, 0.05])
+def test_erro_relativo_dentro_do_garantido(amostra, erro):
+    rng = np.random.default_rng(11)
+    tempos = rng.lognormal(3, 1, 20_000) if amostra == 'lognormal' else rng.uniform(1, 60, 20_000)
+
+    estimados = quantis(construir_sketch(pedidos(tempos), erro), 'City', erro_relativo=erro)
+    assert estimados.loc['Urban', 'pedidos'] == len(tempos)
+    for q in QUANTIS:
+        exato = exatos(tempos, q)
+        estimado = estimados.loc['Urban', f'p{q * 100:g}']
+        assert abs(estimado - exato) / exato <= erro * (1 + 1e-9)
+
+
+def test_valor_balde_a_no_maximo_o_erro_do_valor():
+    valores = np.geomspace(1e-3, 1e6, 10_000)
+    representantes = valor_balde(baldes(valores))
+    assert np.all(np.abs(representantes - valores) / valores <= ERRO_RELATIVO * (1 + 1e-9))
+
+
+def test_juntar_sketches_igual_ao_sketch_da_concatenacao():
+    rng = np.random.default_rng(5)
+    historico = pedidos(rng.lognormal(3, 0.5, 3000))
+    lote = pd.concat([pedidos(rng.lognormal(3.2, 0.5, 500)), pedidos(rng.uniform(5, 40, 200), 'Semi-Urban')],
+                     ignore_index=True)
+
+    juntos = anexar_sketch(construir_sketch(historico), lote)
+    direto = construir_sketch(pd.concat([historico, lote], ignore_index=True))
+
+    chaves = DIMENSOES_QUANTIS + ['balde']
+    ordenar = lambda sketch: sketch.astype({c: str for c in ['City', 'Road_traffic_density', 'Festival']}) \
+        .sort_values(chaves, ignore_index=True)
+    pd.testing.assert_frame_equal(ordenar(juntos), ordenar(direto), check_dtype=False)
+    pd.testing.assert_frame_equal(quantis(juntos, 'City'), quantis(direto, 'City'))
+
+
+def test_sketch_vazio():
+    sketch = construir_sketch(pedidos([]))
+    assert len(sketch) == 0
+    estimados = quantis(sketch, 'City')
+    assert len(estimados) == 0
+    assert list(estimados.columns) == ['pedidos'] + [f'p{q * 100:g}' for q in QUANTIS]
+
+
+def test_valores_nao_positivos_e_ausentes():
+    # Tempos <= 0 vão para o balde do zero (antes de todos os outros); ausentes ficam fora do sketch
+    assert list(baldes([0.0, -3.0])) == [BALDE_ZERO, BALDE_ZERO]
+    assert baldes([1.0])[0] != BALDE_ZERO and baldes([1e-9])[0] > BALDE_ZERO
+    assert valor_balde([BALDE_ZERO])[0] == 0.0
+
+    estimados = quantis(construir_sketch(pedidos([0.0, -3.0, 10.0, 20.0, 30.0, np.nan])), 'City', qs=[0.0, 0.5, 0.9])
+    assert estimados.loc['Urban', 'pedidos'] == 5
+    assert estimados.loc['Urban', 'p0'] == 0.0
+    assert estimados.loc['Urban', 'p50'] == pytest.approx(10.0, rel=ERRO_RELATIVO)
+    assert estimados.loc['Urban', 'p90'] == pytest.approx(20.0, rel=ERRO_RELATIVO)
@@ -0,0 +1,64 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from curry.dados import ler_csv
+from curry.ranking import top_entregadores
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def top_delivery(df1, top_geral, top_velocidade):
+    """ Ranking como no dashboard original: médias ordenadas com sort_values e head(10) por cidade
+    """
+    df2 = df1.loc[:, ['Delivery_person_ID', 'Time_taken(min)', 'City']] \
+        .groupby(['City', 'Delivery_person_ID'], observed=True) \
+        .mean() \
+        .sort_values(['City', 'Time_taken(min)'], ascending=top_geral) \
+        .reset_index()
+
+    partes = [df2.loc[df2['City'] == cidade, :].head(10) for cidade in ['Metropolitian', 'Urban', 'Semi-Urban']]
+    df_aux_final = pd.concat(partes).reset_index(drop=True)
+    df_aux_final['Rank_fast'] = df_aux_final.groupby('City', observed=True)['Time_taken(min)'] \
+        .rank(method='dense', ascending=top_velocidade).astype(int)
+    return df_aux_final
+
+
+def comparavel(tabela):
+    return tabela[['City', 'Delivery_person_ID', 'Time_taken(min)', 'Rank_fast']] \
+        .astype({'City': str, 'Delivery_person_ID': str, 'Time_taken(min)': np.float64}).reset_index(drop=True)
+
+
+def pedidos_empatados(semente):
+    """ Pedidos de 3 cidades em que muitos entregadores têm o mesmo tempo médio (inclusive no 10º lugar)
+    """
+    gerador = np.random.default_rng(semente)
+    linhas = []
+    for cidade in ['Urban', 'Metropolitian', 'Semi-Urban']:
+        for entregador in gerador.permutation(40):
+            tempo = gerador.choice([15, 20, 25, 30, 35])
+            for _ in range(gerador.integers(1, 4)):
+                linhas.append((cidade, f'ENT{entregador:03d}', tempo))
+    return pd.DataFrame(linhas, columns=['City', 'Delivery_person_ID', 'Time_taken(min)'])
+
+
+@pytest.mark.parametrize('semente', [0, 1, 2])
+def test_top_entregadores_com_empates_igual_ao_original(semente):
+    df1 = pedidos_empatados(semente)
+    rapidos, lentos = top_entregadores(df1, k=10)
+
+    pd.testing.assert_frame_equal(comparavel(rapidos), comparavel(top_delivery(df1, True, True)))
+    pd.testing.assert_frame_equal(comparavel(lentos), comparavel(top_delivery(df1, False, False)))
+
+
+def test_top_entregadores_na_amostra_igual_ao_original(csv_amostra):
+    df1 = ler_csv(csv_amostra)
+    rapidos, lentos = top_entregadores(df1, k=10)
+
+    pd.testing.assert_frame_equal(comparavel(rapidos), comparavel(top_delivery(df1, True, True)))
+    pd.testing.assert_frame_equal(comparavel(lentos), comparavel(top_delivery(df1, False, False)))
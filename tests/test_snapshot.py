@@ -0,0 +1,94 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from curry.dados import caminho_snapshot, carregar_dados, concatenar_partes, ler_csv, limpar_cache, salvar_lote
+from curry.snapshot import anexar_snapshot, ler_snapshot, salvar_snapshot
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def lote_diferente(df):
+    """ Lote com uma cidade que entra no meio da ordem das categorias, uma que entra no final
+            e uma idade que não cabe no tipo inteiro atual
+    """
+    lote = df.iloc[:6].reset_index(drop=True)
+    lote['City'] = pd.Categorical(['Rural', 'Zona', 'Rural', None, 'Urban', 'Zona'])
+    lote['Delivery_person_Age'] = lote['Delivery_person_Age'].astype('int16') + 1000
+    lote.loc[0, 'ID'] = np.nan
+    lote.loc[1, 'ID'] = 'ação'
+    return lote
+
+
+def test_snapshot_ida_e_volta(csv_amostra, tmp_path):
+    df = ler_csv(csv_amostra)
+    destino = str(tmp_path / 'snap')
+    salvar_snapshot(df, destino, {'versao': 1})
+
+    pd.testing.assert_frame_equal(ler_snapshot(destino, {'versao': 1}), df)
+    assert ler_snapshot(destino, {'versao': 2}) is None
+
+
+def test_anexar_snapshot_igual_a_gravar_inteiro(csv_amostra, tmp_path):
+    df = ler_csv(csv_amostra)
+    partes = [df.iloc[:1000].reset_index(drop=True), df.iloc[1000:1001].reset_index(drop=True),
+              df.iloc[1001:].reset_index(drop=True), lote_diferente(df), df.iloc[:0]]
+
+    destino = str(tmp_path / 'anexado')
+    salvar_snapshot(partes[0], destino, {'partes': 1})
+    for numero, parte in enumerate(partes[1:], start=1):
+        assert anexar_snapshot(destino, {'partes': numero}, parte, {'partes': numero + 1})
+
+    inteiro = str(tmp_path / 'inteiro')
+    salvar_snapshot(concatenar_partes(partes), inteiro, {'partes': len(partes)})
+
+    pd.testing.assert_frame_equal(ler_snapshot(destino, {'partes': len(partes)}),
+                                  ler_snapshot(inteiro, {'partes': len(partes)}))
+    pd.testing.assert_frame_equal(ler_snapshot(destino, {'partes': len(partes)}), concatenar_partes(partes))
+    # As colunas regravadas (categoria e idade) não deixam os arquivos antigos para trás
+    assert len(os.listdir(destino)) == len(os.listdir(inteiro))
+
+
+def test_anexar_snapshot_recusa_snapshot_desatualizado(csv_amostra, tmp_path):
+    df = ler_csv(csv_amostra)
+    destino = str(tmp_path / 'snap')
+    salvar_snapshot(df, destino, {'versao': 1})
+
+    assert not anexar_snapshot(destino, {'versao': 0}, df.iloc[:10], {'versao': 2})
+    assert not anexar_snapshot(str(tmp_path / 'nao_existe'), {'versao': 1}, df.iloc[:10], {'versao': 2})
+    assert not anexar_snapshot(destino, {'versao': 1}, df.iloc[:10, 1:], {'versao': 2})
+    pd.testing.assert_frame_equal(ler_snapshot(destino, {'versao': 1}), df)
+
+
+def test_carregar_dados_anexa_lotes_ao_snapshot(csv_amostra, tmp_path):
+    caminho = str(tmp_path / 'pedidos.csv')
+    bruto = pd.read_csv(csv_amostra)
+    bruto.iloc[:2000].to_csv(caminho, index=False)
+    limpar_cache()
+    carregar_dados(caminho, processos=1)
+
+    manifesto = os.path.join(caminho_snapshot(caminho), 'manifest.json')
+    arquivos = {nome: os.stat(os.path.join(caminho_snapshot(caminho), nome)).st_ino
+                for nome in os.listdir(caminho_snapshot(caminho)) if nome != 'manifest.json'}
+    salvar_lote(bruto.iloc[2000:2500], caminho, '001.csv')
+    salvar_lote(bruto.iloc[2500:], caminho, '002.csv')
+    quente = carregar_dados(caminho, processos=1)
+
+    # O snapshot foi atualizado no lugar: os mesmos arquivos, com as linhas novas no final
+    # (só colunas categóricas com categorias novas no meio da ordem ganham arquivo novo)
+    assert os.path.exists(manifesto)
+    mantidos = [nome for nome in os.listdir(caminho_snapshot(caminho)) if nome in arquivos]
+    assert 'col_000.dados' in mantidos and 'col_021.npy' in mantidos
+    for nome in mantidos:
+        assert os.stat(os.path.join(caminho_snapshot(caminho), nome)).st_ino == arquivos[nome]
+
+    limpar_cache()
+    frio = carregar_dados(caminho, processos=1)
+    pd.testing.assert_frame_equal(frio, quente)
+    limpar_cache()
@@ -0,0 +1,74 @@
+# ====================================================================
+# ==========================BIBLIOTECAS=============================
+# ====================================================================
+
+import gc
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from curry import dados
+from curry.tabelas import FonteTabela, fonte_tabela
+
+# ====================================================================
+# ==========================FUNCOES=============================
+# ====================================================================
+
+def tabela_exemplo(linhas=500):
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({'pedidos': rng.integers(0, 20, linhas),
+                         'media': np.where(rng.random(linhas) < 0.1, np.nan, rng.random(linhas))},
+                        index=pd.Index([f'ent{i:04d}' for i in range(linhas)], name='entregador'))
+
+
+def test_pagina_igual_a_sort_values():
+    tabela = tabela_exemplo()
+    fonte = FonteTabela(tabela)
+    for coluna, crescente in [('pedidos', True), ('media', False), ('entregador', False)]:
+        ordenada = tabela.sort_values(coluna, ascending=crescente, kind='stable', na_position='last')
+        for pagina in (0, 3):
+            linhas, total = fonte.pagina(pagina, 25, coluna, crescente)
+            assert total == len(tabela)
+            pd.testing.assert_frame_equal(linhas, ordenada.iloc[pagina * 25:(pagina + 1) * 25])
+
+    linhas, total = fonte.pagina(0, 25, texto='ENT000')
+    assert total == 10
+    pd.testing.assert_frame_equal(linhas, tabela.iloc[:10])
+
+
+def test_fonte_compartilhada_nao_prende_a_tabela():
+    antes = len(dados._derivados)
+    for _ in range(20):
+        # Como uma tabela montada de novo a cada execução da página
+        tabela = tabela_exemplo(50)
+        assert fonte_tabela(tabela) is fonte_tabela(tabela)
+        fonte_tabela(tabela).pagina(0, 10, 'media', True)
+    del tabela
+    gc.collect()
+    assert len(dados._derivados) == antes
+
+
+def test_fonte_usada_por_varias_sessoes_ao_mesmo_tempo():
+    tabela = tabela_exemplo(20000)
+    fonte = FonteTabela(tabela)
+    sessoes = 16
+    barreira = threading.Barrier(sessoes)
+
+    def sessao(i):
+        barreira.wait()
+        ordem = fonte._ordem('media', False)
+        texto = f'ent{i % 4:01d}'
+        linhas, total = fonte.pagina(2, 25, 'pedidos', True, texto=texto)
+        return ordem, texto, linhas, total
+
+    with ThreadPoolExecutor(sessoes) as executor:
+        resultados = list(executor.map(sessao, range(sessoes)))
+
+    # Todas as sessões recebem a mesma ordem, calculada uma vez
+    assert len({id(ordem) for ordem, *_ in resultados}) == 1
+    for _, texto, linhas, total in resultados:
+        filtrada = tabela[tabela.index.str.contains(texto)].sort_values('pedidos', kind='stable')
+        assert total == len(filtrada)
+        pd.testing.assert_frame_equal(linhas, filtrada.iloc[50:75])